@@ -0,0 +1,56 @@
+"""Benchmark of integer basis point VAT amounts against decimal VAT amounts.
+
+Usage::
+
+    $ python -m benchmarks.bench_amounts
+"""
+
+import random
+import timeit
+from decimal import Decimal, ROUND_HALF_EVEN
+
+from pyvat.amounts import (
+    PER_LINE,
+    decimal_invoice_vat_amount,
+    invoice_vat_amount,
+)
+from pyvat.utils import rate_to_basis_points
+
+RATES = [Decimal(rate) for rate in ('25', '21', '19', '7', '5.5', '25.5')]
+
+rng = random.Random(1)
+NET_AMOUNTS = [rng.randint(1, 10 ** 7) for _ in range(1000)]
+
+NUMBER = 50
+
+
+def bench(name, function, rates):
+    def run():
+        for rate in rates:
+            function(NET_AMOUNTS, rate, ROUND_HALF_EVEN, PER_LINE)
+
+    seconds = min(timeit.repeat(run, number=NUMBER, repeat=3))
+    per_line = seconds / (NUMBER * len(rates) * len(NET_AMOUNTS)) * 1e9
+    print('%-10s %8.1f ns/line' % (name, per_line))
+    return per_line
+
+
+def main():
+    for rate in RATES:
+        assert invoice_vat_amount(NET_AMOUNTS,
+                                  rate_to_basis_points(rate),
+                                  ROUND_HALF_EVEN,
+                                  PER_LINE) == \
+            decimal_invoice_vat_amount(NET_AMOUNTS,
+                                       rate,
+                                       ROUND_HALF_EVEN,
+                                       PER_LINE)
+
+    decimal = bench('decimal', decimal_invoice_vat_amount, RATES)
+    integer = bench('integer', invoice_vat_amount,
+                    [rate_to_basis_points(rate) for rate in RATES])
+    print('speedup    %8.1fx' % (decimal / integer))
+
+
+if __name__ == '__main__':
+    main()
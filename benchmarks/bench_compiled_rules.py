@@ -0,0 +1,49 @@
+"""Benchmark of the compiled VAT rules against the class-based VAT rules.
+
+Usage::
+
+    $ python -m benchmarks.bench_compiled_rules
+"""
+
+import datetime
+import timeit
+
+from pyvat import get_sale_vat_charge, ItemType, Party
+from pyvat.compiled_rules import get_compiled_vat_rules
+
+SALES = [
+    (datetime.date(2025, 3, 1), ItemType.ebook,
+     Party('DE', False), Party('FR', True)),
+    (datetime.date(2025, 3, 1), ItemType.generic_electronic_service,
+     Party('DE', True), Party('FR', True)),
+    (datetime.date(2025, 3, 1), ItemType.generic_electronic_service,
+     Party('FR', True), Party('FR', True)),
+    (datetime.date(2014, 3, 1), ItemType.generic_broadcasting_service,
+     Party('IT', False), Party('DK', True)),
+    (datetime.date(2025, 3, 1), ItemType.generic_electronic_service,
+     Party('US', True), Party('FR', True)),
+]
+
+NUMBER = 20000
+
+
+def bench(name, function):
+    def run():
+        for sale in SALES:
+            function(*sale)
+
+    seconds = min(timeit.repeat(run, number=NUMBER, repeat=3))
+    per_call = seconds / (NUMBER * len(SALES)) * 1e6
+    print('%-10s %8.3f us/call' % (name, per_call))
+    return per_call
+
+
+def main():
+    compiled = get_compiled_vat_rules()
+    rules = bench('rules', get_sale_vat_charge)
+    table = bench('compiled', compiled.get_sale_vat_charge)
+    print('speedup    %8.1fx' % (rules / table))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,70 @@
+"""Benchmark of check latency percentiles with and without hedging.
+
+Registry latencies are simulated with a long tail: 5 % of the requests take
+ten times longer than the others.
+
+Usage::
+
+    $ python -m benchmarks.bench_hedging
+"""
+
+import random
+import threading
+import time
+
+from pyvat.hedging import HedgedRegistry
+from pyvat.latency import LatencyTracker
+from pyvat.registries import Registry
+from pyvat.result import VatNumberCheckResult
+
+FAST_LATENCY = 0.01
+
+SLOW_LATENCY = 0.1
+
+SLOW_FRACTION = 0.05
+
+CHECKS = 1000
+
+WARM_UP_CHECKS = 100
+
+
+class LongTailRegistry(Registry):
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.rng = random.Random(1)
+
+    def check_vat_number(self, vat_number, country_code, test):
+        with self.lock:
+            slow = self.rng.random() < SLOW_FRACTION
+        time.sleep(SLOW_LATENCY if slow else FAST_LATENCY)
+        return VatNumberCheckResult(True)
+
+
+def bench(name, registry):
+    for _ in range(WARM_UP_CHECKS):
+        registry.check_vat_number('12345678', 'DK', False)
+
+    latencies = LatencyTracker(CHECKS)
+    for _ in range(CHECKS):
+        started = time.monotonic()
+        registry.check_vat_number('12345678', 'DK', False)
+        latencies.record(time.monotonic() - started)
+
+    print('%-10s p50 %6.1f ms  p90 %6.1f ms  p99 %6.1f ms' % (
+        name,
+        latencies.percentile(50) * 1000,
+        latencies.percentile(90) * 1000,
+        latencies.percentile(99) * 1000,
+    ))
+
+
+def main():
+    bench('direct', LongTailRegistry())
+    hedged = HedgedRegistry(LongTailRegistry(), percentile=90.0,
+                            max_hedge_ratio=0.1)
+    bench('hedged', hedged)
+    print('hedged     %6.1f %% of checks' % (hedged.hedge_ratio * 100))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,85 @@
+"""Throughput benchmark of the local HTTP server at several concurrency levels.
+
+Registry checks are simulated with a fixed latency. A quarter of the checks
+repeat VAT numbers, which are answered from the shared result cache.
+
+Usage::
+
+    $ python -m benchmarks.bench_server
+"""
+
+import json
+import threading
+import time
+from http.client import HTTPConnection
+
+import pyvat
+from pyvat.registries import Registry
+from pyvat.result import VatNumberCheckResult
+from pyvat.server import ServerThread, VatServer
+
+REGISTRY_LATENCY = 0.05
+
+REQUESTS_PER_CLIENT = 50
+
+CONCURRENCY_LEVELS = (1, 8, 32, 128)
+
+
+class SimulatedRegistry(Registry):
+    def check_vat_number(self, vat_number, country_code, test):
+        time.sleep(REGISTRY_LATENCY)
+        return VatNumberCheckResult(True)
+
+
+def run_client(port, client, paths_and_bodies):
+    connection = HTTPConnection('127.0.0.1', port, timeout=30)
+    for path, body in paths_and_bodies:
+        connection.request('POST', path, json.dumps(body))
+        response = connection.getresponse()
+        response.read()
+        assert response.status == 200
+    connection.close()
+
+
+def requests_for(level, client):
+    for index in range(REQUESTS_PER_CLIENT):
+        if index % 4 == 0:
+            # Repeated VAT number answered from the cache.
+            number = 10000000 + index
+        else:
+            number = 20000000 + (level * 1000 + client) * 100 + index
+        if index % 2:
+            yield '/format', {'vat_number': 'DK%d' % (number)}
+        else:
+            yield '/check', {'vat_number': 'DK%d' % (number)}
+
+
+def bench(port, level):
+    threads = [threading.Thread(target=run_client,
+                                args=(port,
+                                      client,
+                                      list(requests_for(level, client))))
+               for client in range(level)]
+    started = time.monotonic()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    seconds = time.monotonic() - started
+    count = level * REQUESTS_PER_CLIENT
+    print('%4d clients %8.0f requests/s' % (level, count / seconds))
+
+
+def main():
+    pyvat.VAT_REGISTRIES['DK'] = SimulatedRegistry()
+    thread = ServerThread(VatServer(port=0, max_workers=128))
+    thread.start()
+    try:
+        for level in CONCURRENCY_LEVELS:
+            bench(thread.server.port, level)
+    finally:
+        thread.stop()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,50 @@
+"""Benchmark of shared cache lookups against in-process cache lookups.
+
+Usage::
+
+    $ python -m benchmarks.bench_shared_cache
+"""
+
+import os
+import shutil
+import tempfile
+import timeit
+
+from pyvat.memo import MemoCache
+from pyvat.shared_cache import SharedCheckCache
+
+KEYS = [('%08d' % (number), 'DK') for number in range(0, 40000, 4)]
+
+NUMBER = 20
+
+
+def bench(name, function):
+    def run():
+        for vat_number, country_code in KEYS:
+            function(vat_number, country_code)
+
+    seconds = min(timeit.repeat(run, number=NUMBER, repeat=3))
+    per_lookup = seconds / (NUMBER * len(KEYS)) * 1e6
+    print('%-10s %8.3f us/lookup' % (name, per_lookup))
+    return per_lookup
+
+
+def main():
+    directory = tempfile.mkdtemp()
+    try:
+        shared = SharedCheckCache(os.path.join(directory, 'cache'))
+        memo = MemoCache(65536)
+        for vat_number, country_code in KEYS:
+            shared.set(vat_number, country_code, True)
+            memo.set((vat_number, country_code), True)
+
+        bench('memo', lambda vat_number, country_code:
+              memo.get((vat_number, country_code)))
+        bench('shared', shared.get)
+        shared.close()
+    finally:
+        shutil.rmtree(directory)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,92 @@
+"""Benchmark of VIES checks through each transport against a local stub
+registry, measuring the client-side overhead of the transports.
+
+Usage::
+
+    $ python -m benchmarks.bench_transports
+"""
+
+import threading
+import timeit
+try:
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+except ImportError:
+    from BaseHTTPServer import BaseHTTPRequestHandler, HTTPServer
+    from SocketServer import ThreadingMixIn
+
+    class ThreadingHTTPServer(ThreadingMixIn, HTTPServer):
+        daemon_threads = True
+
+from pyvat.registries import ViesRegistry
+from pyvat.transports import (
+    MemoryTransport,
+    RequestsTransport,
+    TransportResponse,
+    Urllib3Transport,
+    urllib3,
+)
+
+RESPONSE = (
+    u'<env:Envelope xmlns:env="http://schemas.xmlsoap.org/soap/envelope/">'
+    u'<env:Header/><env:Body><ns2:checkVatResponse xmlns:ns2="urn:ec.europa'
+    u'.eu:taxud:vies:services:checkVat:types"><ns2:countryCode>DE</ns2:cou'
+    u'ntryCode><ns2:vatNumber>812383453</ns2:vatNumber><ns2:valid>true</ns'
+    u'2:valid></ns2:checkVatResponse></env:Body></env:Envelope>'
+)
+
+NUMBER = 500
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    disable_nagle_algorithm = True
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers['Content-Length']))
+        body = RESPONSE.encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/xml; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def bench(name, transport, url):
+    registry = ViesRegistry()
+    registry.CHECK_VAT_SERVICE_URL = url
+    registry.transport = transport
+
+    def run():
+        registry.check_vat_number('812383453', 'DE', False)
+
+    run()
+    seconds = min(timeit.repeat(run, number=NUMBER, repeat=3))
+    per_check = seconds / NUMBER * 1e6
+    print('%-10s %8.1f us/check' % (name, per_check))
+    return per_check
+
+
+def main():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), StubHandler)
+    url = 'http://127.0.0.1:%d/' % (server.server_address[1])
+    thread = threading.Thread(target=server.serve_forever)
+    thread.daemon = True
+    thread.start()
+    try:
+        bench('memory', MemoryTransport(
+            lambda method, url, data, headers:
+            TransportResponse(200, {'Content-Type': 'text/xml'}, RESPONSE)
+        ), url)
+        bench('requests', RequestsTransport(), url)
+        if urllib3 is not None:
+            bench('urllib3', Urllib3Transport(), url)
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+if __name__ == '__main__':
+    main()
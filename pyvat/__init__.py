@@ -2,13 +2,20 @@ import re
 
 import pycountry
 
+from . import memo
 from .item_type import ItemType
+from .memo import (
+    enable_memoization,
+    disable_memoization,
+    clear_memoization,
+    memoization_info,
+)
 from .party import Party
 from .registries import ViesRegistry, HMRCRegistry, EgyptRegistry, SwitzerlandRegistry, CanadaRegistry, NorwayRegistry
 
 from .result import VatNumberCheckResult
 from .vat_charge import VatCharge, VatChargeAction
-from .vat_rules import VAT_RULES
+from .vat_rules import VAT_RULES, NOT_APPLICABLE
 
 __version__ = "1.3.18"
 
@@ -147,6 +154,19 @@ def decompose_vat_number(vat_number, country_code=None):
         ``(vat_number, None)`` if decomposition failed.
     """
 
+    cache = memo.DECOMPOSE_CACHE
+    if cache is None:
+        return _decompose_vat_number(vat_number, country_code)
+
+    key = (vat_number, country_code)
+    result = cache.get(key)
+    if result is None:
+        result = _decompose_vat_number(vat_number, country_code)
+        cache.set(key, result)
+    return result
+
+
+def _decompose_vat_number(vat_number, country_code):
     # Clean the VAT number.
     vat_number = WHITESPACE_EXPRESSION.sub("", vat_number).upper()
 
@@ -193,6 +213,19 @@ def is_vat_number_format_valid(vat_number, country_code=None):
         or ``False`` if not.
     """
 
+    cache = memo.FORMAT_CACHE
+    if cache is None:
+        return _is_vat_number_format_valid(vat_number, country_code)
+
+    key = (vat_number, country_code)
+    result = cache.get(key)
+    if result is None:
+        result = _is_vat_number_format_valid(vat_number, country_code)
+        cache.set(key, result)
+    return result
+
+
+def _is_vat_number_format_valid(vat_number, country_code):
     vat_number, country_code = decompose_vat_number(vat_number, country_code)
 
     if not vat_number or not country_code:
@@ -296,24 +329,27 @@ def get_sale_vat_charge(date,
     # VAT rules for selling to the given country.
     if buyer_vat_rules:
         try:
-            return buyer_vat_rules.get_sale_to_country_vat_charge(date,
-                                                                  item_type,
-                                                                  buyer,
-                                                                  seller,
-                                                                  postal_code)
+            charge = buyer_vat_rules.get_sale_to_country_vat_charge(
+                date, item_type, buyer, seller, postal_code
+            )
         except NotImplementedError:
-            pass
+            # Custom VAT rules may signal inapplicability by raising.
+            charge = NOT_APPLICABLE
+
+        if charge is not NOT_APPLICABLE:
+            return charge
 
     # Fall back to applying VAT rules for selling from the seller's country.
     if seller_vat_rules:
         try:
-            return seller_vat_rules.get_sale_from_country_vat_charge(date,
-                                                                     item_type,
-                                                                     buyer,
-                                                                     seller,
-                                                                     postal_code)
+            charge = seller_vat_rules.get_sale_from_country_vat_charge(
+                date, item_type, buyer, seller, postal_code
+            )
         except NotImplementedError:
-            pass
+            charge = NOT_APPLICABLE
+
+        if charge is not NOT_APPLICABLE:
+            return charge
 
     # Nothing we can do from here.
     raise NotImplementedError(
@@ -324,8 +360,13 @@ def get_sale_vat_charge(date,
 
 __all__ = (
     "check_vat_number",
+    "decompose_vat_number",
     "get_sale_vat_charge",
     "is_vat_number_format_valid",
+    "enable_memoization",
+    "disable_memoization",
+    "clear_memoization",
+    "memoization_info",
     ItemType.__name__,
     Party.__name__,
     VatCharge.__name__,
@@ -0,0 +1,159 @@
+from decimal import Decimal, ROUND_HALF_EVEN, ROUND_HALF_UP
+
+from .utils import ensure_decimal
+
+
+BASIS_POINTS_PER_UNIT = 10000
+"""Basis points in a rate of 1, i.e. 100 %.
+"""
+
+ROUNDING_MODES = (ROUND_HALF_UP, ROUND_HALF_EVEN)
+"""Supported rounding modes.
+
+The :mod:`decimal` rounding modes ``ROUND_HALF_UP``, rounding ties away from
+zero, and ``ROUND_HALF_EVEN``, rounding ties to the nearest even amount.
+"""
+
+PER_LINE = 'per_line'
+"""Round the VAT amount of each invoice line and sum the rounded amounts.
+"""
+
+PER_INVOICE = 'per_invoice'
+"""Sum the net amounts of all invoice lines and round the VAT amount once.
+"""
+
+
+def _check_rounding(rounding):
+    if rounding not in ROUNDING_MODES:
+        raise ValueError('unsupported rounding mode %r' % (rounding))
+
+
+def _divide(numerator, rounding):
+    """Divide by :data:`BASIS_POINTS_PER_UNIT`, rounding to an integer.
+    """
+
+    quotient, remainder = divmod(abs(numerator), BASIS_POINTS_PER_UNIT)
+    twice_remainder = remainder * 2
+
+    if twice_remainder > BASIS_POINTS_PER_UNIT or \
+            (twice_remainder == BASIS_POINTS_PER_UNIT and
+             (rounding == ROUND_HALF_UP or quotient % 2)):
+        quotient += 1
+
+    return -quotient if numerator < 0 else quotient
+
+
+def vat_amount(net_amount, rate_basis_points, rounding=ROUND_HALF_UP):
+    """Calculate the VAT amount of a net amount in integer arithmetic.
+
+    Gives the same result as :func:`decimal_vat_amount` for the equivalent
+    rate in percent.
+
+    :param net_amount: Net amount in minor units, e.g. cents.
+    :type net_amount: int
+    :param rate_basis_points:
+        VAT rate in basis points, e.g.
+        :attr:`pyvat.VatCharge.rate_basis_points`.
+    :type rate_basis_points: int
+    :param rounding: Rounding mode. Default ``ROUND_HALF_UP``.
+    :returns: the VAT amount in minor units.
+    :rtype: int
+    """
+
+    _check_rounding(rounding)
+    return _divide(net_amount * rate_basis_points, rounding)
+
+
+def decimal_vat_amount(net_amount, rate, rounding=ROUND_HALF_UP):
+    """Calculate the VAT amount of a net amount in decimal arithmetic.
+
+    :param net_amount: Net amount in minor units, e.g. cents.
+    :type net_amount: int
+    :param rate: VAT rate in percent, e.g. :attr:`pyvat.VatCharge.rate`.
+    :type rate: decimal.Decimal
+    :param rounding: Rounding mode. Default ``ROUND_HALF_UP``.
+    :returns: the VAT amount in minor units.
+    :rtype: int
+    """
+
+    _check_rounding(rounding)
+    amount = Decimal(net_amount) * ensure_decimal(rate) / 100
+    return int(amount.quantize(Decimal(1), rounding=rounding))
+
+
+def gross_amounts(net_amounts, rate_basis_points, rounding=ROUND_HALF_UP):
+    """Calculate the VAT-inclusive amounts of net amounts sharing a VAT rate
+    in integer arithmetic.
+
+    :param net_amounts: Net amounts in minor units, e.g. cents.
+    :param rate_basis_points: VAT rate in basis points.
+    :type rate_basis_points: int
+    :param rounding: Rounding mode. Default ``ROUND_HALF_UP``.
+    :returns: a :class:`list` of gross amounts in minor units.
+    """
+
+    _check_rounding(rounding)
+    return [net_amount + _divide(net_amount * rate_basis_points, rounding)
+            for net_amount in net_amounts]
+
+
+def invoice_vat_amount(net_amounts,
+                       rate_basis_points,
+                       rounding=ROUND_HALF_UP,
+                       aggregation=PER_LINE):
+    """Calculate the VAT amount of invoice lines sharing a VAT rate.
+
+    :param net_amounts: Net amounts of the invoice lines in minor units.
+    :param rate_basis_points: VAT rate in basis points.
+    :type rate_basis_points: int
+    :param rounding: Rounding mode. Default ``ROUND_HALF_UP``.
+    :param aggregation:
+        :data:`PER_LINE` to round the VAT amount of each line, or
+        :data:`PER_INVOICE` to round the VAT amount of the total net amount.
+        Default :data:`PER_LINE`.
+    :returns: the VAT amount in minor units.
+    :rtype: int
+    """
+
+    _check_rounding(rounding)
+
+    if aggregation == PER_INVOICE:
+        return _divide(sum(net_amounts) * rate_basis_points, rounding)
+    elif aggregation == PER_LINE:
+        return sum(_divide(net_amount * rate_basis_points, rounding)
+                   for net_amount in net_amounts)
+
+    raise ValueError('unsupported aggregation %r' % (aggregation))
+
+
+def decimal_invoice_vat_amount(net_amounts,
+                               rate,
+                               rounding=ROUND_HALF_UP,
+                               aggregation=PER_LINE):
+    """Calculate the VAT amount of invoice lines in decimal arithmetic.
+
+    Parameters are as for :func:`invoice_vat_amount`, except for the VAT rate
+    given in percent.
+
+    :rtype: int
+    """
+
+    if aggregation == PER_INVOICE:
+        return decimal_vat_amount(sum(net_amounts), rate, rounding)
+    elif aggregation == PER_LINE:
+        return sum(decimal_vat_amount(net_amount, rate, rounding)
+                   for net_amount in net_amounts)
+
+    raise ValueError('unsupported aggregation %r' % (aggregation))
+
+
+__all__ = (
+    'PER_INVOICE',
+    'PER_LINE',
+    'ROUNDING_MODES',
+    'decimal_invoice_vat_amount',
+    'decimal_vat_amount',
+    'gross_amounts',
+    'invoice_vat_amount',
+    'vat_amount',
+)
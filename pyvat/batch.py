@@ -0,0 +1,242 @@
+from array import array
+
+from . import get_sale_vat_charge
+from .compiled_rules import (
+    get_era,
+    get_era_boundaries,
+    get_postal_code_regions,
+    get_region_key,
+)
+from .item_type import ItemType
+from .party import Party
+from .utils import rate_to_basis_points
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+UNSUPPORTED_ACTION = 0
+"""Action code of rows for which no VAT charge could be determined.
+
+Other action codes are the values of :class:`pyvat.VatChargeAction`.
+"""
+
+UNSUPPORTED_BASIS_POINTS = -1
+"""Basis points of rows for which no VAT charge could be determined.
+"""
+
+
+def _to_list(column):
+    """Convert a column to a list.
+
+    Supports sequences, NumPy arrays and Arrow arrays.
+    """
+
+    if hasattr(column, 'to_pylist'):
+        return column.to_pylist()
+    if hasattr(column, 'tolist'):
+        return column.tolist()
+    return list(column)
+
+
+def to_columns(*columns):
+    """Convert sale columns to lists of equal length.
+
+    Columns are given as for :func:`get_sale_vat_charges`, as sequences,
+    NumPy arrays or Arrow arrays. The last column holds the optional postal
+    codes, or ``None`` for no postal codes.
+
+    :returns: a :class:`list` of the columns as lists.
+    :rtype: list
+    :raises ValueError: if the columns are not of equal length.
+    """
+
+    postal_codes = columns[-1]
+    columns = [_to_list(column) for column in columns[:-1]]
+    row_count = len(columns[0])
+    if postal_codes is None:
+        columns.append([None] * row_count)
+    else:
+        columns.append(_to_list(postal_codes))
+
+    if any(len(column) != row_count for column in columns):
+        raise ValueError('all columns must be of equal length')
+
+    return columns
+
+
+class BatchVatCharges(object):
+    """VAT charges of a batch of sales as parallel columns.
+
+    :ivar action_codes:
+        VAT charge action codes, i.e. :class:`pyvat.VatChargeAction` values or
+        :data:`UNSUPPORTED_ACTION`.
+    :type action_codes: array.array
+    :ivar country_codes:
+        Countries in which the actions apply or ``None`` for unsupported rows.
+    :type country_codes: list
+    :ivar rates:
+        VAT rates in percent as :class:`decimal.Decimal` instances or ``None``
+        for unsupported rows.
+    :type rates: list
+    :ivar rate_basis_points:
+        VAT rates in basis points or :data:`UNSUPPORTED_BASIS_POINTS` for
+        unsupported rows.
+    :type rate_basis_points: array.array
+    :ivar charges:
+        VAT charges or ``None`` for unsupported rows.
+    :type charges: list
+    :ivar group_count: Number of distinct rule evaluations performed.
+    :type group_count: int
+    """
+
+    def __init__(self, charges, group_count):
+        self.charges = charges
+        self.group_count = group_count
+        self.action_codes = array('b')
+        self.country_codes = []
+        self.rates = []
+        self.rate_basis_points = array('l')
+
+        columns = {}
+        for charge in charges:
+            try:
+                row = columns[charge]
+            except KeyError:
+                if charge is None:
+                    row = (UNSUPPORTED_ACTION,
+                           None,
+                           None,
+                           UNSUPPORTED_BASIS_POINTS)
+                else:
+                    row = (charge.action.value,
+                           charge.country_code,
+                           charge.rate,
+                           rate_to_basis_points(charge.rate))
+                columns[charge] = row
+
+            self.action_codes.append(row[0])
+            self.country_codes.append(row[1])
+            self.rates.append(row[2])
+            self.rate_basis_points.append(row[3])
+
+    def to_numpy(self):
+        """Convert the columns to NumPy arrays.
+
+        :returns:
+            a :class:`dict` mapping ``'action_codes'``, ``'country_codes'``
+            and ``'rate_basis_points'`` to NumPy arrays.
+        :raises RuntimeError: if NumPy is not installed.
+        """
+
+        if numpy is None:
+            raise RuntimeError('NumPy is required for converting to arrays')
+
+        return {
+            'action_codes': numpy.frombuffer(self.action_codes,
+                                             dtype=numpy.int8),
+            'country_codes': numpy.array(self.country_codes, dtype=object),
+            'rate_basis_points': numpy.array(self.rate_basis_points,
+                                             dtype=numpy.int64),
+        }
+
+    def __len__(self):
+        return len(self.charges)
+
+
+def get_sale_vat_charges(dates,
+                         item_types,
+                         buyer_country_codes,
+                         buyer_is_business,
+                         seller_country_codes,
+                         seller_is_business,
+                         postal_codes=None,
+                         errors='raise'):
+    """Get the VAT charges for a batch of sales given as columns.
+
+    Each column may be a sequence, a NumPy array or an Arrow array of equal
+    length. Rows are grouped by the inputs that determine their VAT charge,
+    including the region their postal code resolves to, and each group is
+    evaluated once with :func:`pyvat.get_sale_vat_charge`.
+
+    :param dates: Sale dates as :class:`datetime.date` instances.
+    :param item_types:
+        Types of the items being sold as :class:`pyvat.ItemType` members or
+        their integer values.
+    :param buyer_country_codes: Buyer country codes.
+    :param buyer_is_business: Whether the buyers are businesses.
+    :param seller_country_codes: Seller country codes.
+    :param seller_is_business: Whether the sellers are businesses.
+    :param postal_codes:
+        Optional postal codes of the buyers' locations. Default ``None``.
+    :param errors:
+        ``'raise'`` to raise :class:`NotImplementedError` for the first row
+        for which no VAT charge can be determined, or ``'mark'`` to mark such
+        rows as unsupported. Default ``'raise'``.
+    :rtype: BatchVatCharges
+    """
+
+    if errors not in ('raise', 'mark'):
+        raise ValueError('errors must be either \'raise\' or \'mark\'')
+
+    columns = to_columns(dates,
+                         item_types,
+                         buyer_country_codes,
+                         buyer_is_business,
+                         seller_country_codes,
+                         seller_is_business,
+                         postal_codes)
+
+    postal_code_regions = get_postal_code_regions()
+    boundaries = get_era_boundaries()
+
+    groups = {}
+    charges = []
+
+    for date, item_type, buyer_country_code, buyer_business, \
+            seller_country_code, seller_business, postal_code \
+            in zip(*columns):
+        if not isinstance(item_type, ItemType):
+            item_type = ItemType(item_type)
+
+        key = (buyer_country_code,
+               seller_country_code,
+               bool(buyer_business),
+               bool(seller_business),
+               item_type,
+               get_era(date, boundaries),
+               get_region_key(postal_code_regions,
+                              buyer_country_code,
+                              postal_code))
+
+        try:
+            charge = groups[key]
+        except KeyError:
+            try:
+                charge = get_sale_vat_charge(
+                    date,
+                    item_type,
+                    Party(buyer_country_code, key[2]),
+                    Party(seller_country_code, key[3]),
+                    postal_code
+                )
+            except NotImplementedError:
+                if errors == 'raise':
+                    raise
+                charge = None
+            groups[key] = charge
+
+        charges.append(charge)
+
+    return BatchVatCharges(charges, len(groups))
+
+
+__all__ = (
+    'BatchVatCharges',
+    'UNSUPPORTED_ACTION',
+    'UNSUPPORTED_BASIS_POINTS',
+    'get_sale_vat_charges',
+    'to_columns',
+)
@@ -0,0 +1,275 @@
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError
+
+from . import (
+    check_vat_number,
+    get_sale_vat_charge,
+    is_vat_number_format_valid,
+    VAT_NUMBER_EXPRESSIONS,
+)
+from .party import Party
+
+
+class CheckoutVatCharge(object):
+    """VAT charge of a sale to a buyer claiming a VAT number.
+
+    :ivar charge: VAT charge.
+    :type charge: VatCharge
+    :ivar is_business:
+        Whether the buyer was charged as a business. ``None`` if the VAT
+        charge is the same for businesses and consumers, so the VAT number
+        was not checked.
+    :type is_business: bool
+    :ivar check_result:
+        Result of checking the VAT number or ``None`` if it was not checked
+        against a registry.
+    :type check_result: VatNumberCheckResult
+    :ivar pending_revalidation:
+        Whether the check of the VAT number did not complete in time and the
+        buyer was charged as a consumer in the meantime.
+    :type pending_revalidation: bool
+    :ivar check_future:
+        Future of the pending check of the VAT number, or ``None``.
+    :type check_future: concurrent.futures.Future
+    """
+
+    def __init__(self,
+                 charge,
+                 is_business=None,
+                 check_result=None,
+                 pending_revalidation=False,
+                 check_future=None):
+        self.charge = charge
+        self.is_business = is_business
+        self.check_result = check_result
+        self.pending_revalidation = pending_revalidation
+        self.check_future = check_future
+
+    @property
+    def vat_number_checked(self):
+        """Whether the VAT number was checked against a registry.
+
+        :rtype: bool
+        """
+
+        return self.check_result is not None
+
+    def __repr__(self):
+        return '<pyvat.CheckoutVatCharge: charge = %r, is business = %r>' % (
+            self.charge, self.is_business,
+        )
+
+
+def _get_charges(date,
+                 item_type,
+                 buyer_country_code,
+                 seller,
+                 vat_number,
+                 postal_code):
+    """Get the VAT charges of a sale to a buyer claiming a VAT number.
+
+    :returns:
+        a :class:`tuple` containing the :class:`CheckoutVatCharge` if it does
+        not depend on checking the VAT number against a registry, or
+        ``None``, and the VAT charges for a business buyer and for a consumer
+        buyer.
+    """
+
+    if not vat_number:
+        return CheckoutVatCharge(
+            get_sale_vat_charge(date,
+                                item_type,
+                                Party(buyer_country_code, False),
+                                seller,
+                                postal_code),
+            False
+        ), None, None
+
+    business_charge, consumer_charge = (
+        get_sale_vat_charge(date,
+                            item_type,
+                            Party(buyer_country_code, is_business),
+                            seller,
+                            postal_code)
+        for is_business in (True, False)
+    )
+    if business_charge == consumer_charge:
+        return CheckoutVatCharge(consumer_charge), None, None
+
+    if buyer_country_code in VAT_NUMBER_EXPRESSIONS and \
+            not is_vat_number_format_valid(vat_number, buyer_country_code):
+        return CheckoutVatCharge(consumer_charge, False), None, None
+
+    return None, business_charge, consumer_charge
+
+
+def get_checkout_vat_charge(date,
+                            item_type,
+                            buyer_country_code,
+                            seller,
+                            vat_number=None,
+                            postal_code=None,
+                            test=False):
+    """Get the VAT charge of a sale, checking the buyer's VAT number only if
+    it affects the VAT charge.
+
+    The buyer is charged as a business only if the VAT number is positively
+    valid. The VAT number is not checked against a registry if the VAT charge
+    is the same for businesses and consumers, or if its format is invalid.
+
+    :param date: Sale date.
+    :type date: datetime.date
+    :param item_type: Type of the item being sold.
+    :type item_type: ItemType
+    :param buyer_country_code: Buyer country code.
+    :type buyer_country_code: str
+    :param seller: Seller.
+    :type seller: Party
+    :param vat_number:
+        VAT number claimed by the buyer or ``None`` for consumers.
+    :type vat_number: str
+    :param postal_code:
+        Postal code of the buyer's location, used for region-specific VAT
+        rates.
+    :type postal_code: str
+    :param test: Whether to check against test registries. Default ``False``.
+    :rtype: CheckoutVatCharge
+    """
+
+    checkout_charge, business_charge, consumer_charge = \
+        _get_charges(date,
+                     item_type,
+                     buyer_country_code,
+                     seller,
+                     vat_number,
+                     postal_code)
+    if checkout_charge is not None:
+        return checkout_charge
+
+    check_result = check_vat_number(vat_number, buyer_country_code, test)
+    if check_result.is_valid is True:
+        return CheckoutVatCharge(business_charge, True, check_result)
+    return CheckoutVatCharge(consumer_charge, False, check_result)
+
+
+class CheckoutTaxResolver(object):
+    """Resolver of checkout VAT charges within a latency budget.
+
+    VAT numbers are checked against registries on a thread pool. If a check
+    does not complete within the latency budget, the buyer is charged as a
+    consumer and the result is flagged for re-validation.
+
+    :ivar latency_budget: Default latency budget in seconds.
+    :type latency_budget: float
+    """
+
+    DEFAULT_LATENCY_BUDGET = 2.0
+    """Default latency budget in seconds.
+    """
+
+    def __init__(self, latency_budget=None, max_workers=None, test=False):
+        """Initialize a resolver.
+
+        :param latency_budget:
+            Default latency budget in seconds. Default ``None`` using
+            :attr:`DEFAULT_LATENCY_BUDGET`.
+        :param max_workers:
+            Maximum number of concurrent registry checks. Default ``None``
+            using the :class:`concurrent.futures.ThreadPoolExecutor` default.
+        :param test: Whether to check against test registries.
+        """
+
+        if latency_budget is None:
+            latency_budget = self.DEFAULT_LATENCY_BUDGET
+        self.latency_budget = latency_budget
+        self.test = test
+        self._executor = ThreadPoolExecutor(max_workers)
+
+    def resolve(self,
+                date,
+                item_type,
+                buyer_country_code,
+                seller,
+                vat_number=None,
+                postal_code=None,
+                latency_budget=None):
+        """Resolve the VAT charge of a sale to a buyer claiming a VAT
+        number.
+
+        Equivalent to :func:`get_checkout_vat_charge`, except for checks
+        exceeding the latency budget. Both VAT charges are computed before
+        the registry check is submitted, and count towards the latency
+        budget.
+
+        :param date: Sale date.
+        :type date: datetime.date
+        :param item_type: Type of the item being sold.
+        :type item_type: ItemType
+        :param buyer_country_code: Buyer country code.
+        :type buyer_country_code: str
+        :param seller: Seller.
+        :type seller: Party
+        :param vat_number:
+            VAT number claimed by the buyer or ``None`` for consumers.
+        :type vat_number: str
+        :param postal_code:
+            Postal code of the buyer's location, used for region-specific VAT
+            rates.
+        :type postal_code: str
+        :param latency_budget:
+            Latency budget in seconds. Default ``None`` using the resolver's
+            latency budget.
+        :rtype: CheckoutVatCharge
+        """
+
+        started = time.monotonic()
+        if latency_budget is None:
+            latency_budget = self.latency_budget
+
+        checkout_charge, business_charge, consumer_charge = \
+            _get_charges(date,
+                         item_type,
+                         buyer_country_code,
+                         seller,
+                         vat_number,
+                         postal_code)
+        if checkout_charge is not None:
+            return checkout_charge
+
+        future = self._executor.submit(check_vat_number,
+                                       vat_number,
+                                       buyer_country_code,
+                                       self.test)
+
+        try:
+            check_result = future.result(
+                max(0, latency_budget - (time.monotonic() - started))
+            )
+        except TimeoutError:
+            return CheckoutVatCharge(consumer_charge,
+                                     False,
+                                     pending_revalidation=True,
+                                     check_future=future)
+
+        if check_result.is_valid is True:
+            return CheckoutVatCharge(business_charge, True, check_result)
+        return CheckoutVatCharge(consumer_charge, False, check_result)
+
+    def close(self):
+        """Shut down the thread pool, waiting for pending checks.
+        """
+
+        self._executor.shutdown()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+__all__ = (
+    'CheckoutTaxResolver',
+    'CheckoutVatCharge',
+    'get_checkout_vat_charge',
+)
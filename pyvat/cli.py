@@ -0,0 +1,486 @@
+import argparse
+import csv
+import datetime
+import io
+import itertools
+import json
+import os
+import sys
+import time
+
+from . import (
+    __version__,
+    decompose_vat_number,
+    is_vat_number_format_valid,
+    ItemType,
+)
+from .batch import get_sale_vat_charges
+from .server import DEFAULT_CACHE_TTL, DEFAULT_HOST, DEFAULT_PORT, serve
+from .streaming import DEFAULT_MAX_IN_FLIGHT, check_vat_numbers
+from .transports import DEFAULT_POOL_SIZE
+from .warmup import warm_up
+
+
+TRUE_STRINGS = frozenset(('1', 'true', 'yes', 'y', 't'))
+"""Lower case strings read as true in boolean ledger fields.
+"""
+
+CHARGE_CHUNK_SIZE = 10000
+"""Number of ledger records whose VAT charges are computed at once.
+"""
+
+
+class CommandError(Exception):
+    """Error in the command line arguments or input of a command.
+    """
+
+
+def _get_format(path, format):
+    if format:
+        return format
+    if path and path != '-' and path.lower().endswith(('.jsonl', '.json')):
+        return 'jsonl'
+    return 'csv'
+
+
+def _read_records(stream, format):
+    """Read records from a CSV or JSON lines stream lazily.
+    """
+
+    if format == 'csv':
+        for record in csv.DictReader(stream):
+            yield record
+        return
+
+    for line_number, line in enumerate(stream, 1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError as exc:
+            raise CommandError('invalid JSON on line %d: %s' % (line_number,
+                                                                exc))
+        if not isinstance(record, dict):
+            raise CommandError('line %d is not a JSON object' % (line_number))
+        yield record
+
+
+class RecordWriter(object):
+    """Incremental writer of CSV or JSON lines records.
+    """
+
+    def __init__(self, stream, format, write_header=True):
+        self.stream = stream
+        self.format = format
+        self.write_header = write_header
+        self._csv_writer = None
+
+    def write(self, record):
+        if self.format == 'jsonl':
+            self.stream.write(json.dumps(record, sort_keys=True) + '\n')
+            return
+
+        if self._csv_writer is None:
+            self._csv_writer = csv.DictWriter(self.stream,
+                                              list(record),
+                                              extrasaction='ignore')
+            if self.write_header:
+                self._csv_writer.writeheader()
+        self._csv_writer.writerow(record)
+
+    def flush(self):
+        self.stream.flush()
+
+    def tell(self):
+        """Flush the output and get its size in bytes, or ``None`` if the
+        output is not a file.
+        """
+
+        self.flush()
+        if self.stream.seekable():
+            return self.stream.tell()
+        return None
+
+
+class Checkpoint(object):
+    """Number of input records fully written to the output, and the size of
+    the output in bytes at that point.
+
+    Stored in a file, which is replaced atomically on every save.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.position = 0
+        self.offset = None
+        if path and os.path.exists(path):
+            with open(path, 'r') as fp:
+                try:
+                    data = json.load(fp)
+                    self.position = int(data['position'])
+                    if data.get('offset') is not None:
+                        self.offset = int(data['offset'])
+                except (ValueError, KeyError, TypeError, AttributeError):
+                    raise CommandError('invalid checkpoint file %s' % (path))
+
+    def save(self, position, offset=None):
+        self.position = position
+        self.offset = offset
+        if not self.path:
+            return
+
+        temporary_path = '%s.tmp' % (self.path)
+        with open(temporary_path, 'w') as fp:
+            json.dump({'position': position, 'offset': offset}, fp)
+        os.replace(temporary_path, self.path)
+
+    def clear(self):
+        if self.path and os.path.exists(self.path):
+            os.remove(self.path)
+
+
+class Progress(object):
+    """Live throughput and outcome summary written to a stream.
+    """
+
+    def __init__(self, stream, interval=1.0):
+        self.stream = stream
+        self.interval = interval
+        self.started = time.monotonic()
+        self.reported = self.started
+        self.processed = 0
+        self.outcomes = {}
+
+    def update(self, outcome):
+        self.processed += 1
+        self.outcomes[outcome] = self.outcomes.get(outcome, 0) + 1
+
+        now = time.monotonic()
+        if self.stream is not None and now - self.reported >= self.interval:
+            self.reported = now
+            self.report()
+
+    def format(self):
+        elapsed = time.monotonic() - self.started
+        return '%d records in %.1f s (%.1f/s): %s' % (
+            self.processed,
+            elapsed,
+            self.processed / elapsed if elapsed else 0.0,
+            ', '.join('%s %d' % (outcome, count)
+                      for outcome, count in sorted(self.outcomes.items())),
+        )
+
+    def report(self):
+        if self.stream is not None:
+            self.stream.write(self.format() + '\n')
+            self.stream.flush()
+
+
+def _format_validity(is_valid):
+    if is_valid is None:
+        return 'unknown'
+    return 'valid' if is_valid else 'invalid'
+
+
+def _check_records(records, arguments, position):
+    """Add VAT number check results to records.
+    """
+
+    def normalize(record):
+        vat_number = record.get(arguments.column) or ''
+        country_code = record.get(arguments.country_column) or None \
+            if arguments.country_column else None
+        return (vat_number, country_code)
+
+    def add_result(record, result):
+        vat_number, country_code = normalize(record)
+        normalized_vat_number, normalized_country_code = \
+            decompose_vat_number(vat_number, country_code) \
+            if vat_number else (None, None)
+
+        record = dict(record)
+        record['normalized_vat_number'] = normalized_vat_number
+        record['normalized_country_code'] = normalized_country_code
+        record['format_valid'] = bool(vat_number) and \
+            is_vat_number_format_valid(vat_number, country_code)
+        record['is_valid'] = result.is_valid if result is not None else None
+        record['business_name'] = \
+            result.business_name if result is not None else None
+        record['business_address'] = \
+            result.business_address if result is not None else None
+        return record
+
+    if arguments.format_only:
+        for record in records:
+            record = add_result(record, None)
+            yield record, 'valid format' if record['format_valid'] \
+                else 'invalid format'
+        return
+
+    results = check_vat_numbers(records,
+                                max_in_flight=arguments.concurrency,
+                                ordered=True,
+                                test=arguments.test,
+                                key=normalize)
+    for record, result in results:
+        yield add_result(record, result), _format_validity(result.is_valid)
+
+
+def _parse_ledger_record(record, line_number):
+    try:
+        item_type = record['item_type']
+        try:
+            item_type = ItemType(int(item_type))
+        except ValueError:
+            item_type = ItemType[item_type]
+
+        return (
+            datetime.datetime.strptime(str(record['date']), '%Y-%m-%d').date(),
+            item_type,
+            record['buyer_country_code'],
+            str(record['buyer_is_business']).lower() in TRUE_STRINGS,
+            record['seller_country_code'],
+            str(record['seller_is_business']).lower() in TRUE_STRINGS,
+            record.get('postal_code') or None,
+        )
+    except (KeyError, ValueError) as exc:
+        raise CommandError('invalid ledger record %d: %r' % (line_number, exc))
+
+
+def _charge_records(records, arguments, position):
+    """Add VAT charges to ledger records.
+    """
+
+    records = iter(records)
+    while True:
+        chunk = list(itertools.islice(records, CHARGE_CHUNK_SIZE))
+        if not chunk:
+            return
+
+        rows = [_parse_ledger_record(record, position + index + 1)
+                for index, record in enumerate(chunk)]
+        position += len(chunk)
+        result = get_sale_vat_charges(*zip(*rows), errors='mark')
+
+        for record, charge in zip(chunk, result.charges):
+            record = dict(record)
+            if charge is None:
+                record['charge_action'] = 'unsupported'
+                record['charge_country_code'] = None
+                record['charge_rate'] = None
+                outcome = 'unsupported'
+            else:
+                record['charge_action'] = charge.action.name
+                record['charge_country_code'] = charge.country_code
+                record['charge_rate'] = str(charge.rate)
+                outcome = charge.action.name
+            yield record, outcome
+
+
+def _save_checkpoint(checkpoint, position, writer):
+    """Save a checkpoint of the records written so far.
+
+    The previous checkpoint is kept if the output cannot be flushed, e.g.
+    because it is broken, so that the original error is not masked.
+    """
+
+    try:
+        offset = writer.tell()
+    except (OSError, ValueError):
+        return
+    checkpoint.save(position, offset)
+
+
+def _run(arguments, process):
+    input_format = _get_format(arguments.input, arguments.format)
+    output_format = _get_format(arguments.output, arguments.output_format or
+                                input_format)
+    checkpoint = Checkpoint(arguments.checkpoint)
+    resume = checkpoint.position > 0
+
+    if resume and (not arguments.output or arguments.output == '-'):
+        raise CommandError('resuming from a checkpoint requires --output')
+
+    if resume and checkpoint.offset is not None and (
+            not os.path.exists(arguments.output) or
+            os.path.getsize(arguments.output) < checkpoint.offset):
+        raise CommandError('output file %s is shorter than its checkpoint'
+                           % (arguments.output))
+
+    if arguments.input == '-':
+        input_stream = sys.stdin
+    else:
+        input_stream = io.open(arguments.input, 'r', newline='',
+                               encoding='utf-8')
+
+    if not arguments.output or arguments.output == '-':
+        output_stream = sys.stdout
+    else:
+        output_stream = io.open(arguments.output, 'a' if resume else 'w',
+                                newline='', encoding='utf-8')
+        if resume and checkpoint.offset is not None:
+            # Drop rows written after the checkpoint was saved, e.g. before
+            # the process was killed, so that they are not written twice.
+            output_stream.truncate(checkpoint.offset)
+            output_stream.seek(checkpoint.offset)
+
+    progress = Progress(None if arguments.quiet else sys.stderr,
+                        arguments.progress_interval)
+    writer = RecordWriter(output_stream, output_format, not resume)
+    position = checkpoint.position
+
+    try:
+        records = itertools.islice(_read_records(input_stream, input_format),
+                                   position,
+                                   None)
+        for record, outcome in process(records, arguments, position):
+            writer.write(record)
+            position += 1
+            progress.update(outcome)
+            if position % arguments.checkpoint_interval == 0:
+                checkpoint.save(position, writer.tell())
+
+        writer.flush()
+        checkpoint.clear()
+    except KeyboardInterrupt:
+        _save_checkpoint(checkpoint, position, writer)
+        progress.report()
+        return 130
+    except BaseException:
+        _save_checkpoint(checkpoint, position, writer)
+        raise
+    finally:
+        if input_stream is not sys.stdin:
+            input_stream.close()
+        if output_stream is not sys.stdout:
+            output_stream.close()
+
+    progress.report()
+    return 0
+
+
+def get_argument_parser():
+    """Get the command line argument parser.
+
+    :rtype: argparse.ArgumentParser
+    """
+
+    parser = argparse.ArgumentParser(
+        prog='python -m pyvat',
+        description='Bulk VAT number validation, VAT charge computation and a '
+                    'local HTTP server.'
+    )
+    parser.add_argument('--version', action='version', version=__version__)
+    commands = parser.add_subparsers(dest='command')
+    commands.required = True
+
+    def add_io_arguments(command):
+        command.add_argument('input', nargs='?', default='-',
+                             help='CSV or JSON lines input file, or - for '
+                                  'standard input (default)')
+        command.add_argument('-o', '--output',
+                             help='output file, or - for standard output '
+                                  '(default)')
+        command.add_argument('-f', '--format', choices=('csv', 'jsonl'),
+                             help='input format (default: by file '
+                                  'extension, otherwise csv)')
+        command.add_argument('--output-format', choices=('csv', 'jsonl'),
+                             help='output format (default: input format)')
+        command.add_argument('--checkpoint',
+                             help='checkpoint file for resuming after '
+                                  'interruption')
+        command.add_argument('--checkpoint-interval', type=int, default=100,
+                             help='records between checkpoints '
+                                  '(default: %(default)s)')
+        command.add_argument('--progress-interval', type=float, default=5.0,
+                             help='seconds between progress reports '
+                                  '(default: %(default)s)')
+        command.add_argument('-q', '--quiet', action='store_true',
+                             help='do not report progress')
+
+    check = commands.add_parser('check', help='validate VAT numbers')
+    add_io_arguments(check)
+    check.add_argument('--column', default='vat_number',
+                       help='VAT number column or key '
+                            '(default: %(default)s)')
+    check.add_argument('--country-column',
+                       help='optional country code column or key')
+    check.add_argument('-j', '--concurrency', type=int,
+                       default=DEFAULT_MAX_IN_FLIGHT,
+                       help='maximum concurrent registry checks '
+                            '(default: %(default)s)')
+    check.add_argument('--format-only', action='store_true',
+                       help='only check VAT number formats locally')
+    check.add_argument('--test', action='store_true',
+                       help='check against test registries')
+    check.set_defaults(process=_check_records)
+
+    charge = commands.add_parser('charge',
+                                 help='compute VAT charges of a ledger')
+    add_io_arguments(charge)
+    charge.set_defaults(process=_charge_records)
+
+    serve = commands.add_parser('serve',
+                                help='run the local HTTP server')
+    serve.add_argument('--host', default=DEFAULT_HOST,
+                       help='address to listen on (default: %(default)s)')
+    serve.add_argument('--port', type=int, default=DEFAULT_PORT,
+                       help='port to listen on (default: %(default)s)')
+    serve.add_argument('-j', '--concurrency', type=int,
+                       default=DEFAULT_POOL_SIZE,
+                       help='maximum concurrent registry checks '
+                            '(default: %(default)s)')
+    serve.add_argument('--cache-size', type=int, default=65536,
+                       help='maximum number of cached check results '
+                            '(default: %(default)s)')
+    serve.add_argument('--cache-ttl', type=float, default=DEFAULT_CACHE_TTL,
+                       help='seconds check results are cached for '
+                            '(default: %(default)s)')
+    serve.add_argument('--warm-up', action='store_true',
+                       help='connect to the registries and authenticate '
+                            'before serving, reporting on stderr')
+    serve.set_defaults(process=None)
+
+    return parser
+
+
+def main(argv=None):
+    """Run the command line interface.
+
+    :param argv: Command line arguments. Default ``None`` using ``sys.argv``.
+    :returns: the exit status.
+    :rtype: int
+    """
+
+    parser = get_argument_parser()
+    arguments = parser.parse_args(argv)
+
+    if getattr(arguments, 'concurrency', 1) < 1:
+        parser.error('--concurrency must be at least 1')
+
+    if arguments.process is None:
+        if arguments.warm_up:
+            report = warm_up(connections=min(arguments.concurrency, 8))
+            sys.stderr.write('%s\n' % (report.format()))
+        serve(arguments.host,
+              arguments.port,
+              max_workers=arguments.concurrency,
+              cache_size=arguments.cache_size,
+              cache_ttl=arguments.cache_ttl)
+        return 0
+
+    if arguments.checkpoint_interval < 1:
+        parser.error('--checkpoint-interval must be at least 1')
+
+    try:
+        return _run(arguments, arguments.process)
+    except CommandError as exc:
+        sys.stderr.write('error: %s\n' % (exc))
+        return 1
+
+
+__all__ = (
+    'get_argument_parser',
+    'main',
+)
@@ -0,0 +1,369 @@
+import bisect
+import datetime
+import threading
+
+from . import get_sale_vat_charge as get_rules_sale_vat_charge
+from .item_type import ItemType
+from .party import Party
+from .rate_tables import get_rate_snapshot
+from .vat_rules import VAT_RULES, JANUARY_1_2015
+
+
+UNSUPPORTED = object()
+"""Table marker for sales for which the VAT rules cannot determine a charge.
+"""
+
+
+def get_era_boundaries(snapshot=None):
+    """Get the sale dates at which the outcome of the VAT rules may change.
+
+    The VAT rules are assumed to give the same result for all dates between
+    two consecutive boundaries. Used for grouping sales regardless of their
+    countries.
+
+    :param snapshot:
+        Rate snapshot. Default ``None`` using the active snapshot.
+    :type snapshot: pyvat.rate_tables.RateSnapshot
+    :returns: the dates in ascending order.
+    :rtype: tuple
+    """
+
+    if snapshot is None:
+        snapshot = get_rate_snapshot()
+
+    return tuple(sorted(set((JANUARY_1_2015,) + snapshot.boundaries)))
+
+
+def get_era(date, boundaries):
+    """Get the era of a sale date.
+
+    :param date: Sale date.
+    :type date: datetime.date
+    :param boundaries: Era boundaries in ascending order.
+    :type boundaries: tuple
+    :returns: the index of the era in which the date falls.
+    :rtype: int
+    """
+
+    return bisect.bisect_right(boundaries, date)
+
+
+def get_era_dates(era, boundaries):
+    """Get the first and last date of an era.
+
+    :param era: Era index.
+    :type era: int
+    :param boundaries: Era boundaries in ascending order.
+    :type boundaries: tuple
+    :returns:
+        a :class:`tuple` containing the first and last date of the era.
+    """
+
+    if era == 0:
+        first = datetime.date.min
+    else:
+        first = boundaries[era - 1]
+
+    if era < len(boundaries):
+        last = boundaries[era] - datetime.timedelta(days=1)
+    else:
+        last = datetime.date.max
+
+    return first, last
+
+
+class CompiledVatRules(object):
+    """VAT rules evaluated into a flat decision table.
+
+    The table is keyed by buyer country, seller country, buyer and seller
+    business flags, item type and date era. Eras are delimited by
+    :data:`pyvat.vat_rules.JANUARY_1_2015` and the dates at which the rates
+    of the buyer's or seller's country changed. Sales whose buyer or seller
+    country has no VAT rules, as well as sales with a postal code in a
+    region of the buyer's country with special VAT rates, fall back to
+    evaluating the VAT rules.
+
+    Charges returned from the table are immutable :class:`pyvat.VatCharge`
+    instances shared between calls.
+
+    :ivar etag:
+        ETag of the :class:`pyvat.rate_tables.RateSnapshot` the table was
+        compiled from.
+    :type etag: str
+    :ivar table: Decision table.
+    :type table: dict
+    :ivar boundaries:
+        Era boundaries by ``(buyer country, seller country)`` tuples.
+    :type boundaries: dict
+    :ivar postal_code_countries:
+        Countries whose VAT rates depend on the buyer's postal code.
+    :type postal_code_countries: frozenset
+    :ivar postal_code_regions:
+        Region indexes by country as returned by
+        :func:`get_postal_code_regions`.
+    :type postal_code_regions: dict
+    """
+
+    def __init__(self):
+        snapshot = get_rate_snapshot()
+
+        self.etag = snapshot.etag
+        self.table = {}
+        self.boundaries = {}
+        self.postal_code_regions = get_postal_code_regions(snapshot)
+        self.postal_code_countries = frozenset(self.postal_code_regions)
+
+        country_boundaries = dict(
+            (country_code, snapshot.get_boundaries(country_code))
+            for country_code in VAT_RULES
+        )
+
+        for buyer_country_code in sorted(VAT_RULES):
+            for seller_country_code in sorted(VAT_RULES):
+                boundaries = tuple(sorted(
+                    set([JANUARY_1_2015]) |
+                    country_boundaries[buyer_country_code] |
+                    country_boundaries[seller_country_code]
+                ))
+                self.boundaries[(buyer_country_code,
+                                 seller_country_code)] = boundaries
+
+                for era in range(len(boundaries) + 1):
+                    date = get_era_dates(era, boundaries)[0]
+                    for buyer_is_business in (False, True):
+                        for seller_is_business in (False, True):
+                            for item_type in ItemType:
+                                key = (buyer_country_code,
+                                       seller_country_code,
+                                       buyer_is_business,
+                                       seller_is_business,
+                                       item_type,
+                                       era)
+                                self.table[key] = self._evaluate(key, date)
+
+    def _evaluate(self, key, date):
+        buyer = Party(key[0], key[2])
+        seller = Party(key[1], key[3])
+
+        try:
+            return get_rules_sale_vat_charge(date, key[4], buyer, seller)
+        except NotImplementedError:
+            return UNSUPPORTED
+
+    def get_sale_vat_charge(self,
+                            date,
+                            item_type,
+                            buyer,
+                            seller,
+                            postal_code=None):
+        """Get the VAT charge for performing the sale of an item.
+
+        Equivalent to :func:`pyvat.get_sale_vat_charge`.
+
+        :param date: Sale date.
+        :type date: datetime.date
+        :param item_type: Type of the item being sold.
+        :type item_type: ItemType
+        :param buyer: Buyer.
+        :type buyer: Party
+        :param seller: Seller.
+        :type seller: Party
+        :param postal_code:
+            Postal code of the buyer's location, used for region-specific VAT
+            rates.
+        :type postal_code: str
+        :rtype: VatCharge
+        """
+
+        boundaries = self.boundaries.get((buyer.country_code,
+                                          seller.country_code))
+
+        # The postal code is the buyer's, so only regions of the buyer's
+        # country can make the charge deviate from the table.
+        if boundaries is None or \
+                get_region_key(self.postal_code_regions,
+                               buyer.country_code,
+                               postal_code) is not None:
+            charge = None
+        else:
+            charge = self.table.get((buyer.country_code,
+                                     seller.country_code,
+                                     bool(buyer.is_business),
+                                     bool(seller.is_business),
+                                     item_type,
+                                     bisect.bisect_right(boundaries, date)))
+
+        if charge is None or charge is UNSUPPORTED:
+            return get_rules_sale_vat_charge(date,
+                                             item_type,
+                                             buyer,
+                                             seller,
+                                             postal_code)
+
+        return charge
+
+    def verify(self):
+        """Verify the table against the VAT rules.
+
+        Every table entry is compared to the charge determined by the VAT
+        rules on the first and last day of its era.
+
+        :returns:
+            a :class:`list` of ``(key, date, expected, actual)`` tuples for
+            each mismatch, where ``expected`` and ``actual`` are either
+            :class:`VatCharge` instances or :data:`UNSUPPORTED`.
+        """
+
+        mismatches = []
+
+        for key, actual in self.table.items():
+            for date in get_era_dates(key[5], self.boundaries[key[0:2]]):
+                expected = self._evaluate(key, date)
+                if not _charges_equal(expected, actual):
+                    mismatches.append((key, date, expected, actual))
+
+        return mismatches
+
+    def __len__(self):
+        return len(self.table)
+
+
+def get_postal_code_regions(snapshot=None):
+    """Get the region indexes of countries whose VAT rates depend on the
+    buyer's postal code.
+
+    :param snapshot:
+        Rate snapshot. Default ``None`` using the active snapshot.
+    :type snapshot: pyvat.rate_tables.RateSnapshot
+    :returns:
+        a :class:`dict` mapping country codes to
+        :class:`pyvat.regions.RegionIndex` instances, or to ``None`` for
+        countries whose VAT rules depend on the postal code in other ways.
+    """
+
+    if snapshot is None:
+        snapshot = get_rate_snapshot()
+
+    regions = dict(
+        (country_code, getattr(rules, 'regions', None))
+        for country_code, rules in VAT_RULES.items()
+        if getattr(rules, 'postal_code_dependent', False) or
+        getattr(rules, 'regions', None) is not None
+    )
+    for country_code in snapshot.postal_code_countries:
+        regions[country_code] = snapshot.tables[country_code].regions
+    return regions
+
+
+def get_region_key(postal_code_regions, country_code, postal_code):
+    """Get the part of a postal code that determines the VAT rates of a
+    country.
+
+    :param postal_code_regions:
+        Region indexes by country as returned by
+        :func:`get_postal_code_regions`.
+    :type postal_code_regions: dict
+    :param country_code: ISO 3166-1 alpha-2 country code.
+    :type country_code: str
+    :param postal_code: Postal code of the buyer's location.
+    :type postal_code: str
+    :returns:
+        ``None`` if the postal code does not affect the VAT rates, the
+        :class:`pyvat.regions.Region` of the postal code, or the postal code
+        itself for countries without a region index.
+    """
+
+    if postal_code is None or country_code not in postal_code_regions:
+        return None
+
+    regions = postal_code_regions[country_code]
+    if regions is None:
+        return postal_code
+    return regions.resolve(postal_code)
+
+
+def _charges_equal(a, b):
+    if a is UNSUPPORTED or b is UNSUPPORTED:
+        return a is b
+
+    return (a.action, a.country_code, a.rate) == \
+        (b.action, b.country_code, b.rate)
+
+
+_compiled_vat_rules = None
+_compile_lock = threading.Lock()
+
+
+def compile_vat_rules():
+    """Compile the VAT rules into a decision table.
+
+    The compiled table replaces the one used by :func:`get_sale_vat_charge`.
+    Must be called after modifying :data:`pyvat.vat_rules.VAT_RULES`. The
+    table is recompiled automatically after a new rate snapshot is installed.
+
+    :rtype: CompiledVatRules
+    """
+
+    global _compiled_vat_rules
+
+    _compiled_vat_rules = CompiledVatRules()
+    return _compiled_vat_rules
+
+
+def get_compiled_vat_rules():
+    """Get the compiled VAT rules.
+
+    The VAT rules are compiled on first use and whenever the ETag of the
+    active rate snapshot changed since they were last compiled. Compiling the
+    table of about 200,000 entries takes around two seconds.
+
+    :rtype: CompiledVatRules
+    """
+
+    compiled = _compiled_vat_rules
+    if compiled is None or compiled.etag != get_rate_snapshot().etag:
+        with _compile_lock:
+            compiled = _compiled_vat_rules
+            if compiled is None or \
+                    compiled.etag != get_rate_snapshot().etag:
+                compiled = compile_vat_rules()
+    return compiled
+
+
+def get_sale_vat_charge(date, item_type, buyer, seller, postal_code=None):
+    """Get the VAT charge for performing the sale of an item.
+
+    Equivalent to :func:`pyvat.get_sale_vat_charge`, but looks the charge up
+    in the compiled VAT rules. The returned charge is shared between calls.
+
+    :param date: Sale date.
+    :type date: datetime.date
+    :param item_type: Type of the item being sold.
+    :type item_type: ItemType
+    :param buyer: Buyer.
+    :type buyer: Party
+    :param seller: Seller.
+    :type seller: Party
+    :param postal_code:
+        Postal code of the buyer's location, used for region-specific VAT
+        rates.
+    :type postal_code: str
+    :rtype: VatCharge
+    """
+
+    return get_compiled_vat_rules().get_sale_vat_charge(date,
+                                                        item_type,
+                                                        buyer,
+                                                        seller,
+                                                        postal_code)
+
+
+__all__ = (
+    'CompiledVatRules',
+    'compile_vat_rules',
+    'get_compiled_vat_rules',
+    'get_era_boundaries',
+    'get_postal_code_regions',
+    'get_region_key',
+    'get_sale_vat_charge',
+)
@@ -2,3 +2,7 @@ class ServerError(Exception):
     def __init__(self, fault_code):
         super(ServerError, self).__init__("ServerError: {}".format(fault_code))
         self.fault_code = fault_code
+
+
+class TransportTimeout(Exception):
+    """Raised by transports when an HTTP request times out."""
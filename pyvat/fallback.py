@@ -0,0 +1,160 @@
+import time
+
+from .memo import MemoCache
+from .registries import Registry
+from .result import VatNumberCheckResult
+
+
+DEFAULT_MAX_STALENESS = 7 * 86400.0
+"""Default maximum age in seconds of results used as fallback.
+"""
+
+
+class MemoryResultStore(object):
+    """Size-bounded in-process store of the last definitive check results.
+
+    Stores have the same interface as
+    :class:`pyvat.shared_cache.SharedCheckCache`, which can be used to share
+    the results between processes.
+    """
+
+    def __init__(self, maxsize=65536):
+        self._cache = MemoCache(maxsize)
+
+    def get(self, vat_number, country_code):
+        """Get the last definitive result of a VAT number.
+
+        :param vat_number: Normalized VAT number without country code prefix.
+        :param country_code: ISO 3166-1 alpha-2 country code.
+        :returns:
+            a :class:`tuple` containing whether the VAT number is valid and
+            the UNIX time it was checked at, or ``None``.
+        """
+
+        return self._cache.get((vat_number, country_code))
+
+    def set(self, vat_number, country_code, is_valid, checked_at=None):
+        """Store the definitive result of a VAT number.
+
+        :param vat_number: Normalized VAT number without country code prefix.
+        :param country_code: ISO 3166-1 alpha-2 country code.
+        :param is_valid: Whether the VAT number is valid.
+        :type is_valid: bool
+        :param checked_at:
+            UNIX time the VAT number was checked at. Default ``None`` for now.
+        """
+
+        if checked_at is None:
+            checked_at = time.time()
+        self._cache.set((vat_number, country_code), (is_valid, checked_at))
+
+
+class FallbackCheckResult(VatNumberCheckResult):
+    """Last known definitive result of a VAT number returned in place of a
+    failed check.
+
+    :ivar checked_at: UNIX time of the definitive check.
+    :ivar age: Age of the definitive check in seconds.
+    :ivar live_error: Reason the live check failed.
+    """
+
+    def __init__(self, is_valid, log_lines, checked_at, age, live_error):
+        super(FallbackCheckResult, self).__init__(is_valid, log_lines)
+        self.checked_at = checked_at
+        self.age = age
+        self.live_error = live_error
+
+
+class FallbackRegistry(Registry):
+    """Registry falling back to the last known definitive result when the
+    live registry fails.
+
+    Live checks answered with a determined validity are stored. When the
+    live registry times out, faults or raises, the stored result is returned
+    as a :class:`FallbackCheckResult` if it is not older than the maximum
+    staleness for the country. Otherwise the failed live result is returned.
+
+    :ivar registry: Live registry.
+    :type registry: Registry
+    :ivar store: Store of definitive results.
+    :ivar max_staleness: Default maximum age in seconds of fallback results.
+    :type max_staleness: float
+    :ivar max_staleness_by_country:
+        Maximum ages in seconds of fallback results by country code,
+        overriding the default.
+    :type max_staleness_by_country: dict
+    """
+
+    def __init__(self,
+                 registry,
+                 store,
+                 max_staleness=DEFAULT_MAX_STALENESS,
+                 max_staleness_by_country=None,
+                 clock=time.time):
+        """Initialize a fallback registry.
+
+        :param registry: Live registry.
+        :param store:
+            Store of definitive results, e.g. a :class:`MemoryResultStore`.
+        :param max_staleness:
+            Default maximum age in seconds of fallback results.
+        :param max_staleness_by_country:
+            Optional maximum ages in seconds by country code. A maximum of
+            ``0`` disables the fallback for a country.
+        :param clock: Function returning the current UNIX time.
+        """
+
+        self.registry = registry
+        self.store = store
+        self.max_staleness = max_staleness
+        self.max_staleness_by_country = dict(max_staleness_by_country or {})
+        self.clock = clock
+
+    def check_vat_number(self, vat_number, country_code, test):
+        try:
+            result = self.registry.check_vat_number(vat_number,
+                                                    country_code,
+                                                    test)
+        except Exception as exception:
+            result = VatNumberCheckResult(
+                log_lines=[u'< Check failed with exception: %r' %
+                           (exception)],
+                error=u'check failed: %r' % (exception)
+            )
+
+        if result.error is None and result.is_valid is not None:
+            self.store.set(vat_number, country_code, result.is_valid,
+                           self.clock())
+            return result
+
+        stored = self.store.get(vat_number, country_code)
+        if stored is None:
+            result.log_lines.append(u'> No stored result to fall back to')
+            return result
+
+        is_valid, checked_at = stored
+        age = self.clock() - checked_at
+        max_staleness = self.max_staleness_by_country.get(country_code,
+                                                          self.max_staleness)
+        if max_staleness <= 0 or age > max_staleness:
+            result.log_lines.append(u'> Stored result of %d seconds ago is '
+                                    u'too stale to fall back to' % (age))
+            return result
+
+        live_error = result.error or u'undetermined validity'
+        return FallbackCheckResult(
+            is_valid,
+            result.log_lines + [u'> Falling back to stored result of %d '
+                                u'seconds ago as the live check failed: %s' %
+                                (age, live_error)],
+            checked_at,
+            age,
+            live_error,
+        )
+
+
+__all__ = (
+    'FallbackCheckResult',
+    'FallbackRegistry',
+    'MemoryResultStore',
+)
@@ -0,0 +1,174 @@
+import threading
+import time
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    Future,
+    ThreadPoolExecutor,
+    wait,
+)
+
+from .latency import LatencyTracker
+from .registries import Registry
+from .transports import DEFAULT_POOL_SIZE
+
+
+MAX_HEDGE_BUDGET = 10.0
+"""Maximum number of hedged requests that can be saved up for a burst.
+"""
+
+
+class HedgedRegistry(Registry):
+    """Registry hedging slow checks with a second identical check.
+
+    If a check has not answered within a percentile of recently observed
+    latencies, a second identical check is started and whichever answers
+    first is used. Checks answered with an error wait for the other check.
+    The fraction of hedged checks is capped.
+
+    Checks that cannot be hedged, e.g. before enough latencies are observed
+    or while the hedge budget is used up, run on the calling thread. Other
+    checks run on a shared thread pool, so that the calling thread can
+    return the answer of a hedged check first.
+
+    :ivar registry: Registry checked.
+    :type registry: Registry
+    :ivar percentile: Latency percentile after which checks are hedged.
+    :type percentile: float
+    :ivar max_hedge_ratio: Maximum fraction of hedged checks.
+    :type max_hedge_ratio: float
+    :ivar min_samples:
+        Minimum number of observed latencies before checks are hedged.
+    :type min_samples: int
+    :ivar latencies: Recently observed latencies.
+    :type latencies: LatencyTracker
+    """
+
+    def __init__(self,
+                 registry,
+                 percentile=90.0,
+                 max_hedge_ratio=0.1,
+                 min_samples=20,
+                 latencies=None,
+                 max_workers=DEFAULT_POOL_SIZE):
+        """Initialize a hedged registry.
+
+        :param registry: Registry to check, e.g. a :class:`ViesRegistry`.
+        :param percentile: Latency percentile after which checks are hedged.
+        :param max_hedge_ratio: Maximum fraction of hedged checks.
+        :param min_samples:
+            Minimum number of observed latencies before checks are hedged.
+        :param latencies:
+            Optional :class:`LatencyTracker` to share with other components.
+        :param max_workers:
+            Maximum number of threads running checks that may be hedged.
+        """
+
+        if not 0 <= max_hedge_ratio <= 1:
+            raise ValueError('max_hedge_ratio must be between 0 and 1')
+
+        self.registry = registry
+        self.percentile = percentile
+        self.max_hedge_ratio = max_hedge_ratio
+        self.min_samples = min_samples
+        self.latencies = latencies or LatencyTracker()
+        self.max_workers = max_workers
+        self._lock = threading.Lock()
+        self._executor = None
+        self._hedge_budget = 1.0
+        self._checks = 0
+        self._hedges = 0
+
+    @property
+    def hedge_ratio(self):
+        """Fraction of checks hedged so far.
+
+        :rtype: float
+        """
+
+        return self._hedges / float(self._checks) if self._checks else 0.0
+
+    def _check(self, vat_number, country_code, test):
+        started = time.monotonic()
+        try:
+            return self.registry.check_vat_number(vat_number,
+                                                  country_code,
+                                                  test)
+        finally:
+            self.latencies.record(time.monotonic() - started)
+
+    def _start_primary_check(self, vat_number, country_code, test):
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    self.max_workers,
+                    thread_name_prefix='pyvat-hedged-check'
+                )
+        return self._executor.submit(self._check,
+                                     vat_number,
+                                     country_code,
+                                     test)
+
+    def _start_hedge_check(self, vat_number, country_code, test):
+        """Start a hedged check in a thread of its own.
+
+        A thread pool could queue a hedged check behind the abandoned slow
+        checks it is meant to overtake.
+        """
+
+        future = Future()
+
+        def run():
+            try:
+                result = self._check(vat_number, country_code, test)
+            except Exception as exception:
+                future.set_exception(exception)
+            else:
+                future.set_result(result)
+
+        thread = threading.Thread(target=run, name='pyvat-hedge')
+        thread.daemon = True
+        thread.start()
+        return future
+
+    def _take_hedge(self):
+        with self._lock:
+            if self._hedge_budget < 1:
+                return False
+            self._hedge_budget -= 1
+            self._hedges += 1
+            return True
+
+    def check_vat_number(self, vat_number, country_code, test):
+        with self._lock:
+            self._checks += 1
+            self._hedge_budget = min(MAX_HEDGE_BUDGET,
+                                     self._hedge_budget +
+                                     self.max_hedge_ratio)
+            may_hedge = self._hedge_budget >= 1
+
+        delay = None
+        if may_hedge and len(self.latencies) >= self.min_samples:
+            delay = self.latencies.percentile(self.percentile)
+        if delay is None:
+            return self._check(vat_number, country_code, test)
+
+        primary = self._start_primary_check(vat_number, country_code, test)
+        if wait((primary, ), delay)[0] or not self._take_hedge():
+            return primary.result()
+
+        hedge = self._start_hedge_check(vat_number, country_code, test)
+        pending = set((primary, hedge))
+        while True:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None and \
+                        future.result().error is None:
+                    return future.result()
+            if not pending:
+                # Both failed, prefer the primary's answer.
+                return primary.result()
+
+
+__all__ = (
+    'HedgedRegistry',
+)
@@ -0,0 +1,161 @@
+from collections import namedtuple
+from decimal import ROUND_HALF_UP
+
+from . import get_sale_vat_charge
+from .amounts import PER_INVOICE, PER_LINE, ROUNDING_MODES, vat_amount
+
+
+InvoiceLine = namedtuple('InvoiceLine', ('item_type', 'net_amount'))
+"""Line of an invoice.
+
+:ivar item_type: Type of the item being sold.
+:ivar net_amount: Net amount in minor units, e.g. cents.
+"""
+
+InvoiceLineVat = namedtuple('InvoiceLineVat', ('item_type',
+                                               'net_amount',
+                                               'charge',
+                                               'vat_amount'))
+"""VAT of a line of an invoice.
+
+:ivar item_type: Type of the item being sold.
+:ivar net_amount: Net amount in minor units.
+:ivar charge: VAT charge of the line.
+:ivar vat_amount: VAT amount of the line in minor units, rounded per line.
+"""
+
+VatSubtotal = namedtuple('VatSubtotal', ('charge', 'net_amount', 'vat_amount'))
+"""VAT of the lines of an invoice sharing a VAT charge.
+
+:ivar charge: VAT charge.
+:ivar net_amount: Total net amount of the lines in minor units.
+:ivar vat_amount:
+    VAT amount of the lines in minor units, rounded according to the
+    aggregation policy.
+"""
+
+
+class InvoiceVat(object):
+    """VAT of an invoice.
+
+    :ivar lines: :class:`InvoiceLineVat` instances in the order of the lines.
+    :type lines: list
+    :ivar subtotals:
+        :class:`VatSubtotal` instances by VAT charge, in the order of their
+        first line.
+    :type subtotals: list
+    :ivar net_amount: Total net amount in minor units.
+    :type net_amount: int
+    :ivar vat_amount: Total VAT amount in minor units.
+    :type vat_amount: int
+    """
+
+    def __init__(self, lines, subtotals):
+        self.lines = lines
+        self.subtotals = subtotals
+        self.net_amount = sum(subtotal.net_amount for subtotal in subtotals)
+        self.vat_amount = sum(subtotal.vat_amount for subtotal in subtotals)
+
+    @property
+    def gross_amount(self):
+        """Total gross amount in minor units.
+
+        :rtype: int
+        """
+
+        return self.net_amount + self.vat_amount
+
+    def __repr__(self):
+        return '<pyvat.InvoiceVat: net amount = %d, VAT amount = %d>' % (
+            self.net_amount, self.vat_amount,
+        )
+
+
+def get_invoice_vat(date,
+                    buyer,
+                    seller,
+                    lines,
+                    postal_code=None,
+                    rounding=ROUND_HALF_UP,
+                    aggregation=PER_LINE):
+    """Get the VAT of an invoice.
+
+    The VAT charge is determined once for each item type on the invoice.
+
+    :param date: Sale date.
+    :type date: datetime.date
+    :param buyer: Buyer.
+    :type buyer: Party
+    :param seller: Seller.
+    :type seller: Party
+    :param lines:
+        Lines of the invoice as :class:`InvoiceLine` instances or
+        ``(item type, net amount)`` tuples.
+    :param postal_code:
+        Postal code of the buyer's location, used for region-specific VAT
+        rates.
+    :type postal_code: str
+    :param rounding:
+        Rounding mode, ``decimal.ROUND_HALF_UP`` or
+        ``decimal.ROUND_HALF_EVEN``. Default ``ROUND_HALF_UP``.
+    :param aggregation:
+        :data:`pyvat.amounts.PER_LINE` to sum the rounded VAT amounts of the
+        lines, or :data:`pyvat.amounts.PER_INVOICE` to round the VAT amount
+        of each subtotal once. Default :data:`pyvat.amounts.PER_LINE`.
+    :rtype: InvoiceVat
+    :raises NotImplementedError:
+        if the VAT charge of an item type cannot be determined.
+    """
+
+    if rounding not in ROUNDING_MODES:
+        raise ValueError('unsupported rounding mode %r' % (rounding))
+    if aggregation not in (PER_LINE, PER_INVOICE):
+        raise ValueError('unsupported aggregation %r' % (aggregation))
+
+    charges = {}
+    subtotal_amounts = {}
+    line_vats = []
+
+    for item_type, net_amount in lines:
+        try:
+            charge, basis_points = charges[item_type]
+        except KeyError:
+            charge = get_sale_vat_charge(date,
+                                         item_type,
+                                         buyer,
+                                         seller,
+                                         postal_code)
+            basis_points = charge.rate_basis_points
+            charges[item_type] = (charge, basis_points)
+
+        line_vat_amount = vat_amount(net_amount, basis_points, rounding)
+        line_vats.append(InvoiceLineVat(item_type,
+                                        net_amount,
+                                        charge,
+                                        line_vat_amount))
+
+        try:
+            amounts = subtotal_amounts[charge]
+        except KeyError:
+            amounts = subtotal_amounts[charge] = [0, 0]
+        amounts[0] += net_amount
+        amounts[1] += line_vat_amount
+
+    subtotals = []
+    for charge, (net_amount, line_vat_amount) in subtotal_amounts.items():
+        if aggregation == PER_INVOICE:
+            line_vat_amount = vat_amount(net_amount,
+                                         charge.rate_basis_points,
+                                         rounding)
+        subtotals.append(VatSubtotal(charge, net_amount, line_vat_amount))
+
+    return InvoiceVat(line_vats, subtotals)
+
+
+__all__ = (
+    'InvoiceLine',
+    'InvoiceLineVat',
+    'InvoiceVat',
+    'VatSubtotal',
+    'get_invoice_vat',
+)
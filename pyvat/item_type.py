@@ -45,15 +45,32 @@ class ItemType(Enum):
 
     @property
     def is_electronic_service(self):
-        return self in frozenset([ItemType.generic_electronic_service,
-                                  ItemType.ebook,
-                                  ItemType.enewspaper])
+        return self in ELECTRONIC_SERVICE_ITEM_TYPES
 
     @property
     def is_telecommunications_service(self):
-        return self in frozenset([ItemType.generic_telecommunications_service])
+        return self in TELECOMMUNICATIONS_SERVICE_ITEM_TYPES
 
     @property
     def is_broadcasting_service(self):
-        return self in frozenset([ItemType.generic_broadcasting_service,
-                                  ItemType.prepaid_broadcasting_service])
+        return self in BROADCASTING_SERVICE_ITEM_TYPES
+
+
+ELECTRONIC_SERVICE_ITEM_TYPES = frozenset([ItemType.generic_electronic_service,
+                                           ItemType.ebook,
+                                           ItemType.enewspaper])
+"""Item types that are electronic services.
+"""
+
+TELECOMMUNICATIONS_SERVICE_ITEM_TYPES = frozenset([
+    ItemType.generic_telecommunications_service,
+])
+"""Item types that are telecommunications services.
+"""
+
+BROADCASTING_SERVICE_ITEM_TYPES = frozenset([
+    ItemType.generic_broadcasting_service,
+    ItemType.prepaid_broadcasting_service,
+])
+"""Item types that are broadcasting services.
+"""
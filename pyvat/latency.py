@@ -0,0 +1,185 @@
+import math
+import threading
+from collections import deque, namedtuple
+
+
+class LatencyTracker(object):
+    """Thread-safe sliding window of recently observed latencies.
+
+    :ivar size: Maximum number of latencies held.
+    :type size: int
+    """
+
+    def __init__(self, size=256):
+        if size < 1:
+            raise ValueError('size must be at least 1')
+
+        self.size = size
+        self._latencies = deque(maxlen=size)
+        self._lock = threading.Lock()
+
+    def record(self, seconds):
+        """Record an observed latency.
+
+        :param seconds: Latency in seconds.
+        :type seconds: float
+        """
+
+        with self._lock:
+            self._latencies.append(seconds)
+
+    def percentile(self, percent):
+        """Get a percentile of the recorded latencies.
+
+        :param percent: Percentile between 0 and 100.
+        :type percent: float
+        :returns:
+            the nearest-rank percentile in seconds, or ``None`` if no
+            latencies were recorded.
+        :rtype: float
+        """
+
+        if not 0 <= percent <= 100:
+            raise ValueError('percent must be between 0 and 100')
+
+        with self._lock:
+            latencies = sorted(self._latencies)
+        if not latencies:
+            return None
+
+        rank = int(math.ceil(percent / 100.0 * len(latencies)))
+        return latencies[min(max(rank, 1), len(latencies)) - 1]
+
+    def __len__(self):
+        return len(self._latencies)
+
+
+TimeoutStats = namedtuple('TimeoutStats', ('connect_timeout',
+                                           'read_timeout',
+                                           'latency',
+                                           'samples'))
+"""Timeouts chosen for a key of :class:`AdaptiveTimeouts`.
+
+:ivar connect_timeout: Last chosen connect timeout in seconds.
+:ivar read_timeout: Last chosen read timeout in seconds.
+:ivar latency:
+    Latency percentile the timeouts were derived from, or ``None`` if too few
+    latencies were observed.
+:ivar samples: Number of observed latencies.
+"""
+
+
+class AdaptiveTimeouts(object):
+    """Timeouts derived from the recently observed latencies of each key,
+    e.g. the country of a registry check.
+
+    The read timeout is a percentile of the latencies times a factor, clamped
+    between a minimum and a maximum. Until enough latencies are observed, the
+    default timeout is used. The connect timeout is fixed, but never exceeds
+    the read timeout.
+
+    :ivar percentile: Latency percentile timeouts are derived from.
+    :type percentile: float
+    :ivar factor: Factor applied to the latency percentile.
+    :type factor: float
+    :ivar min_timeout: Minimum read timeout in seconds.
+    :type min_timeout: float
+    :ivar max_timeout:
+        Maximum read timeout in seconds, or ``None`` to use the default
+        timeout as the maximum.
+    :type max_timeout: float
+    :ivar connect_timeout: Connect timeout in seconds.
+    :type connect_timeout: float
+    :ivar min_samples:
+        Minimum number of observed latencies before timeouts are derived.
+    :type min_samples: int
+    """
+
+    def __init__(self,
+                 percentile=99.0,
+                 factor=2.0,
+                 min_timeout=0.5,
+                 max_timeout=None,
+                 connect_timeout=3.05,
+                 min_samples=20,
+                 size=256):
+        self.percentile = percentile
+        self.factor = factor
+        self.min_timeout = min_timeout
+        self.max_timeout = max_timeout
+        self.connect_timeout = connect_timeout
+        self.min_samples = min_samples
+        self.size = size
+        self._trackers = {}
+        self._chosen = {}
+        self._lock = threading.Lock()
+
+    def _get_tracker(self, key):
+        tracker = self._trackers.get(key)
+        if tracker is None:
+            with self._lock:
+                tracker = self._trackers.setdefault(key,
+                                                    LatencyTracker(self.size))
+        return tracker
+
+    def record(self, key, seconds):
+        """Record an observed latency.
+
+        Requests timing out should be recorded with the time they took, so
+        the timeouts grow for slow keys.
+
+        :param key: Key, e.g. a country code.
+        :param seconds: Latency in seconds.
+        :type seconds: float
+        """
+
+        self._get_tracker(key).record(seconds)
+
+    def get_timeout(self, key, default):
+        """Get the timeouts for a request.
+
+        :param key: Key, e.g. a country code.
+        :param default:
+            Read timeout in seconds used until enough latencies are observed,
+            and the maximum unless :attr:`max_timeout` is set.
+        :type default: float
+        :returns:
+            a :class:`tuple` containing the connect and read timeouts in
+            seconds, as accepted by :mod:`requests`.
+        """
+
+        tracker = self._get_tracker(key)
+        latency = None
+        read_timeout = default
+        if len(tracker) >= self.min_samples:
+            latency = tracker.percentile(self.percentile)
+            read_timeout = min(
+                self.max_timeout if self.max_timeout is not None else default,
+                max(self.min_timeout, latency * self.factor)
+            )
+
+        timeout = (min(self.connect_timeout, read_timeout), read_timeout)
+        self._chosen[key] = (timeout, latency)
+        return timeout
+
+    def get_stats(self):
+        """Get the last chosen timeouts for monitoring.
+
+        :returns:
+            a :class:`dict` mapping keys to :class:`TimeoutStats` instances.
+        """
+
+        return dict(
+            (key, TimeoutStats(timeout[0],
+                               timeout[1],
+                               latency,
+                               len(self._trackers[key])))
+            for key, (timeout, latency) in list(self._chosen.items())
+        )
+
+
+__all__ = (
+    'AdaptiveTimeouts',
+    'LatencyTracker',
+    'TimeoutStats',
+)
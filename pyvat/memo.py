@@ -0,0 +1,165 @@
+import threading
+from collections import OrderedDict, namedtuple
+
+
+MemoInfo = namedtuple('MemoInfo', ('hits', 'misses', 'maxsize', 'currsize'))
+"""Memoization statistics.
+
+:ivar hits: Number of lookups answered from the cache.
+:ivar misses: Number of lookups that had to be computed.
+:ivar maxsize: Maximum number of entries held by the cache.
+:ivar currsize: Number of entries currently held by the cache.
+"""
+
+
+class MemoCache(object):
+    """Size-bounded, thread-safe least recently used cache.
+
+    :ivar maxsize: Maximum number of entries held by the cache.
+    :type maxsize: int
+    """
+
+    def __init__(self, maxsize=4096):
+        if maxsize <= 0:
+            raise ValueError('maxsize must be a positive integer')
+
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+
+    def get(self, key, default=None):
+        """Get a cached value, recording a hit or a miss.
+
+        :param key: Cache key.
+        :param default: Value returned if the key is not cached.
+        """
+
+        with self._lock:
+            try:
+                value = self._entries[key]
+            except KeyError:
+                self._misses += 1
+                return default
+
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return value
+
+    def set(self, key, value):
+        """Cache a value, evicting the least recently used entry if full.
+
+        :param key: Cache key.
+        :param value: Value to cache.
+        """
+
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+
+            if len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        """Remove all entries and reset the statistics.
+        """
+
+        with self._lock:
+            self._entries.clear()
+            self._hits = 0
+            self._misses = 0
+
+    def info(self):
+        """Get the cache statistics.
+
+        :rtype: MemoInfo
+        """
+
+        with self._lock:
+            return MemoInfo(self._hits,
+                            self._misses,
+                            self.maxsize,
+                            len(self._entries))
+
+    def __len__(self):
+        return len(self._entries)
+
+
+DECOMPOSE_CACHE = None
+"""Memoization cache for :func:`pyvat.decompose_vat_number`.
+
+``None`` while memoization is disabled.
+"""
+
+FORMAT_CACHE = None
+"""Memoization cache for :func:`pyvat.is_vat_number_format_valid`.
+
+``None`` while memoization is disabled.
+"""
+
+
+def enable_memoization(maxsize=4096):
+    """Enable memoization of VAT number decomposition and format validation.
+
+    Results are keyed on the raw VAT number and the country code hint. Calling
+    this while memoization is already enabled replaces the caches.
+
+    :param maxsize: Maximum number of entries held by each cache.
+    :type maxsize: int
+    """
+
+    global DECOMPOSE_CACHE, FORMAT_CACHE
+
+    DECOMPOSE_CACHE = MemoCache(maxsize)
+    FORMAT_CACHE = MemoCache(maxsize)
+
+
+def disable_memoization():
+    """Disable memoization and drop the caches.
+    """
+
+    global DECOMPOSE_CACHE, FORMAT_CACHE
+
+    DECOMPOSE_CACHE = None
+    FORMAT_CACHE = None
+
+
+def clear_memoization():
+    """Clear the memoization caches.
+
+    Must be called after modifying :data:`pyvat.VAT_NUMBER_EXPRESSIONS` or
+    :data:`pyvat.VAT_REGISTRIES`, as cached results are not invalidated
+    automatically.
+    """
+
+    for cache in (DECOMPOSE_CACHE, FORMAT_CACHE):
+        if cache is not None:
+            cache.clear()
+
+
+def memoization_info():
+    """Get the memoization statistics.
+
+    :returns:
+        a :class:`dict` mapping ``'decompose'`` and ``'format'`` to
+        :class:`MemoInfo` instances, or ``None`` if memoization is disabled.
+    """
+
+    if DECOMPOSE_CACHE is None:
+        return None
+
+    return {
+        'decompose': DECOMPOSE_CACHE.info(),
+        'format': FORMAT_CACHE.info(),
+    }
+
+
+__all__ = (
+    'MemoCache',
+    'MemoInfo',
+    'enable_memoization',
+    'disable_memoization',
+    'clear_memoization',
+    'memoization_info',
+)
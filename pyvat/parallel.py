@@ -0,0 +1,314 @@
+import datetime
+import struct
+import time
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+from .batch import (
+    UNSUPPORTED_ACTION,
+    UNSUPPORTED_BASIS_POINTS,
+    get_sale_vat_charges,
+    to_columns,
+)
+from .item_type import ItemType
+from .rate_tables import (
+    get_rate_snapshot,
+    install_rate_snapshot,
+    parse_rate_data,
+)
+from .utils import basis_points_to_rate
+
+INPUT_RECORD = struct.Struct('<iB2s2sB12s')
+"""Layout of a ledger row in shared memory.
+
+Sale date ordinal, item type value, buyer country code, seller country code,
+flags and postal code. Country codes and postal codes are UTF-8 encoded and
+padded with null bytes.
+"""
+
+COUNTRY_CODE_SIZE = 2
+"""Maximum size of an encoded country code in bytes.
+"""
+
+POSTAL_CODE_SIZE = 12
+"""Maximum size of an encoded postal code in bytes.
+"""
+
+OUTPUT_RECORD = struct.Struct('<b2si')
+"""Layout of a VAT charge in shared memory.
+
+Action code, country code and rate in basis points.
+"""
+
+BUYER_IS_BUSINESS = 1
+SELLER_IS_BUSINESS = 2
+HAS_POSTAL_CODE = 4
+
+DEFAULT_CHUNK_SIZE = 50000
+"""Default number of ledger rows processed per task.
+"""
+
+
+class LedgerRatingResult(object):
+    """VAT charges of a re-rated ledger.
+
+    :ivar action_codes:
+        VAT charge action codes, i.e. :class:`pyvat.VatChargeAction` values or
+        :data:`pyvat.batch.UNSUPPORTED_ACTION`.
+    :type action_codes: array.array
+    :ivar country_codes:
+        Countries in which the actions apply or ``None`` for unsupported rows.
+    :type country_codes: list
+    :ivar rate_basis_points:
+        VAT rates in basis points or
+        :data:`pyvat.batch.UNSUPPORTED_BASIS_POINTS` for unsupported rows.
+    :type rate_basis_points: array.array
+    :ivar elapsed: Wall clock time spent re-rating in seconds.
+    :type elapsed: float
+    """
+
+    def __init__(self, action_codes, country_codes, rate_basis_points,
+                 elapsed):
+        self.action_codes = action_codes
+        self.country_codes = country_codes
+        self.rate_basis_points = rate_basis_points
+        self.elapsed = elapsed
+
+    @property
+    def rates(self):
+        """VAT rates in percent or ``None`` for unsupported rows.
+
+        :rtype: list
+        """
+
+        return [None if basis_points == UNSUPPORTED_BASIS_POINTS
+                else basis_points_to_rate(basis_points)
+                for basis_points in self.rate_basis_points]
+
+    @property
+    def rows_per_second(self):
+        """Re-rating throughput.
+
+        :rtype: float
+        """
+
+        if not self.elapsed:
+            return float('inf')
+        return len(self) / self.elapsed
+
+    def __len__(self):
+        return len(self.action_codes)
+
+
+def _encode_field(name, value, size):
+    """Encode a string field, ensuring that it fits its size in the input
+    record rather than being truncated.
+    """
+
+    encoded = value.encode('utf-8')
+    if len(encoded) > size:
+        raise ValueError('%s %r does not fit in %d bytes' % (name,
+                                                             value,
+                                                             size))
+    return encoded
+
+
+def _decode_field(value):
+    return value.rstrip(b'\0').decode('utf-8')
+
+
+def _encode_ledger(buffer, columns):
+    pack_into = INPUT_RECORD.pack_into
+    size = INPUT_RECORD.size
+
+    for index, (date, item_type, buyer_country_code, buyer_is_business,
+                seller_country_code, seller_is_business, postal_code) \
+            in enumerate(zip(*columns)):
+        flags = 0
+        if buyer_is_business:
+            flags |= BUYER_IS_BUSINESS
+        if seller_is_business:
+            flags |= SELLER_IS_BUSINESS
+        if postal_code is not None:
+            flags |= HAS_POSTAL_CODE
+            postal_code = _encode_field('postal code',
+                                        str(postal_code),
+                                        POSTAL_CODE_SIZE)
+        else:
+            postal_code = b''
+
+        if isinstance(item_type, ItemType):
+            item_type = item_type.value
+
+        pack_into(buffer, index * size,
+                  date.toordinal(),
+                  item_type,
+                  _encode_field('country code',
+                                buyer_country_code,
+                                COUNTRY_CODE_SIZE),
+                  _encode_field('country code',
+                                seller_country_code,
+                                COUNTRY_CODE_SIZE),
+                  flags,
+                  postal_code)
+
+
+def _initialize_worker(rate_data):
+    """Install the rate snapshot active in the parent process, which worker
+    processes do not inherit unless forked.
+    """
+
+    if rate_data is not None:
+        install_rate_snapshot(parse_rate_data(rate_data))
+
+
+def _rate_chunk(input_name, output_name, start, end):
+    input_memory = shared_memory.SharedMemory(name=input_name)
+    output_memory = shared_memory.SharedMemory(name=output_name)
+
+    view = input_memory.buf[start * INPUT_RECORD.size:
+                            end * INPUT_RECORD.size]
+
+    try:
+        columns = ([], [], [], [], [], [], [])
+        for (ordinal, item_type, buyer_country_code, seller_country_code,
+             flags, postal_code) in INPUT_RECORD.iter_unpack(view):
+            columns[0].append(datetime.date.fromordinal(ordinal))
+            columns[1].append(item_type)
+            columns[2].append(_decode_field(buyer_country_code))
+            columns[3].append(bool(flags & BUYER_IS_BUSINESS))
+            columns[4].append(_decode_field(seller_country_code))
+            columns[5].append(bool(flags & SELLER_IS_BUSINESS))
+            columns[6].append(_decode_field(postal_code)
+                              if flags & HAS_POSTAL_CODE else None)
+
+        result = get_sale_vat_charges(*columns, errors='mark')
+
+        pack_into = OUTPUT_RECORD.pack_into
+        size = OUTPUT_RECORD.size
+        for index, (action_code, country_code, basis_points) in enumerate(
+                zip(result.action_codes,
+                    result.country_codes,
+                    result.rate_basis_points),
+                start):
+            pack_into(output_memory.buf, index * size,
+                      action_code,
+                      country_code.encode('ascii') if country_code else b'',
+                      basis_points)
+
+        return end - start
+    finally:
+        view.release()
+        input_memory.close()
+        output_memory.close()
+
+
+def rate_ledger(dates,
+                item_types,
+                buyer_country_codes,
+                buyer_is_business,
+                seller_country_codes,
+                seller_is_business,
+                postal_codes=None,
+                processes=None,
+                chunk_size=DEFAULT_CHUNK_SIZE,
+                mp_context=None):
+    """Re-rate a ledger of sales on a process pool.
+
+    The ledger is encoded into a shared memory block, which worker processes
+    read in chunks, evaluating each with
+    :func:`pyvat.batch.get_sale_vat_charges`. The VAT charges are written to a
+    second shared memory block in ledger order. Columns are given as for
+    :func:`pyvat.batch.get_sale_vat_charges`. Rows for which no VAT charge
+    can be determined are marked as unsupported. The worker processes rate
+    against the rate snapshot active when called.
+
+    :param processes:
+        Number of worker processes. Default ``None`` using the number of
+        processors.
+    :param chunk_size: Number of ledger rows processed per task.
+    :param mp_context:
+        Multiprocessing context of the worker processes. Default ``None``
+        using the default start method.
+    :rtype: LedgerRatingResult
+    :raises ValueError:
+        if a country code or postal code does not fit the shared memory
+        layout, see :data:`COUNTRY_CODE_SIZE` and :data:`POSTAL_CODE_SIZE`.
+    """
+
+    started = time.time()
+
+    columns = to_columns(dates,
+                         item_types,
+                         buyer_country_codes,
+                         buyer_is_business,
+                         seller_country_codes,
+                         seller_is_business,
+                         postal_codes)
+    row_count = len(columns[0])
+
+    if not row_count:
+        return LedgerRatingResult(array('b'), [], array('l'),
+                                  time.time() - started)
+
+    input_memory = shared_memory.SharedMemory(
+        create=True, size=row_count * INPUT_RECORD.size
+    )
+    output_memory = shared_memory.SharedMemory(
+        create=True, size=row_count * OUTPUT_RECORD.size
+    )
+
+    try:
+        _encode_ledger(input_memory.buf, columns)
+
+        snapshot = get_rate_snapshot()
+        rate_data = None if snapshot is None else snapshot.to_data()
+        with ProcessPoolExecutor(processes,
+                                 mp_context=mp_context,
+                                 initializer=_initialize_worker,
+                                 initargs=(rate_data, )) as executor:
+            futures = [
+                executor.submit(_rate_chunk,
+                                input_memory.name,
+                                output_memory.name,
+                                start,
+                                min(start + chunk_size, row_count))
+                for start in range(0, row_count, chunk_size)
+            ]
+            for future in futures:
+                future.result()
+
+        action_codes = array('b')
+        country_codes = []
+        rate_basis_points = array('l')
+        view = output_memory.buf[:row_count * OUTPUT_RECORD.size]
+        try:
+            for action_code, country_code, basis_points in \
+                    OUTPUT_RECORD.iter_unpack(view):
+                action_codes.append(action_code)
+                rate_basis_points.append(basis_points)
+                if action_code == UNSUPPORTED_ACTION:
+                    country_codes.append(None)
+                else:
+                    country_codes.append(country_code.decode('ascii'))
+        finally:
+            view.release()
+    finally:
+        input_memory.close()
+        input_memory.unlink()
+        output_memory.close()
+        output_memory.unlink()
+
+    return LedgerRatingResult(action_codes,
+                              country_codes,
+                              rate_basis_points,
+                              time.time() - started)
+
+
+__all__ = (
+    'COUNTRY_CODE_SIZE',
+    'LedgerRatingResult',
+    'POSTAL_CODE_SIZE',
+    'rate_ledger',
+)
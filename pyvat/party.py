@@ -2,7 +2,7 @@ class Party(object):
     """Trading party.
 
     Represents either a consumer or business in a given country acting as a
-    party to a transaction.
+    party to a transaction. Parties are immutable and hashable.
 
     :ivar country_code:
         Party's legal or effective country of registration or residence as an
@@ -12,6 +12,8 @@ class Party(object):
     :type is_business: bool
     """
 
+    __slots__ = ('country_code', 'is_business')
+
     def __init__(self, country_code, is_business):
         """Initialize a trading party.
 
@@ -23,8 +25,32 @@ class Party(object):
         :type is_business: bool
         """
 
-        self.country_code = country_code
-        self.is_business = is_business
+        object.__setattr__(self, 'country_code', country_code)
+        object.__setattr__(self, 'is_business', is_business)
+
+    def __setattr__(self, name, value):
+        raise AttributeError('%s instances are immutable' %
+                             (self.__class__.__name__))
+
+    def __delattr__(self, name):
+        raise AttributeError('%s instances are immutable' %
+                             (self.__class__.__name__))
+
+    def __reduce__(self):
+        return (self.__class__, (self.country_code, self.is_business))
+
+    def __eq__(self, other):
+        if not isinstance(other, Party):
+            return NotImplemented
+        return self.country_code == other.country_code and \
+            self.is_business == other.is_business
+
+    def __ne__(self, other):
+        result = self.__eq__(other)
+        return result if result is NotImplemented else not result
+
+    def __hash__(self):
+        return hash((self.country_code, self.is_business))
 
     def __repr__(self):
         return '<pyvat.Party: country code = %s, is business = %r>' % (
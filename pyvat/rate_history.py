@@ -0,0 +1,247 @@
+import bisect
+import datetime
+from decimal import Decimal
+
+from .item_type import ItemType
+from .utils import ensure_decimal
+
+
+class RateTimeline(object):
+    """Effective-dated VAT rate of an item type in a country.
+
+    Stored as sorted boundary dates and the rates applying between them, so
+    looking up the rate for a date is a binary search without allocations.
+
+    :ivar boundaries: Dates at which the rate changed, in ascending order.
+    :type boundaries: tuple
+    :ivar rates:
+        Rates in percent applying before the first boundary, between two
+        boundaries and after the last boundary. ``None`` denotes the current
+        rate as defined by the VAT rules.
+    :type rates: tuple
+    """
+
+    __slots__ = ('boundaries', 'rates')
+
+    def __init__(self, changes):
+        """Initialize a rate timeline.
+
+        :param changes:
+            Sequence of ``(until, rate)`` tuples in ascending order of date,
+            each denoting a rate in percent that applied until, but not
+            including, the given date, and from the preceding date on. A rate
+            of ``None`` denotes the current rate.
+        """
+
+        self.boundaries = tuple(until for until, _ in changes)
+        self.rates = tuple(None if rate is None else ensure_decimal(rate)
+                           for _, rate in changes) + (None,)
+
+        if list(self.boundaries) != sorted(self.boundaries):
+            raise ValueError('rate changes must be in ascending order of date')
+
+    def get_vat_rate(self, date):
+        """Get the VAT rate applying on a date.
+
+        :param date: Date.
+        :type date: datetime.date
+        :returns:
+            the VAT rate in percent or ``None`` if the current rate applies.
+        :rtype: decimal.Decimal
+        """
+
+        return self.rates[bisect.bisect_right(self.boundaries, date)]
+
+    def __repr__(self):
+        return '<pyvat.RateTimeline: boundaries = %r, rates = %r>' % (
+            self.boundaries, self.rates,
+        )
+
+
+def _standard_rate_history(changes, **item_type_changes):
+    """Get the historical VAT rates of a country's item types.
+
+    :param changes:
+        ``(until, rate)`` changes of the standard VAT rate, applying to all
+        item types not given in ``item_type_changes``.
+    :param item_type_changes:
+        ``(until, rate)`` changes by :class:`pyvat.ItemType` member name of
+        the item types not charged the standard VAT rate, or ``()`` if their
+        history is not covered.
+    :returns: the changes by item type.
+    :rtype: dict
+    """
+
+    history = {}
+    for item_type in ItemType:
+        item_type_history = item_type_changes.pop(item_type.name, changes)
+        if item_type_history:
+            history[item_type] = item_type_history
+    if item_type_changes:
+        raise ValueError('unknown item types %s' %
+                         (', '.join(sorted(item_type_changes))))
+    return history
+
+
+_BROADCASTING_SERVICES = dict((name, ()) for name in (
+    'generic_broadcasting_service',
+    'prepaid_broadcasting_service',
+))
+
+VAT_RATE_HISTORY = {
+    'CH': _standard_rate_history((
+        (datetime.date(2011, 1, 1), Decimal('7.6')),
+        (datetime.date(2018, 1, 1), 8),
+        (datetime.date(2024, 1, 1), Decimal('7.7')),
+    )),
+    'CY': _standard_rate_history((
+        (datetime.date(2012, 3, 1), 15),
+        (datetime.date(2013, 1, 14), 17),
+        (datetime.date(2014, 1, 13), 18),
+    )),
+    'CZ': _standard_rate_history((
+        (datetime.date(2010, 1, 1), 19),
+        (datetime.date(2013, 1, 1), 20),
+    ), ebook=()),
+    'DE': _standard_rate_history((
+        (datetime.date(2007, 1, 1), 16),
+        (datetime.date(2020, 7, 1), None),
+        (datetime.date(2021, 1, 1), 16),
+    ), ebook=(
+        (datetime.date(2007, 1, 1), 16),
+        (datetime.date(2019, 12, 18), 19),
+        (datetime.date(2020, 7, 1), None),
+        (datetime.date(2021, 1, 1), 5),
+    )),
+    'EE': _standard_rate_history((
+        (datetime.date(2009, 7, 1), 18),
+        (datetime.date(2024, 1, 1), 20),
+        (datetime.date(2025, 7, 1), 22),
+    )),
+    'EL': _standard_rate_history((
+        (datetime.date(2010, 3, 15), 19),
+        (datetime.date(2010, 7, 1), 21),
+        (datetime.date(2016, 6, 1), 23),
+    )),
+    'ES': _standard_rate_history((
+        (datetime.date(2010, 7, 1), 16),
+        (datetime.date(2012, 9, 1), 18),
+    ), ebook=()),
+    'FI': _standard_rate_history((
+        (datetime.date(2010, 7, 1), 22),
+        (datetime.date(2013, 1, 1), 23),
+        (datetime.date(2024, 9, 1), 24),
+    ), ebook=(
+        (datetime.date(2010, 7, 1), 22),
+        (datetime.date(2013, 1, 1), 23),
+        (datetime.date(2019, 7, 1), 24),
+    )),
+    'FR': _standard_rate_history((
+        (datetime.date(2014, 1, 1), Decimal('19.6')),
+    ), ebook=(), enewspaper=(), **_BROADCASTING_SERVICES),
+    'GB': _standard_rate_history((
+        (datetime.date(2008, 12, 1), Decimal('17.5')),
+        (datetime.date(2010, 1, 1), 15),
+        (datetime.date(2011, 1, 4), Decimal('17.5')),
+    )),
+    'HR': _standard_rate_history((
+        (datetime.date(2009, 8, 1), 22),
+        (datetime.date(2012, 3, 1), 23),
+    ), ebook=()),
+    'HU': _standard_rate_history((
+        (datetime.date(2009, 7, 1), 20),
+        (datetime.date(2012, 1, 1), 25),
+    )),
+    'IE': _standard_rate_history((
+        (datetime.date(2008, 12, 1), 21),
+        (datetime.date(2010, 1, 1), Decimal('21.5')),
+        (datetime.date(2012, 1, 1), 21),
+        (datetime.date(2020, 9, 1), None),
+        (datetime.date(2021, 3, 1), 21),
+    ), ebook=()),
+    'IT': _standard_rate_history((
+        (datetime.date(2011, 9, 17), 20),
+        (datetime.date(2013, 10, 1), 21),
+    )),
+    'LT': _standard_rate_history((
+        (datetime.date(2009, 1, 1), 18),
+        (datetime.date(2009, 9, 1), 19),
+    )),
+    'LU': _standard_rate_history((
+        (datetime.date(2015, 1, 1), 15),
+        (datetime.date(2023, 1, 1), None),
+        (datetime.date(2024, 1, 1), 16),
+    ), ebook=(), **_BROADCASTING_SERVICES),
+    'LV': _standard_rate_history((
+        (datetime.date(2009, 1, 1), 18),
+        (datetime.date(2011, 1, 1), None),
+        (datetime.date(2012, 7, 1), 22),
+    )),
+    'NL': _standard_rate_history((
+        (datetime.date(2012, 10, 1), 19),
+    ), ebook=()),
+    'PL': _standard_rate_history((
+        (datetime.date(2011, 1, 1), 22),
+    ), ebook=(), **_BROADCASTING_SERVICES),
+    'PT': _standard_rate_history((
+        (datetime.date(2008, 7, 1), 21),
+        (datetime.date(2010, 7, 1), 20),
+        (datetime.date(2011, 1, 1), 21),
+    ), ebook=()),
+    'RO': _standard_rate_history((
+        (datetime.date(2010, 7, 1), 19),
+        (datetime.date(2016, 1, 1), 24),
+        (datetime.date(2017, 1, 1), 20),
+        (datetime.date(2025, 8, 1), 19),
+    )),
+    'SI': _standard_rate_history((
+        (datetime.date(2013, 7, 1), 20),
+    )),
+    'SK': _standard_rate_history((
+        (datetime.date(2011, 1, 1), 19),
+        (datetime.date(2025, 1, 1), 20),
+    )),
+}
+"""Historical VAT rates by country.
+
+Maps an ISO 3166-1 alpha-2 country code to a mapping from an item type to
+the ``(until, rate)`` changes of its VAT rate, as accepted by
+:class:`RateTimeline`. Item types without changes are charged their current
+VAT rate on all dates.
+
+Covers the changes of the standard VAT rate since 1 January 2007 in the EU
+member states, Great Britain, Switzerland and Monaco. Of the reduced VAT
+rates, only those of e-books in Germany and Finland are covered. The other
+item types charged a reduced VAT rate are charged it on all dates.
+"""
+
+VAT_RATE_HISTORY['GR'] = VAT_RATE_HISTORY['EL']
+VAT_RATE_HISTORY['MC'] = VAT_RATE_HISTORY['FR']
+
+
+def get_history_boundaries(history=None):
+    """Get all dates at which a historical VAT rate changed.
+
+    :param history:
+        Historical VAT rates by country. Default ``None`` using
+        :data:`VAT_RATE_HISTORY`.
+    :returns: the dates in ascending order.
+    :rtype: tuple
+    """
+
+    if history is None:
+        history = VAT_RATE_HISTORY
+
+    return tuple(sorted(set(
+        until
+        for changes_by_item_type in history.values()
+        for changes in changes_by_item_type.values()
+        for until, _ in changes
+    )))
+
+
+__all__ = (
+    'RateTimeline',
+    'VAT_RATE_HISTORY',
+    'get_history_boundaries',
+)
@@ -0,0 +1,225 @@
+import hashlib
+import json
+import threading
+from decimal import ROUND_HALF_UP
+
+from .amounts import gross_amounts
+from .item_type import ItemType
+from .rate_tables import get_rate_snapshot
+from .utils import format_rate, rate_to_basis_points
+from .vat_rules import VAT_RULES, get_dated_vat_rate
+
+
+class RateMatrix(object):
+    """Immutable matrix of VAT rates by country and item type.
+
+    :ivar country_codes: Country codes of the rows in ascending order.
+    :type country_codes: tuple
+    :ivar item_types: Item types of the columns in order of their values.
+    :type item_types: tuple
+    :ivar rates:
+        Rows of VAT rates in percent, or ``None`` where the VAT rules do not
+        define a rate.
+    :type rates: tuple
+    :ivar basis_points:
+        Rows of VAT rates in basis points, or ``None`` where the VAT rules do
+        not define a rate.
+    :type basis_points: tuple
+    :ivar date: Date the VAT rates apply on or ``None`` for current rates.
+    :type date: datetime.date
+    :ivar content_hash:
+        SHA-256 hex digest of the matrix as returned by :meth:`to_json`.
+        Matrices with equal rates have equal hashes regardless of the
+        representation of the rates, e.g. ``Decimal('20')`` or
+        ``Decimal('20.0')``.
+    :type content_hash: str
+    """
+
+    __slots__ = ('country_codes',
+                 'item_types',
+                 'rates',
+                 'basis_points',
+                 'date',
+                 'content_hash',
+                 '_rows',
+                 '_columns')
+
+    def __init__(self, country_codes, item_types, rates, date=None):
+        set_attribute = super(RateMatrix, self).__setattr__
+        set_attribute('country_codes', tuple(country_codes))
+        set_attribute('item_types', tuple(item_types))
+        set_attribute('rates', tuple(tuple(row) for row in rates))
+        set_attribute('basis_points', tuple(
+            tuple(None if rate is None else rate_to_basis_points(rate)
+                  for rate in row)
+            for row in self.rates
+        ))
+        set_attribute('date', date)
+        set_attribute('_rows', dict(
+            (country_code, index)
+            for index, country_code in enumerate(self.country_codes)
+        ))
+        set_attribute('_columns', dict(
+            (item_type, index)
+            for index, item_type in enumerate(self.item_types)
+        ))
+        set_attribute('content_hash', hashlib.sha256(
+            self.to_json().encode('utf-8')
+        ).hexdigest())
+
+    def __setattr__(self, name, value):
+        raise AttributeError('RateMatrix instances are immutable')
+
+    def __delattr__(self, name):
+        raise AttributeError('RateMatrix instances are immutable')
+
+    def get_vat_rate(self, country_code, item_type):
+        """Get the VAT rate for an item type in a country.
+
+        :param country_code: ISO 3166-1 alpha-2 country code.
+        :type country_code: str
+        :param item_type: Item type.
+        :type item_type: ItemType
+        :returns: the VAT rate in percent or ``None``.
+        :rtype: decimal.Decimal
+        :raises KeyError: if the country is not in the matrix.
+        """
+
+        return self.rates[self._rows[country_code]][
+            self._columns[item_type]
+        ]
+
+    def get_gross_prices(self,
+                         country_code,
+                         item_type,
+                         net_prices,
+                         rounding=ROUND_HALF_UP):
+        """Get the VAT-inclusive prices of a vector of net prices.
+
+        :param country_code: ISO 3166-1 alpha-2 country code.
+        :type country_code: str
+        :param item_type: Item type.
+        :type item_type: ItemType
+        :param net_prices: Net prices in minor units, e.g. cents.
+        :param rounding:
+            Rounding mode of the VAT amounts, ``decimal.ROUND_HALF_UP`` or
+            ``decimal.ROUND_HALF_EVEN``. Default ``ROUND_HALF_UP``.
+        :returns: a :class:`list` of gross prices in minor units.
+        :raises KeyError: if the country is not in the matrix.
+        :raises ValueError: if the VAT rules do not define a rate.
+        """
+
+        basis_points = self.basis_points[self._rows[country_code]][
+            self._columns[item_type]
+        ]
+        if basis_points is None:
+            raise ValueError('no VAT rate for %s in %s' % (item_type.name,
+                                                           country_code))
+
+        return gross_amounts(net_prices, basis_points, rounding)
+
+    def to_data(self):
+        """Get the matrix as JSON-compatible data.
+
+        :returns:
+            a :class:`dict` containing the ``content_hash`` and ``date`` of
+            the matrix, and the VAT ``rates`` as strings formatted by
+            :func:`pyvat.utils.format_rate` by country code and item type
+            name.
+        :rtype: dict
+        """
+
+        return {
+            'content_hash': self.content_hash,
+            'date': None if self.date is None else self.date.isoformat(),
+            'rates': self._get_rate_data(),
+        }
+
+    def to_json(self):
+        """Get the VAT rates and date of the matrix as canonical JSON.
+
+        :rtype: str
+        """
+
+        return json.dumps({
+            'date': None if self.date is None else self.date.isoformat(),
+            'rates': self._get_rate_data(),
+        }, sort_keys=True, separators=(',', ':'))
+
+    def _get_rate_data(self):
+        return dict(
+            (country_code, dict(
+                (item_type.name, None if rate is None else format_rate(rate))
+                for item_type, rate in zip(self.item_types, row)
+            ))
+            for country_code, row in zip(self.country_codes, self.rates)
+        )
+
+    def __repr__(self):
+        return '<pyvat.RateMatrix: content hash = %r>' % (self.content_hash)
+
+
+def build_rate_matrix(date=None, vat_rules=None):
+    """Build a matrix of the VAT rates of every country and item type.
+
+    :param date:
+        Date the VAT rates apply on. Default ``None`` for current rates.
+    :type date: datetime.date
+    :param vat_rules:
+        VAT rules by country. Default ``None`` using
+        :data:`pyvat.vat_rules.VAT_RULES`.
+    :type vat_rules: dict
+    :rtype: RateMatrix
+    """
+
+    if vat_rules is None:
+        vat_rules = VAT_RULES
+
+    country_codes = sorted(vat_rules)
+    item_types = sorted(ItemType, key=lambda item_type: item_type.value)
+    rates = []
+    for country_code in country_codes:
+        row = []
+        for item_type in item_types:
+            try:
+                rate = get_dated_vat_rate(vat_rules[country_code],
+                                          item_type,
+                                          date=date)
+            except NotImplementedError:
+                rate = None
+            row.append(rate)
+        rates.append(row)
+
+    return RateMatrix(country_codes, item_types, rates, date)
+
+
+_rate_matrix = None
+_rate_matrix_lock = threading.Lock()
+
+
+def get_rate_matrix():
+    """Get the matrix of current VAT rates.
+
+    The matrix is built on first use and rebuilt whenever the ETag of the
+    active rate snapshot changed since it was last built.
+
+    :rtype: RateMatrix
+    """
+
+    global _rate_matrix
+
+    etag = get_rate_snapshot().etag
+    cached = _rate_matrix
+    if cached is None or cached[0] != etag:
+        with _rate_matrix_lock:
+            cached = _rate_matrix
+            if cached is None or cached[0] != etag:
+                cached = _rate_matrix = (etag, build_rate_matrix())
+    return cached[1]
+
+
+__all__ = (
+    'RateMatrix',
+    'build_rate_matrix',
+    'get_rate_matrix',
+)
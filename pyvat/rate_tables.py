@@ -0,0 +1,481 @@
+import datetime
+import functools
+import hashlib
+import json
+from decimal import Decimal
+
+from .item_type import ItemType
+from .rate_history import RateTimeline, VAT_RATE_HISTORY
+from .regions import Region, RegionIndex
+from .utils import ensure_decimal, format_rate
+
+
+DATA_FORMAT_VERSION = 1
+"""Version of the rate data format understood by :func:`parse_rate_data`.
+"""
+
+
+class RateTable(object):
+    """VAT rates of a country.
+
+    :ivar rates: VAT rates in percent by item type.
+    :type rates: dict
+    :ivar regions:
+        Index of regions with special VAT rates or ``None``. Regional VAT
+        rates take precedence over the rate history.
+    :type regions: pyvat.regions.RegionIndex
+    :ivar history: :class:`pyvat.rate_history.RateTimeline` by item type.
+    :type history: dict
+    :ivar boundaries: Dates at which any of the VAT rates changed.
+    :type boundaries: frozenset
+    """
+
+    __slots__ = ('rates', 'regions', 'history', 'boundaries')
+
+    def __init__(self, rates, regions=None, history=None):
+        self.rates = rates
+        self.regions = regions
+        self.history = history or {}
+        self.boundaries = frozenset(boundary
+                                    for timeline in self.history.values()
+                                    for boundary in timeline.boundaries)
+
+    def get_vat_rate(self, item_type, postal_code=None, date=None):
+        """Get the VAT rate for an item type.
+
+        :param item_type: Item type.
+        :type item_type: ItemType
+        :param postal_code: Postal code of the buyer's location.
+        :type postal_code: str
+        :param date: Sale date. Default ``None`` for the current VAT rate.
+        :type date: datetime.date
+        :returns: the VAT rate in percent.
+        :rtype: decimal.Decimal
+        """
+
+        if postal_code and self.regions is not None:
+            region = self.regions.resolve(postal_code)
+            if region is not None:
+                return region.get_vat_rate(item_type)
+
+        if date is not None:
+            timeline = self.history.get(item_type)
+            if timeline is not None:
+                rate = timeline.get_vat_rate(date)
+                if rate is not None:
+                    return rate
+
+        return self.rates[item_type]
+
+
+class RateSnapshot(object):
+    """Immutable, compiled VAT rate tables of all countries.
+
+    Snapshots are never modified once created. Rate changes are rolled out by
+    installing a new snapshot with :func:`install_rate_snapshot`, which
+    replaces the active snapshot in a single reference assignment.
+
+    :ivar tables: :class:`RateTable` by ISO 3166-1 alpha-2 country code.
+    :type tables: dict
+    :ivar version: Free-form version of the rate data or ``None``.
+    :type version: str
+    :ivar etag:
+        SHA-256 hex digest of the compiled VAT rates, regions and histories.
+        Snapshots with equal rates have equal ETags regardless of their
+        version and of the representation of the rates, e.g. ``"20"`` or
+        ``"20.0"``.
+    :type etag: str
+    :ivar boundaries: Dates at which any VAT rate changed, in ascending order.
+    :type boundaries: tuple
+    :ivar postal_code_countries: Countries with regional VAT rates.
+    :type postal_code_countries: frozenset
+    """
+
+    __slots__ = ('tables',
+                 'version',
+                 'etag',
+                 'boundaries',
+                 'postal_code_countries',
+                 '_data')
+
+    def __init__(self, tables, version, etag, data):
+        set_attribute = super(RateSnapshot, self).__setattr__
+        set_attribute('tables', tables)
+        set_attribute('version', version)
+        set_attribute('etag', etag)
+        set_attribute('boundaries', tuple(sorted(set(
+            boundary
+            for table in tables.values()
+            for boundary in table.boundaries
+        ))))
+        set_attribute('postal_code_countries', frozenset(
+            country_code
+            for country_code, table in tables.items()
+            if table.regions is not None
+        ))
+        set_attribute('_data', data)
+
+    def __setattr__(self, name, value):
+        raise AttributeError('RateSnapshot instances are immutable')
+
+    def __delattr__(self, name):
+        raise AttributeError('RateSnapshot instances are immutable')
+
+    def get_vat_rate(self,
+                     country_code,
+                     item_type,
+                     postal_code=None,
+                     date=None):
+        """Get the VAT rate for an item type in a country.
+
+        :param country_code: ISO 3166-1 alpha-2 country code.
+        :type country_code: str
+        :param item_type: Item type.
+        :type item_type: ItemType
+        :param postal_code: Postal code of the buyer's location.
+        :type postal_code: str
+        :param date: Sale date. Default ``None`` for the current VAT rate.
+        :type date: datetime.date
+        :returns:
+            the VAT rate in percent or ``None`` if the snapshot has no rates
+            for the country.
+        :rtype: decimal.Decimal
+        """
+
+        table = self.tables.get(country_code)
+        if table is None:
+            return None
+        return table.get_vat_rate(item_type, postal_code, date)
+
+    def get_boundaries(self, country_code):
+        """Get the dates at which the VAT rates of a country changed.
+
+        :param country_code: ISO 3166-1 alpha-2 country code.
+        :type country_code: str
+        :rtype: frozenset
+        """
+
+        table = self.tables.get(country_code)
+        if table is None:
+            return frozenset()
+        return table.boundaries
+
+    def to_data(self):
+        """Get the rate data the snapshot was compiled from.
+
+        :returns: the rate data as accepted by :func:`parse_rate_data`.
+        :rtype: dict
+        """
+
+        return json.loads(self._data)
+
+    def __repr__(self):
+        return '<pyvat.RateSnapshot: version = %r, etag = %r>' % (
+            self.version, self.etag,
+        )
+
+
+def _format_rate(rate):
+    return str(ensure_decimal(rate))
+
+
+def _canonical_rate(rate):
+    return None if rate is None else format_rate(rate)
+
+
+def _canonical_rates(rates):
+    return dict((item_type.name, _canonical_rate(rate))
+                for item_type, rate in rates.items())
+
+
+def _get_etag(tables):
+    """Get the ETag of compiled rate tables.
+    """
+
+    canonical = dict(
+        (country_code, {
+            'rates': _canonical_rates(table.rates),
+            'regions': None if table.regions is None else [
+                [region.name,
+                 list(region.prefixes),
+                 _canonical_rates(region.rates),
+                 region.outside_vat_area]
+                for region in table.regions
+            ],
+            'history': dict(
+                (item_type.name,
+                 [[until.isoformat(), _canonical_rate(rate)]
+                  for until, rate in zip(timeline.boundaries,
+                                         timeline.rates)])
+                for item_type, timeline in table.history.items()
+            ),
+        })
+        for country_code, table in tables.items()
+    )
+    return hashlib.sha256(json.dumps(canonical,
+                                     sort_keys=True,
+                                     separators=(',', ':')).encode('utf-8')
+                          ).hexdigest()
+
+
+def _parse_date(value):
+    return datetime.datetime.strptime(value, '%Y-%m-%d').date()
+
+
+def _parse_rates(data):
+    default_rate = Decimal(data['rate'])
+    rates = dict((item_type, default_rate) for item_type in ItemType)
+    for name, rate in data.get('item_types', {}).items():
+        rates[ItemType[name]] = Decimal(rate)
+    return rates
+
+
+def _export_rates(rates):
+    counts = {}
+    for rate in rates.values():
+        counts[rate] = counts.get(rate, 0) + 1
+    default_rate = max(counts, key=lambda rate: (counts[rate], rate))
+
+    data = {'rate': _format_rate(default_rate)}
+
+    item_types = dict((item_type.name, _format_rate(rate))
+                      for item_type, rate in rates.items()
+                      if rate != default_rate)
+    if item_types:
+        data['item_types'] = item_types
+
+    return data
+
+
+def _parse_table(country_code, country_data):
+    try:
+        rates = _parse_rates(country_data)
+
+        regions = None
+        if country_data.get('regions'):
+            regions = RegionIndex(
+                Region(region_data['name'],
+                       region_data['prefixes'],
+                       0,
+                       _parse_rates(region_data),
+                       region_data.get('outside_vat_area', False))
+                for region_data in country_data['regions']
+            )
+
+        history = dict(
+            (ItemType[name],
+             RateTimeline([(_parse_date(until),
+                            None if rate is None else Decimal(rate))
+                           for until, rate in changes]))
+            for name, changes in country_data.get('history', {}).items()
+        )
+    except (KeyError, TypeError, ArithmeticError, ValueError) as exc:
+        raise ValueError('invalid rate data for %s: %s' % (country_code, exc))
+
+    return RateTable(rates, regions, history)
+
+
+def parse_rate_data(data):
+    """Compile rate data into a snapshot.
+
+    The rate data is a mapping of the form::
+
+        {
+            "format": 1,
+            "version": "2025-07-01",
+            "countries": {
+                "DE": {
+                    "rate": "19",
+                    "item_types": {"ebook": "7"},
+                    "history": {"ebook": [["2007-01-01", "16"],
+                                          ["2019-12-18", "19"]]}
+                },
+                "PT": {
+                    "rate": "23",
+                    "item_types": {"ebook": "6"},
+                    "regions": [{"name": "Azores",
+                                 "prefixes": ["95", "96", "97", "98", "99"],
+                                 "rate": "16",
+                                 "item_types": {"ebook": "4"}}]
+                }
+            }
+        }
+
+    ``rate`` is the VAT rate of all item types not listed in ``item_types``,
+    which are keyed by :class:`pyvat.ItemType` member name. ``regions`` lists
+    regions with special VAT rates and their postal code prefixes, as accepted
+    by :class:`pyvat.regions.Region`, with ``outside_vat_area`` set to
+    ``true`` for regions outside the EU VAT area. ``history``
+    maps an item type name to the ``[until, rate]`` changes of its VAT rate
+    as accepted by :class:`pyvat.rate_history.RateTimeline`, with a ``rate``
+    of ``null`` denoting the current rate.
+
+    :param data: Rate data.
+    :type data: dict
+    :rtype: RateSnapshot
+    :raises ValueError: if the rate data is invalid.
+    """
+
+    if data.get('format', DATA_FORMAT_VERSION) != DATA_FORMAT_VERSION:
+        raise ValueError('unsupported rate data format %r' % (data['format']))
+
+    canonical = json.dumps(data, sort_keys=True, separators=(',', ':'))
+    tables = dict(
+        (country_code, _parse_table(country_code, country_data))
+        for country_code, country_data in data.get('countries', {}).items()
+    )
+
+    return RateSnapshot(tables, data.get('version'), _get_etag(tables),
+                        canonical)
+
+
+def load_rate_snapshot(source):
+    """Load a snapshot from a JSON rate data file.
+
+    :param source: Path of, or file object reading, JSON rate data.
+    :rtype: RateSnapshot
+    :raises ValueError: if the rate data is invalid.
+    """
+
+    if hasattr(source, 'read'):
+        return parse_rate_data(json.load(source))
+
+    with open(source, 'r') as fp:
+        return parse_rate_data(json.load(fp))
+
+
+def export_rate_data(vat_rules, history=None, version=None):
+    """Export the VAT rates of VAT rules as rate data.
+
+    Countries whose rules do not define VAT rates are omitted.
+
+    :param vat_rules: VAT rules by country.
+    :type vat_rules: dict
+    :param history:
+        Historical VAT rates by country. Default ``None`` using
+        :data:`pyvat.rate_history.VAT_RATE_HISTORY`.
+    :param version: Version of the rate data. Default ``None``.
+    :type version: str
+    :returns: the rate data as accepted by :func:`parse_rate_data`.
+    :rtype: dict
+    """
+
+    if history is None:
+        history = VAT_RATE_HISTORY
+
+    countries = {}
+    for country_code, rules in vat_rules.items():
+        try:
+            rates = dict((item_type, rules.get_vat_rate(item_type))
+                         for item_type in ItemType)
+        except NotImplementedError:
+            continue
+
+        country_data = _export_rates(rates)
+
+        if rules.regions is not None:
+            country_data['regions'] = []
+            for region in rules.regions:
+                region_data = _export_rates(region.rates)
+                region_data['name'] = region.name
+                region_data['prefixes'] = list(region.prefixes)
+                if region.outside_vat_area:
+                    region_data['outside_vat_area'] = True
+                country_data['regions'].append(region_data)
+
+        changes_by_item_type = dict(
+            (item_type.name,
+             [[until.isoformat(),
+               None if rate is None else _format_rate(rate)]
+              for until, rate in changes])
+            for item_type, changes in history.get(country_code, {}).items()
+        )
+        if changes_by_item_type:
+            country_data['history'] = changes_by_item_type
+
+        countries[country_code] = country_data
+
+    data = {'format': DATA_FORMAT_VERSION, 'countries': countries}
+    if version is not None:
+        data['version'] = version
+    return data
+
+
+_rate_snapshot = None
+
+
+def get_rate_snapshot():
+    """Get the active snapshot.
+
+    Readers never take a lock. A reader that performs several lookups should
+    get the snapshot once and use it throughout to see consistent rates.
+
+    :returns: the active snapshot or ``None`` if none was installed.
+    :rtype: RateSnapshot
+    """
+
+    return _rate_snapshot
+
+
+def install_rate_snapshot(snapshot):
+    """Install a snapshot as the active snapshot.
+
+    The snapshot is swapped in atomically. Lookups in progress complete
+    against the snapshot they started with.
+
+    :param snapshot: Snapshot.
+    :type snapshot: RateSnapshot
+    :returns: the previously active snapshot.
+    :rtype: RateSnapshot
+    """
+
+    global _rate_snapshot
+
+    if not isinstance(snapshot, RateSnapshot):
+        raise TypeError('snapshot must be a RateSnapshot')
+
+    previous, _rate_snapshot = _rate_snapshot, snapshot
+    return previous
+
+
+def effective_dated(get_vat_rate):
+    """Make a ``get_vat_rate`` implementation consult the active snapshot.
+
+    The decorated method accepts an additional ``date`` argument. The rate is
+    looked up in the active snapshot under the ``country_code`` of the VAT
+    rules. VAT rules not bound to a country, or of countries the snapshot has
+    no rates for, resolve the postal code in their ``regions`` and fall back
+    to the decorated implementation outside of those.
+    """
+
+    @functools.wraps(get_vat_rate)
+    def wrapper(self, item_type, postal_code=None, date=None):
+        snapshot = _rate_snapshot
+        if snapshot is not None and self.country_code is not None:
+            rate = snapshot.get_vat_rate(self.country_code,
+                                         item_type,
+                                         postal_code,
+                                         date)
+            if rate is not None:
+                return rate
+
+        if postal_code and self.regions is not None:
+            region = self.regions.resolve(postal_code)
+            if region is not None:
+                return region.get_vat_rate(item_type)
+
+        return get_vat_rate(self, item_type, postal_code)
+
+    return wrapper
+
+
+__all__ = (
+    'RateSnapshot',
+    'RateTable',
+    'effective_dated',
+    'export_rate_data',
+    'get_rate_snapshot',
+    'install_rate_snapshot',
+    'load_rate_snapshot',
+    'parse_rate_data',
+)
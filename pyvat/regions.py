@@ -0,0 +1,201 @@
+from .item_type import ItemType
+from .utils import ensure_decimal
+
+
+class Region(object):
+    """Region of a country with special VAT rates.
+
+    :ivar name: Name of the region.
+    :type name: str
+    :ivar prefixes: Postal code prefixes of the region.
+    :type prefixes: tuple
+    :ivar rates: VAT rates in percent by item type.
+    :type rates: dict
+    :ivar outside_vat_area:
+        Whether the region is outside the EU VAT area, so sales to it are not
+        charged VAT.
+    :type outside_vat_area: bool
+    """
+
+    __slots__ = ('name', 'prefixes', 'rates', 'outside_vat_area')
+
+    def __init__(self,
+                 name,
+                 prefixes,
+                 rate,
+                 item_type_rates=None,
+                 outside_vat_area=False):
+        """Initialize a region.
+
+        :param name: Name of the region.
+        :type name: str
+        :param prefixes: Postal code prefixes of the region.
+        :param rate:
+            VAT rate in percent of item types not given in
+            ``item_type_rates``.
+        :param item_type_rates:
+            Optional mapping from item types to VAT rates in percent.
+        :type item_type_rates: dict
+        :param outside_vat_area:
+            Whether the region is outside the EU VAT area. Default ``False``.
+        :type outside_vat_area: bool
+        """
+
+        self.name = name
+        self.prefixes = tuple(normalize_postal_code(prefix)
+                              for prefix in prefixes)
+        rate = ensure_decimal(rate)
+        self.rates = dict((item_type, rate) for item_type in ItemType)
+        for item_type, item_type_rate in (item_type_rates or {}).items():
+            self.rates[item_type] = ensure_decimal(item_type_rate)
+        self.outside_vat_area = bool(outside_vat_area)
+
+    def get_vat_rate(self, item_type):
+        """Get the VAT rate for an item type in the region.
+
+        :param item_type: Item type.
+        :type item_type: ItemType
+        :returns: the VAT rate in percent.
+        :rtype: decimal.Decimal
+        """
+
+        return self.rates[item_type]
+
+    def __repr__(self):
+        return '<pyvat.Region: %s>' % (self.name)
+
+
+def normalize_postal_code(postal_code):
+    """Normalize a postal code for prefix matching.
+
+    :param postal_code: Postal code.
+    :returns: the postal code without whitespace, in upper case.
+    :rtype: str
+    """
+
+    return ''.join(str(postal_code).split()).upper()
+
+
+class RegionIndex(object):
+    """Postal code prefix trie resolving postal codes to regions.
+
+    Resolving a postal code walks the trie once, character by character, and
+    returns the region of the longest matching prefix.
+
+    :ivar regions: Indexed regions.
+    :type regions: tuple
+    """
+
+    __slots__ = ('regions', '_root')
+
+    def __init__(self, regions):
+        """Initialize a region index.
+
+        :param regions: Regions of a country.
+        :raises ValueError: if a prefix is claimed by two regions.
+        """
+
+        self.regions = tuple(regions)
+        self._root = {}
+
+        for region in self.regions:
+            for prefix in region.prefixes:
+                node = self._root
+                for character in prefix:
+                    node = node.setdefault(character, {})
+                if node.get(None, region) is not region:
+                    raise ValueError('postal code prefix %r of %s is also '
+                                     'claimed by %s' % (prefix,
+                                                        region.name,
+                                                        node[None].name))
+                node[None] = region
+
+    def resolve(self, postal_code):
+        """Resolve a postal code to a region.
+
+        :param postal_code: Postal code.
+        :returns: the region or ``None`` if the postal code is in no region.
+        :rtype: Region
+        """
+
+        node = self._root
+        region = None
+        for character in normalize_postal_code(postal_code):
+            node = node.get(character)
+            if node is None:
+                break
+            region = node.get(None, region)
+        return region
+
+    def classify(self, postal_codes):
+        """Resolve a batch of postal codes to regions.
+
+        Each distinct postal code is resolved once.
+
+        :param postal_codes: Postal codes.
+        :returns:
+            a :class:`list` of regions, or ``None`` for postal codes in no
+            region, in the order of the postal codes.
+        """
+
+        resolved = {}
+        regions = []
+        for postal_code in postal_codes:
+            try:
+                region = resolved[postal_code]
+            except KeyError:
+                region = resolved[postal_code] = \
+                    None if postal_code is None else self.resolve(postal_code)
+            regions.append(region)
+        return regions
+
+    def __iter__(self):
+        return iter(self.regions)
+
+    def __len__(self):
+        return len(self.regions)
+
+
+CANARY_ISLANDS = Region('Canary Islands', ('35', '38'), 0)
+CEUTA = Region('Ceuta', ('51',), 0)
+MELILLA = Region('Melilla', ('52',), 0)
+
+AZORES = Region('Azores', ('95', '96', '97', '98', '99'), 16,
+                {ItemType.ebook: 4})
+MADEIRA = Region('Madeira', ('90', '91', '92', '93', '94'), 22,
+                 {ItemType.ebook: 5})
+
+BUSINGEN = Region('Büsingen am Hochrhein', ('78266',), 0,
+                  outside_vat_area=True)
+HELIGOLAND = Region('Heligoland', ('27498',), 0, outside_vat_area=True)
+
+LIVIGNO = Region('Livigno', ('23041',), 0, outside_vat_area=True)
+CAMPIONE_D_ITALIA = Region('Campione d\'Italia', ('22061',), 0,
+                           outside_vat_area=True)
+
+JUNGHOLZ = Region('Jungholz', ('6691',), 19, {ItemType.ebook: 7})
+MITTELBERG = Region('Mittelberg', ('6991', '6992', '6993'), 19,
+                    {ItemType.ebook: 7})
+
+GREEK_ISLANDS = Region('Leros, Lesbos, Kos, Samos and Chios',
+                       ('811', '821', '831', '853', '854'), 17)
+
+ES_REGIONS = RegionIndex((CANARY_ISLANDS, CEUTA, MELILLA))
+PT_REGIONS = RegionIndex((AZORES, MADEIRA))
+DE_REGIONS = RegionIndex((BUSINGEN, HELIGOLAND))
+IT_REGIONS = RegionIndex((LIVIGNO, CAMPIONE_D_ITALIA))
+AT_REGIONS = RegionIndex((JUNGHOLZ, MITTELBERG))
+EL_REGIONS = RegionIndex((GREEK_ISLANDS,))
+"""Regions with special VAT rates by country.
+
+Jungholz and Mittelberg are charged the German VAT rates. Büsingen,
+Heligoland, Livigno and Campione d'Italia are outside the EU VAT area, so
+sales to them are not charged VAT.
+"""
+
+
+__all__ = (
+    'Region',
+    'RegionIndex',
+    'normalize_postal_code',
+)
@@ -1,12 +1,12 @@
-import requests
+import threading
+import time
 import xml.dom.minidom
 import os
 
-from requests import Timeout
-
 from .result import VatNumberCheckResult
 from .xml_utils import get_first_child_element, get_text, NodeNotFoundError
-from .exceptions import ServerError
+from .exceptions import ServerError, TransportTimeout
+from .transports import get_default_transport, get_session
 
 
 class Registry(object):
@@ -15,6 +15,36 @@ class Registry(object):
     Defines an explicit interface for accessing arbitary registries.
     """
 
+    DEFAULT_TIMEOUT = None
+    """Timeout for the requests."""
+
+    timeouts = None
+    """Optional :class:`pyvat.latency.AdaptiveTimeouts` deriving the timeouts
+    of the requests from the observed latencies by country code. ``None``
+    uses :attr:`DEFAULT_TIMEOUT` for all requests."""
+
+    transport = None
+    """Optional :class:`pyvat.transports.Transport` making the requests.
+    ``None`` uses the default transport returned by
+    :func:`pyvat.transports.get_default_transport`."""
+
+    def _get_transport(self):
+        """Get the transport making the requests."""
+        if self.transport is None:
+            return get_default_transport()
+        return self.transport
+
+    def _get_timeout(self, country_code):
+        """Get the timeout for a request concerning a country."""
+        if self.timeouts is None:
+            return self.DEFAULT_TIMEOUT
+        return self.timeouts.get_timeout(country_code, self.DEFAULT_TIMEOUT)
+
+    def _record_latency(self, country_code, started):
+        """Record the latency of a request started at a monotonic time."""
+        if self.timeouts is not None:
+            self.timeouts.record(country_code, time.monotonic() - started)
+
     def check_vat_number(self, vat_number, country_code, test):
         """Check if a VAT number is valid according to the registry.
 
@@ -109,25 +139,32 @@ class ViesRegistry(Registry):
             request_data,
         ]
 
+        timeout = self._get_timeout(country_code)
+        started = time.monotonic()
         try:
-            response = requests.post(
+            response = self._get_transport().post(
                 self.CHECK_VAT_SERVICE_URL,
                 data=request_data.encode('utf-8'),
                 headers={
                     'Content-Type': 'text/xml; charset=utf-8',
                 },
-                timeout=self.DEFAULT_TIMEOUT
+                timeout=timeout
             )
-        except Timeout as e:
+        except TransportTimeout as e:
             result.log_lines.append(u'< Request to EU VIEW registry timed out:'
                                     u' {}'.format(e))
+            result.error = u'timeout'
+            self._record_latency(country_code, started)
             return result
         except Exception as exception:
             # Do not completely fail problematic requests.
             result.log_lines.append(u'< Request failed with exception: %r' %
                                     (exception))
+            result.error = u'request failed: %r' % (exception)
             return result
 
+        self._record_latency(country_code, started)
+
         # Log response information.
         result.log_lines += [
             u'< Response with status %d of content type %s:' %
@@ -141,6 +178,9 @@ class ViesRegistry(Registry):
             result.log_lines.append(u'< Response is nondeterministic due to '
                                     u'invalid response status code or MIME '
                                     u'type')
+            result.error = u'unexpected response with status %d' % (
+                response.status_code
+            )
             return result
 
         # Parse the DOM and validate as much as we can.
@@ -194,6 +234,7 @@ class ViesRegistry(Registry):
         except Exception as e:
             result.log_lines.append(u'< Response is nondeterministic due to '
                                     u'invalid response body: %r' % (e))
+            result.error = u'invalid response body'
             return result
 
         # Parse the validity of the business.
@@ -205,6 +246,7 @@ class ViesRegistry(Registry):
             result.log_lines.append(u'< Response is nondeterministic due to '
                                     u'invalid validity field: %r' %
                                     (valid_text))
+            result.error = u'invalid validity field'
 
         # Parse the business name and address if possible.
         try:
@@ -255,39 +297,51 @@ class HMRCRegistry(Registry):
     access_token = None
     """Access token for the API."""
 
+    _authentication_lock = threading.Lock()
+
     def check_vat_number(self, vat_number, country_code, test):
         # Request information about the VAT number.
         result = VatNumberCheckResult()
         result.is_valid = False
+        timeout = self._get_timeout(country_code)
+        started = time.monotonic()
         try:
             base_url = self.CHECK_VAT_SERVICE_URL
             if self.access_token is None:
-                self._authenticate(test)
+                self._authenticate(test, None)
             if test:
                 base_url = self.CHECK_VAT_SERVICE_TEST_URL
 
             url = "{0}/organisations/vat/check-vat-number/lookup/".format(base_url)
             headers = self._authentication_headers()
-            response = requests.get(
+            started = time.monotonic()
+            response = self._get_transport().get(
                 url + vat_number,
-                timeout=self.DEFAULT_TIMEOUT,
+                timeout=timeout,
                 headers=headers
             )
             if response.status_code == 401:
-                self._authenticate(test)
+                self._authenticate(test, headers['Authorization'])
                 headers = self._authentication_headers()
-                response = requests.get(url + vat_number,
-                                 timeout=self.DEFAULT_TIMEOUT, headers=headers)
-        except Timeout as e:
+                started = time.monotonic()
+                response = self._get_transport().get(url + vat_number,
+                                                     timeout=timeout,
+                                                     headers=headers)
+        except TransportTimeout as e:
             result.log_lines.append(u'< Request to HMRC registry timed out:'
                                     u' {}'.format(e))
+            result.error = u'timeout'
+            self._record_latency(country_code, started)
             return result
         except Exception as exception:
             # Do not completely fail problematic requests.
             result.log_lines.append(u'< Request failed with exception: %r' %
                                     (exception))
+            result.error = u'request failed: %r' % (exception)
             return result
 
+        self._record_latency(country_code, started)
+
         # Log response information.
         result.log_lines += [
             u'< Response with status %d of content type %s:' %
@@ -301,6 +355,11 @@ class HMRCRegistry(Registry):
             result.log_lines.append(u'< Response is nondeterministic due to '
                                     u'invalid response status code or MIME '
                                     u'type')
+            # HMRC answers unknown VAT numbers with a 404.
+            if response.status_code != 404:
+                result.error = u'unexpected response with status %d' % (
+                    response.status_code
+                )
             return result
 
         # Parse the DOM and validate as much as we can.
@@ -332,8 +391,20 @@ class HMRCRegistry(Registry):
                 result.business_address = business_address
         return result
 
-    def _authenticate(self, test):
-        """Generate the token for the API."""
+    def _authenticate(self, test, rejected_authorization):
+        """Generate the token for the API.
+
+        Concurrent checks share the token, so only the first check to find the
+        token missing or rejected authenticates again.
+        """
+        with self._authentication_lock:
+            if self.access_token is not None and (
+                    rejected_authorization is None or
+                    rejected_authorization != 'Bearer ' + self.access_token):
+                return
+            self._request_access_token(test)
+
+    def _request_access_token(self, test):
         url = self.CHECK_VAT_SERVICE_URL
         if test:
             url = self.CHECK_VAT_SERVICE_TEST_URL
@@ -345,7 +416,9 @@ class HMRCRegistry(Registry):
             "client_id": os.environ.get('PYVAT_UK_CLIENT_ID'),
             "client_secret": os.environ.get('PYVAT_UK_CLIENT_SECRET'),
         }
-        r = requests.post(url, data=data)
+        r = self._get_transport().post(url,
+                                       data=data,
+                                       timeout=self.DEFAULT_TIMEOUT)
         if r.ok:
             response = r.json()
             self.access_token = response["access_token"]
@@ -362,4 +435,13 @@ class HMRCRegistry(Registry):
         }
 
 
-__all__ = ('Registry', 'ViesRegistry', 'HMRCRegistry', 'EgyptRegistry', 'SwitzerlandRegistry', 'CanadaRegistry', 'NorwayRegistry')
+__all__ = (
+    'get_session',
+    'Registry',
+    'ViesRegistry',
+    'HMRCRegistry',
+    'EgyptRegistry',
+    'SwitzerlandRegistry',
+    'CanadaRegistry',
+    'NorwayRegistry',
+)
@@ -9,6 +9,9 @@ class VatNumberCheckResult(object):
         Check log lines.
     :ivar business_name: Optional business name retrieved for the VAT number.
     :ivar business_address: Optional address retrieved for the VAT number.
+    :ivar error:
+        Reason the registry could not be consulted, e.g. a timeout or an
+        unexpected response, or ``None`` if it answered.
     """
 
     def __init__(self,
@@ -16,9 +19,11 @@ class VatNumberCheckResult(object):
                  log_lines=None,
                  business_name=None,
                  business_address=None,
-                 business_country_code=None):
+                 business_country_code=None,
+                 error=None):
         self.is_valid = is_valid
         self.log_lines = log_lines or []
         self.business_name = business_name
         self.business_address = business_address
-        self.business_country_code = business_country_code
\ No newline at end of file
+        self.business_country_code = business_country_code
+        self.error = error
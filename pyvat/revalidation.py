@@ -0,0 +1,391 @@
+import heapq
+import itertools
+import threading
+import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor, wait
+
+from . import check_vat_number, decompose_vat_number, VAT_REGISTRIES
+
+
+DEFAULT_WINDOW = 30 * 86400.0
+"""Default number of seconds within which every VAT number is re-validated.
+"""
+
+DEFAULT_RETRY_DELAY = 3600.0
+"""Default number of seconds before retrying checks without a determined
+validity.
+"""
+
+VatNumberChange = namedtuple('VatNumberChange', ('vat_number',
+                                                 'country_code',
+                                                 'was_valid',
+                                                 'is_valid',
+                                                 'result'))
+"""Change of the validity of a tracked VAT number.
+
+:ivar vat_number: VAT number without country code prefix.
+:ivar country_code: ISO 3166-1 alpha-2 country code.
+:ivar was_valid: Validity before the re-validation.
+:ivar is_valid: Validity after the re-validation.
+:ivar result: :class:`VatNumberCheckResult` of the re-validation.
+"""
+
+
+class RevalidationEntry(object):
+    """Tracked VAT number.
+
+    :ivar vat_number: VAT number without country code prefix.
+    :type vat_number: str
+    :ivar country_code: ISO 3166-1 alpha-2 country code.
+    :type country_code: str
+    :ivar is_valid:
+        Validity determined by the last check or ``None`` if not known.
+    :type is_valid: bool
+    :ivar checked_at:
+        UNIX time of the last check with a determined validity or ``None``.
+    :type checked_at: float
+    :ivar due: UNIX time the VAT number is due for re-validation.
+    :type due: float
+    """
+
+    def __init__(self, vat_number, country_code, is_valid, checked_at, due):
+        self.vat_number = vat_number
+        self.country_code = country_code
+        self.is_valid = is_valid
+        self.checked_at = checked_at
+        self.due = due
+
+    def __repr__(self):
+        return '<pyvat.RevalidationEntry: %s%s, is valid = %r>' % (
+            self.country_code, self.vat_number, self.is_valid,
+        )
+
+
+class _RegistryLimit(object):
+    """Concurrency and rate limit state of a registry.
+    """
+
+    def __init__(self, max_rate, now):
+        self.in_flight = 0
+        self.tokens = 1.0
+        self.max_rate = max_rate
+        self.refilled = now
+
+    def refill(self, now, burst):
+        if self.max_rate is not None:
+            self.tokens = min(burst,
+                              self.tokens +
+                              (now - self.refilled) * self.max_rate)
+        self.refilled = now
+
+
+class RevalidationScheduler(object):
+    """Scheduler spreading re-validations of stored VAT numbers over a
+    window.
+
+    Every tracked VAT number is re-validated once per window. Checks are
+    started at a steady rate of the number of tracked VAT numbers per window,
+    in order of their due time, so a burst of initial checks is spread
+    evenly over the following windows. No check is started before it is due.
+    Each registry is limited to a number of concurrent checks and optionally
+    a rate.
+
+    Call :meth:`run_pending` periodically or :meth:`start` a background
+    thread doing so.
+
+    :ivar window:
+        Number of seconds within which every VAT number is re-validated.
+    :type window: float
+    """
+
+    def __init__(self,
+                 window=DEFAULT_WINDOW,
+                 on_change=None,
+                 max_concurrency=4,
+                 max_rate=None,
+                 retry_delay=DEFAULT_RETRY_DELAY,
+                 test=False,
+                 clock=time.time):
+        """Initialize a scheduler.
+
+        :param window:
+            Number of seconds within which every VAT number is re-validated.
+        :param on_change:
+            Optional callable called with a :class:`VatNumberChange` whenever
+            a re-validation changes a determined validity, e.g. from valid to
+            invalid. Called from the checking threads.
+        :param max_concurrency: Maximum concurrent checks per registry.
+        :param max_rate:
+            Optional maximum checks per second per registry. Default ``None``
+            for no limit.
+        :param retry_delay:
+            Number of seconds before retrying failed checks and checks
+            without a determined validity.
+        :param test: Whether to check against test registries.
+        :param clock: Function returning the current UNIX time.
+        """
+
+        if window <= 0:
+            raise ValueError('window must be positive')
+        if max_concurrency < 1:
+            raise ValueError('max_concurrency must be at least 1')
+
+        self.window = window
+        self.on_change = on_change
+        self.max_concurrency = max_concurrency
+        self.max_rate = max_rate
+        self.retry_delay = retry_delay
+        self.test = test
+        self.clock = clock
+
+        self._lock = threading.Lock()
+        self._entries = {}
+        self._queues = {}
+        self._counter = itertools.count()
+        self._limits = {}
+        self._tokens = 1.0
+        self._refilled = None
+        self._executor = None
+        self._futures = set()
+        self._stopped = threading.Event()
+        self._thread = None
+
+    def add(self, vat_number, country_code=None, is_valid=None,
+            checked_at=None):
+        """Track a VAT number.
+
+        VAT numbers never checked are due immediately, others one window
+        after their last check. Adding a tracked VAT number updates it.
+
+        :param vat_number: VAT number.
+        :param country_code:
+            Optional country code. Default ``None`` prompting detection.
+        :param is_valid: Validity determined by the last check, if known.
+        :type is_valid: bool
+        :param checked_at: UNIX time of the last check, if known.
+        :type checked_at: float
+        :rtype: RevalidationEntry
+        :raises ValueError:
+            if the VAT number cannot be checked against a registry.
+        """
+
+        key = self._get_key(vat_number, country_code)
+        due = self.clock() if checked_at is None \
+            else checked_at + self.window
+        entry = RevalidationEntry(key[0], key[1], is_valid, checked_at, due)
+
+        with self._lock:
+            self._entries[key] = entry
+            self._push(key, entry)
+        return entry
+
+    def remove(self, vat_number, country_code=None):
+        """Stop tracking a VAT number.
+
+        :param vat_number: VAT number.
+        :param country_code:
+            Optional country code. Default ``None`` prompting detection.
+        :raises KeyError: if the VAT number is not tracked.
+        """
+
+        key = self._get_key(vat_number, country_code)
+        with self._lock:
+            del self._entries[key]
+
+    def get(self, vat_number, country_code=None):
+        """Get a tracked VAT number.
+
+        :param vat_number: VAT number.
+        :param country_code:
+            Optional country code. Default ``None`` prompting detection.
+        :rtype: RevalidationEntry
+        :raises KeyError: if the VAT number is not tracked.
+        """
+
+        return self._entries[self._get_key(vat_number, country_code)]
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _get_key(self, vat_number, country_code):
+        vat_number, country_code = decompose_vat_number(vat_number,
+                                                        country_code)
+        if not vat_number or country_code not in VAT_REGISTRIES:
+            raise ValueError('no registry for VAT number %r' % (vat_number))
+        return vat_number, country_code
+
+    def _push(self, key, entry):
+        queue = self._queues.get(key[1])
+        if queue is None:
+            queue = self._queues[key[1]] = []
+        heapq.heappush(queue, (entry.due, next(self._counter), key, entry))
+
+    def _get_limit(self, country_code, now):
+        registry = VAT_REGISTRIES.get(country_code)
+        limit = self._limits.get(registry)
+        if limit is None:
+            limit = self._limits[registry] = \
+                _RegistryLimit(self.max_rate, now)
+        limit.refill(now, self.max_concurrency)
+        return limit
+
+    def _pop_next(self, now):
+        """Pop the earliest entry that is due of the registries below their
+        limits.
+
+        Entries are queued by country, so registries at their limits and
+        queues without due entries are skipped without scanning their
+        entries.
+        """
+
+        best = None
+        for country_code, queue in list(self._queues.items()):
+            while queue and self._entries.get(queue[0][2]) is not queue[0][3]:
+                # Removed or replaced.
+                heapq.heappop(queue)
+            if not queue:
+                del self._queues[country_code]
+                continue
+
+            if queue[0][0] > now or \
+                    best is not None and best[0][0] < queue[0]:
+                continue
+            limit = self._get_limit(country_code, now)
+            if limit.in_flight >= self.max_concurrency or limit.tokens < 1:
+                continue
+            best = (queue, limit)
+
+        if best is None:
+            return None
+        queue, limit = best
+        _, _, key, entry = heapq.heappop(queue)
+        return key, entry, limit
+
+    def run_pending(self):
+        """Start the re-validations that are due given the pacing and the
+        registry limits.
+
+        :returns: the number of re-validations started.
+        :rtype: int
+        """
+
+        now = self.clock()
+        started = []
+
+        with self._lock:
+            if self._refilled is not None:
+                self._tokens = min(
+                    self.max_concurrency,
+                    self._tokens +
+                    (now - self._refilled) * len(self._entries) / self.window
+                )
+            self._refilled = now
+
+            while self._tokens >= 1:
+                pending = self._pop_next(now)
+                if pending is None:
+                    break
+
+                key, entry, limit = pending
+                limit.in_flight += 1
+                if self.max_rate is not None:
+                    limit.tokens -= 1
+                self._tokens -= 1
+                started.append(pending)
+
+            if started and self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    self.max_concurrency * len(set(VAT_REGISTRIES.values()))
+                )
+            for key, entry, limit in started:
+                future = self._executor.submit(self._revalidate,
+                                               key,
+                                               entry,
+                                               limit)
+                self._futures.add(future)
+                future.add_done_callback(self._futures.discard)
+
+        return len(started)
+
+    def _revalidate(self, key, entry, limit):
+        try:
+            result = check_vat_number(key[0], key[1], self.test)
+        except Exception:
+            result = None
+        now = self.clock()
+
+        change = None
+        with self._lock:
+            limit.in_flight -= 1
+            if self._entries.get(key) is not entry:
+                return
+
+            # Failed checks may still carry a validity, e.g. HMRC answers
+            # False on timeouts.
+            if result is None or result.is_valid is None or \
+                    result.error is not None:
+                entry.due = now + self.retry_delay
+            else:
+                if entry.is_valid is not None and \
+                        entry.is_valid != result.is_valid:
+                    change = VatNumberChange(key[0],
+                                             key[1],
+                                             entry.is_valid,
+                                             result.is_valid,
+                                             result)
+                entry.is_valid = result.is_valid
+                entry.checked_at = now
+                entry.due = now + self.window
+            self._push(key, entry)
+
+        if change is not None and self.on_change is not None:
+            self.on_change(change)
+
+    def wait(self, timeout=None):
+        """Wait for the started re-validations to complete.
+
+        :param timeout: Maximum number of seconds to wait.
+        """
+
+        wait(list(self._futures), timeout)
+
+    def start(self, poll_interval=1.0):
+        """Start running pending re-validations in a background thread.
+
+        :param poll_interval: Number of seconds between runs.
+        """
+
+        if self._thread is not None:
+            raise RuntimeError('scheduler is already running')
+
+        def run():
+            while not self._stopped.wait(poll_interval):
+                self.run_pending()
+
+        self._stopped.clear()
+        self._thread = threading.Thread(target=run,
+                                        name='pyvat-revalidation')
+        self._thread.daemon = True
+        self._thread.start()
+
+    def stop(self, wait=True):
+        """Stop the background thread.
+
+        :param wait: Whether to wait for started re-validations to complete.
+        """
+
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        if self._executor is not None:
+            self._executor.shutdown(wait)
+            self._executor = None
+
+
+__all__ = (
+    'RevalidationEntry',
+    'RevalidationScheduler',
+    'VatNumberChange',
+)
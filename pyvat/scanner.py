@@ -0,0 +1,271 @@
+import mmap
+import os
+import re
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+
+import pycountry
+
+from . import VAT_NUMBER_EXPRESSIONS, VAT_REGISTRIES
+
+
+FORMAT_VALID = 1
+"""Scan status of a VAT number with a valid format.
+"""
+
+FORMAT_INVALID = 0
+"""Scan status of a VAT number with an invalid format.
+"""
+
+UNDECOMPOSABLE = -1
+"""Scan status of a VAT number for which no country could be determined.
+"""
+
+ScanRecord = namedtuple('ScanRecord', ('offset', 'country_code', 'status'))
+"""Result of scanning a single VAT number record.
+
+:ivar offset: Byte offset of the record in the scanned buffer.
+:ivar country_code:
+    ISO 3166-1-alpha-2 country code of the VAT number or ``None`` if the VAT
+    number could not be decomposed.
+:ivar status:
+    One of :data:`FORMAT_VALID`, :data:`FORMAT_INVALID` and
+    :data:`UNDECOMPOSABLE`.
+"""
+
+LINE_EXPRESSION = re.compile(br'[^\r\n]+')
+"""Record expression.
+
+Matches a single line of a VAT number file.
+"""
+
+WHITESPACE_BYTES = b' \t\n\r\x0b\x0c-'
+"""Bytes stripped from records.
+
+Byte equivalent of :data:`pyvat.WHITESPACE_EXPRESSION`.
+"""
+
+DIGIT_EXPRESSION = re.compile(br'\d')
+
+DEFAULT_CHUNK_SIZE = 64 * 1024 * 1024
+"""Default size in bytes of the chunks processed by each worker process.
+"""
+
+
+def compile_byte_expressions(expressions=None):
+    """Compile byte equivalents of VAT number expressions.
+
+    :param expressions:
+        Mapping from country codes to compiled ``str`` expressions. Default
+        ``None`` using :data:`pyvat.VAT_NUMBER_EXPRESSIONS`.
+    :returns:
+        a :class:`dict` mapping ASCII encoded country codes to compiled
+        ``bytes`` expressions.
+    """
+
+    if expressions is None:
+        expressions = VAT_NUMBER_EXPRESSIONS
+
+    return dict(
+        (country_code.encode('ascii'),
+         re.compile(expression.pattern.encode('ascii'),
+                    expression.flags & re.IGNORECASE))
+        for country_code, expression in expressions.items()
+    )
+
+
+class VatNumberScanner(object):
+    """Scanner normalizing and format-validating VAT numbers in bytes buffers.
+
+    Each line of the scanned buffer is treated as a single VAT number and
+    is decomposed and validated like :func:`pyvat.is_vat_number_format_valid`
+    would do with the decoded line, without decoding it.
+
+    :ivar country_code:
+        Optional country code applied to all records. Default ``None``
+        prompting detection from each VAT number.
+    :type country_code: str
+    """
+
+    def __init__(self, country_code=None):
+        self.country_code = country_code
+        self._expressions = compile_byte_expressions()
+        self._country_codes = dict(
+            (country_code.encode('ascii'), country_code)
+            for country_code in VAT_REGISTRIES
+        )
+        self._country_codes[b'EL'] = 'GR'
+
+        if country_code:
+            self._hint = country_code.encode('ascii')
+        else:
+            self._hint = None
+
+    def _detect_country_code(self, prefix):
+        try:
+            return self._country_codes[prefix]
+        except KeyError:
+            pass
+
+        country_code = None
+        if not DIGIT_EXPRESSION.search(prefix):
+            try:
+                if pycountry.countries.get(alpha_2=prefix.decode('ascii')):
+                    country_code = prefix.decode('ascii')
+            except (KeyError, UnicodeDecodeError):
+                pass
+
+        self._country_codes[prefix] = country_code
+        return country_code
+
+    def classify(self, record):
+        """Classify a single raw VAT number.
+
+        :param record: Raw VAT number.
+        :type record: bytes
+        :returns:
+            a :class:`tuple` containing the country code and the scan status.
+        """
+
+        vat_number = record.translate(None, WHITESPACE_BYTES).upper()
+        prefix = vat_number[0:2]
+
+        if self._hint is None:
+            country_code = self._detect_country_code(prefix)
+            if country_code is None:
+                return None, UNDECOMPOSABLE
+            vat_number = vat_number[2:]
+            country_code_bytes = prefix if prefix != b'EL' else b'GR'
+        else:
+            country_code = self.country_code
+            country_code_bytes = self._hint
+            if prefix == country_code_bytes or \
+                    (country_code_bytes == b'GR' and prefix == b'EL'):
+                vat_number = vat_number[2:]
+
+        expression = self._expressions.get(country_code_bytes)
+        if not vat_number or \
+                expression is None or \
+                not DIGIT_EXPRESSION.search(vat_number) or \
+                not expression.match(vat_number):
+            return country_code, FORMAT_INVALID
+
+        return country_code, FORMAT_VALID
+
+    def scan(self, buffer, start=0, end=None):
+        """Scan a buffer of newline separated VAT numbers.
+
+        Empty lines are skipped.
+
+        :param buffer:
+            Any object supporting the buffer protocol, e.g. :class:`bytes`,
+            :class:`memoryview` or :class:`mmap.mmap`.
+        :param start: Byte offset to start scanning at.
+        :param end: Byte offset to stop scanning at. Default ``None``.
+        :returns: an iterator of :class:`ScanRecord` instances.
+        """
+
+        if end is None:
+            end = len(buffer)
+
+        classify = self.classify
+        for match in LINE_EXPRESSION.finditer(buffer, start, end):
+            record = match.group()
+            if not record.strip():
+                continue
+
+            country_code, status = classify(record)
+            yield ScanRecord(match.start(), country_code, status)
+
+
+def split_file(path, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Split a file into line aligned byte ranges.
+
+    :param path: Path of the file.
+    :param chunk_size: Approximate size of each byte range.
+    :returns: a :class:`list` of ``(start, end)`` tuples.
+    """
+
+    size = os.path.getsize(path)
+    if not size:
+        return []
+
+    ranges = []
+    with open(path, 'rb') as f:
+        buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            start = 0
+            while start < size:
+                end = buffer.find(b'\n', min(start + chunk_size, size) - 1)
+                end = size if end == -1 else end + 1
+                ranges.append((start, end))
+                start = end
+        finally:
+            buffer.close()
+
+    return ranges
+
+
+def _scan_file_range(path, start, end, country_code):
+    with open(path, 'rb') as f:
+        buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            scanner = VatNumberScanner(country_code)
+            return list(scanner.scan(buffer, start, end))
+        finally:
+            buffer.close()
+
+
+def scan_file(path,
+              country_code=None,
+              processes=None,
+              chunk_size=DEFAULT_CHUNK_SIZE):
+    """Scan a file of newline separated VAT numbers.
+
+    The file is memory-mapped and scanned without decoding its records.
+
+    :param path: Path of the file.
+    :param country_code:
+        Optional country code applied to all records. Default ``None``
+        prompting detection from each VAT number.
+    :param processes:
+        Number of worker processes scanning chunks of the file in parallel.
+        Default ``None`` scanning the file in the calling process.
+    :param chunk_size: Approximate size of the chunks in bytes.
+    :returns: an iterator of :class:`ScanRecord` instances in file order.
+    """
+
+    if not processes:
+        if not os.path.getsize(path):
+            return
+
+        with open(path, 'rb') as f:
+            buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            try:
+                for record in VatNumberScanner(country_code).scan(buffer):
+                    yield record
+            finally:
+                buffer.close()
+        return
+
+    ranges = split_file(path, chunk_size)
+    with ProcessPoolExecutor(processes) as executor:
+        futures = [
+            executor.submit(_scan_file_range, path, start, end, country_code)
+            for start, end in ranges
+        ]
+        for future in futures:
+            for record in future.result():
+                yield record
+
+
+__all__ = (
+    'FORMAT_VALID',
+    'FORMAT_INVALID',
+    'UNDECOMPOSABLE',
+    'ScanRecord',
+    'VatNumberScanner',
+    'compile_byte_expressions',
+    'scan_file',
+    'split_file',
+)
@@ -0,0 +1,525 @@
+import asyncio
+import datetime
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from . import (
+    check_vat_number,
+    decompose_vat_number,
+    get_sale_vat_charge,
+    is_vat_number_format_valid,
+    ItemType,
+    Party,
+)
+from .memo import MemoCache
+from .transports import DEFAULT_POOL_SIZE
+
+
+DEFAULT_HOST = '127.0.0.1'
+"""Default address the server listens on.
+"""
+
+DEFAULT_PORT = 8086
+"""Default port the server listens on.
+"""
+
+DEFAULT_CACHE_TTL = 3600.0
+"""Default number of seconds VAT number check results are cached for.
+"""
+
+MAX_BODY_SIZE = 16 * 1024 * 1024
+"""Maximum size of request bodies in bytes.
+"""
+
+REASONS = {
+    200: 'OK',
+    400: 'Bad Request',
+    404: 'Not Found',
+    405: 'Method Not Allowed',
+    413: 'Payload Too Large',
+    431: 'Request Header Fields Too Large',
+    500: 'Internal Server Error',
+}
+
+
+class HttpError(Exception):
+    """Error answered with an HTTP error status.
+    """
+
+    def __init__(self, status, message):
+        super(HttpError, self).__init__(message)
+        self.status = status
+        self.message = message
+
+
+def result_to_data(result):
+    """Get a VAT number check result as JSON-compatible data.
+
+    :param result: VAT number check result.
+    :type result: VatNumberCheckResult
+    :rtype: dict
+    """
+
+    return {
+        'is_valid': result.is_valid,
+        'business_name': result.business_name,
+        'business_address': result.business_address,
+        'business_country_code': result.business_country_code,
+        'error': result.error,
+        'log_lines': result.log_lines,
+    }
+
+
+def charge_to_data(charge):
+    """Get a VAT charge as JSON-compatible data.
+
+    :param charge: VAT charge.
+    :type charge: VatCharge
+    :rtype: dict
+    """
+
+    return {
+        'action': charge.action.name,
+        'country_code': charge.country_code,
+        'rate': str(charge.rate),
+    }
+
+
+class CheckResultCache(object):
+    """Thread-safe cache of VAT number check results with expiry.
+
+    Only successful results with a determined validity are cached, so checks
+    failing due to unavailable registries are retried.
+
+    :ivar ttl: Number of seconds results are cached for.
+    :type ttl: float
+    """
+
+    def __init__(self, maxsize=65536, ttl=DEFAULT_CACHE_TTL):
+        self.ttl = ttl
+        self._cache = MemoCache(maxsize)
+
+    def get(self, key):
+        """Get a cached result.
+
+        :param key: Cache key.
+        :returns: the result or ``None`` if not cached or expired.
+        """
+
+        entry = self._cache.get(key)
+        if entry is None or entry[0] < time.monotonic():
+            return None
+        return entry[1]
+
+    def set(self, key, result):
+        """Cache a result if the check succeeded and its validity is
+        determined.
+
+        :param key: Cache key.
+        :param result: VAT number check result.
+        :type result: VatNumberCheckResult
+        """
+
+        if result.error is None and result.is_valid is not None:
+            self._cache.set(key, (time.monotonic() + self.ttl, result))
+
+    def info(self):
+        """Get the cache statistics.
+
+        :rtype: pyvat.memo.MemoInfo
+        """
+
+        return self._cache.info()
+
+
+class VatServer(object):
+    """Local HTTP server exposing VAT number checks and VAT charges.
+
+    All clients share one result cache, the registries' HTTP session and
+    access tokens. Concurrent checks of the same VAT number are coalesced
+    into one registry request. Endpoints take and return JSON:
+
+    * ``POST /format``: ``{"vat_number": ..., "country_code": ...}``
+    * ``POST /check``: ``{"vat_number": ..., "country_code": ...,
+      "test": ...}``
+    * ``POST /check/bulk``: ``{"vat_numbers": [...], "country_code": ...,
+      "test": ...}``, where VAT numbers are strings or objects with a
+      ``vat_number`` and ``country_code``
+    * ``POST /charge``: ``{"date": "YYYY-MM-DD", "item_type": ...,
+      "buyer": {"country_code": ..., "is_business": ...}, "seller": {...},
+      "postal_code": ...}``
+    * ``GET /health``: cache statistics
+
+    :ivar host: Address the server listens on.
+    :type host: str
+    :ivar port: Port the server listens on, assigned once started if ``0``.
+    :type port: int
+    :ivar cache: Shared cache of VAT number check results.
+    :type cache: CheckResultCache
+    """
+
+    def __init__(self,
+                 host=DEFAULT_HOST,
+                 port=DEFAULT_PORT,
+                 max_workers=DEFAULT_POOL_SIZE,
+                 cache_size=65536,
+                 cache_ttl=DEFAULT_CACHE_TTL):
+        """Initialize a server.
+
+        :param host: Address to listen on.
+        :param port: Port to listen on, or ``0`` for any free port.
+        :param max_workers:
+            Maximum number of concurrent registry checks. Defaults to the
+            size of the connection pools, so that no check waits for or
+            discards a connection.
+        :param cache_size: Maximum number of cached check results.
+        :param cache_ttl: Number of seconds check results are cached for.
+        """
+
+        self.host = host
+        self.port = port
+        self.cache = CheckResultCache(cache_size, cache_ttl)
+        self._executor = ThreadPoolExecutor(max_workers)
+        self._checks_in_flight = {}
+        self._server = None
+        self._routes = {
+            '/format': self._format,
+            '/check': self._check,
+            '/check/bulk': self._check_bulk,
+            '/charge': self._charge,
+        }
+
+    async def start(self):
+        """Start listening for connections.
+        """
+
+        self._server = await asyncio.start_server(self._handle_connection,
+                                                  self.host,
+                                                  self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+
+    async def serve_forever(self):
+        """Serve connections until cancelled.
+        """
+
+        if self._server is None:
+            await self.start()
+        async with self._server:
+            await self._server.serve_forever()
+
+    async def close(self):
+        """Stop listening and shut down the thread pool.
+        """
+
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+        self._executor.shutdown(wait=False)
+
+    async def _check_vat_number(self, vat_number, country_code, test):
+        decomposed_vat_number, decomposed_country_code = \
+            decompose_vat_number(vat_number, country_code)
+        if decomposed_vat_number and decomposed_country_code:
+            vat_number = decomposed_vat_number
+            country_code = decomposed_country_code
+
+        key = (vat_number, country_code, bool(test))
+        result = self.cache.get(key)
+        if result is not None:
+            return result
+
+        # Coalesce concurrent checks of the same VAT number.
+        future = self._checks_in_flight.get(key)
+        if future is None:
+            future = asyncio.get_running_loop().run_in_executor(
+                self._executor, check_vat_number, vat_number, country_code,
+                bool(test)
+            )
+            self._checks_in_flight[key] = future
+            try:
+                result = await asyncio.shield(future)
+            finally:
+                del self._checks_in_flight[key]
+            self.cache.set(key, result)
+            return result
+
+        return await asyncio.shield(future)
+
+    async def _format(self, data):
+        vat_number = _get_string(data, 'vat_number')
+        country_code = _get_string(data, 'country_code', True)
+        vat_number, country_code = decompose_vat_number(vat_number,
+                                                        country_code)
+        return {
+            'vat_number': vat_number,
+            'country_code': country_code,
+            'format_valid': is_vat_number_format_valid(vat_number,
+                                                       country_code),
+        }
+
+    async def _check(self, data):
+        result = await self._check_vat_number(
+            _get_string(data, 'vat_number'),
+            _get_string(data, 'country_code', True),
+            data.get('test', False),
+        )
+        return result_to_data(result)
+
+    async def _check_bulk(self, data):
+        vat_numbers = data.get('vat_numbers')
+        if not isinstance(vat_numbers, list):
+            raise HttpError(400, 'vat_numbers must be a list')
+        country_code = _get_string(data, 'country_code', True)
+        test = data.get('test', False)
+
+        checks = []
+        for item in vat_numbers:
+            if isinstance(item, dict):
+                checks.append(self._check_vat_number(
+                    _get_string(item, 'vat_number'),
+                    _get_string(item, 'country_code', True) or country_code,
+                    test,
+                ))
+            elif isinstance(item, str):
+                checks.append(self._check_vat_number(item, country_code, test))
+            else:
+                raise HttpError(400, 'invalid VAT number %r' % (item, ))
+
+        results = await asyncio.gather(*checks)
+        return {'results': [result_to_data(result) for result in results]}
+
+    async def _charge(self, data):
+        try:
+            date = datetime.datetime.strptime(_get_string(data, 'date'),
+                                              '%Y-%m-%d').date()
+            item_type = data.get('item_type')
+            if isinstance(item_type, int):
+                item_type = ItemType(item_type)
+            else:
+                item_type = ItemType[item_type]
+            buyer = _get_party(data, 'buyer')
+            seller = _get_party(data, 'seller')
+        except (KeyError, ValueError) as exc:
+            raise HttpError(400, 'invalid sale: %s' % (exc))
+
+        try:
+            charge = get_sale_vat_charge(date,
+                                         item_type,
+                                         buyer,
+                                         seller,
+                                         _get_string(data, 'postal_code',
+                                                     True))
+        except NotImplementedError as exc:
+            raise HttpError(400, str(exc))
+        return charge_to_data(charge)
+
+    async def _health(self):
+        info = self.cache.info()
+        return {
+            'status': 'ok',
+            'cache': dict(zip(info._fields, info)),
+            'checks_in_flight': len(self._checks_in_flight),
+        }
+
+    async def _respond(self, method, path, body):
+        if path == '/health':
+            if method != 'GET':
+                raise HttpError(405, 'use GET')
+            return await self._health()
+
+        try:
+            route = self._routes[path]
+        except KeyError:
+            raise HttpError(404, 'no endpoint %s' % (path))
+        if method != 'POST':
+            raise HttpError(405, 'use POST')
+
+        try:
+            data = json.loads(body.decode('utf-8'))
+        except ValueError as exc:
+            raise HttpError(400, 'invalid JSON: %s' % (exc))
+        if not isinstance(data, dict):
+            raise HttpError(400, 'request must be a JSON object')
+        return await route(data)
+
+    async def _handle_connection(self, reader, writer):
+        try:
+            while True:
+                request = await _read_request(reader)
+                if request is None:
+                    break
+                method, path, headers, body = request
+
+                try:
+                    status, data = 200, await self._respond(method, path, body)
+                except HttpError as exc:
+                    status, data = exc.status, {'error': exc.message}
+                except Exception as exc:
+                    status, data = 500, {'error': repr(exc)}
+
+                keep_alive = headers.get('connection', '').lower() != 'close'
+                _write_response(writer, status, data, keep_alive)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except HttpError as exc:
+            _write_response(writer, exc.status, {'error': exc.message}, False)
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+
+def _get_string(data, name, optional=False):
+    value = data.get(name)
+    if value is None and optional:
+        return None
+    if not isinstance(value, str):
+        raise HttpError(400, '%s must be a string' % (name))
+    return value
+
+
+def _get_party(data, name):
+    party = data.get(name)
+    if not isinstance(party, dict):
+        raise HttpError(400, '%s must be an object' % (name))
+    return Party(_get_string(party, 'country_code'),
+                 bool(party.get('is_business', False)))
+
+
+async def _read_line(reader):
+    try:
+        return await reader.readline()
+    except (ValueError, asyncio.LimitOverrunError):
+        raise HttpError(431, 'request line or header too long')
+
+
+async def _read_request(reader):
+    """Read an HTTP/1.1 request.
+
+    :returns:
+        a :class:`tuple` containing the method, path, lower case headers and
+        body, or ``None`` if the connection was closed.
+    """
+
+    request_line = await _read_line(reader)
+    if not request_line.strip():
+        return None
+
+    try:
+        method, path, _ = request_line.decode('latin-1').split(' ', 2)
+    except ValueError:
+        raise HttpError(400, 'invalid request line')
+
+    headers = {}
+    while True:
+        line = await _read_line(reader)
+        if line in (b'\r\n', b'\n', b''):
+            break
+        name, _, value = line.decode('latin-1').partition(':')
+        headers[name.strip().lower()] = value.strip()
+
+    try:
+        length = int(headers.get('content-length', 0))
+    except ValueError:
+        raise HttpError(400, 'invalid Content-Length')
+    if length < 0:
+        raise HttpError(400, 'invalid Content-Length')
+    if length > MAX_BODY_SIZE:
+        raise HttpError(413, 'request body too large')
+
+    body = await reader.readexactly(length) if length else b''
+    return method, path.split('?', 1)[0], headers, body
+
+
+def _write_response(writer, status, data, keep_alive):
+    body = json.dumps(data).encode('utf-8')
+    writer.write((
+        'HTTP/1.1 %d %s\r\n'
+        'Content-Type: application/json\r\n'
+        'Content-Length: %d\r\n'
+        'Connection: %s\r\n'
+        '\r\n' % (status,
+                  REASONS[status],
+                  len(body),
+                  'keep-alive' if keep_alive else 'close')
+    ).encode('latin-1') + body)
+
+
+def serve(host=DEFAULT_HOST, port=DEFAULT_PORT, **kwargs):
+    """Run a :class:`VatServer` until interrupted.
+
+    :param host: Address to listen on.
+    :param port: Port to listen on.
+    :param kwargs: Further arguments to :class:`VatServer`.
+    """
+
+    server = VatServer(host, port, **kwargs)
+
+    async def run():
+        try:
+            await server.serve_forever()
+        finally:
+            await server.close()
+
+    try:
+        asyncio.run(run())
+    except KeyboardInterrupt:
+        pass
+
+
+class ServerThread(threading.Thread):
+    """Thread running a :class:`VatServer` on its own event loop.
+
+    Useful for embedding the server in applications and tests.
+
+    :ivar server: The server.
+    :type server: VatServer
+    """
+
+    def __init__(self, server):
+        super(ServerThread, self).__init__(daemon=True)
+        self.server = server
+        self._loop = asyncio.new_event_loop()
+        self._ready = threading.Event()
+        self._start_exception = None
+
+    def run(self):
+        asyncio.set_event_loop(self._loop)
+        try:
+            self._loop.run_until_complete(self.server.start())
+        except Exception as exc:
+            self._start_exception = exc
+            self._loop.close()
+            return
+        finally:
+            self._ready.set()
+        self._loop.run_forever()
+        self._loop.run_until_complete(self.server.close())
+        self._loop.close()
+
+    def start(self):
+        super(ServerThread, self).start()
+        self._ready.wait()
+        if self._start_exception is not None:
+            raise self._start_exception
+
+    def stop(self):
+        """Stop the server and wait for the thread to finish.
+        """
+
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self.join()
+
+
+__all__ = (
+    'CheckResultCache',
+    'ServerThread',
+    'VatServer',
+    'charge_to_data',
+    'result_to_data',
+    'serve',
+)
@@ -0,0 +1,328 @@
+import mmap
+import os
+import struct
+import threading
+import time
+import zlib
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+from .memo import MemoInfo
+from .registries import Registry
+from .result import VatNumberCheckResult
+
+
+MAGIC = b'PYVATSC1'
+"""Magic bytes identifying shared cache files.
+"""
+
+HEADER = struct.Struct('<8sII')
+"""Layout of the file header: magic, capacity and record size.
+"""
+
+HEADER_SIZE = 64
+"""Size of the file header in bytes, leaving room for future fields.
+"""
+
+RECORD = struct.Struct('<II2sBB24sd4x')
+"""Layout of the fixed-width records.
+
+Each record holds a sequence number, the key hash, the country code, the
+length of the VAT number, the state of the record, the normalized VAT number
+and the UNIX time it was checked at.
+"""
+
+MAX_NUMBER_LENGTH = 24
+"""Maximum length of cached normalized VAT numbers.
+"""
+
+MAX_PROBES = 8
+"""Maximum number of slots probed for a key.
+"""
+
+READ_RETRIES = 16
+"""Maximum number of attempts to read a record being written concurrently.
+"""
+
+EMPTY = 0
+VALID = 1
+INVALID = 2
+
+
+def _hash_key(country_code, vat_number):
+    # Stable across processes, unlike hash().
+    return zlib.crc32(vat_number, zlib.crc32(country_code))
+
+
+class SharedCheckCache(object):
+    """Cache of VAT number validities in a memory-mapped file.
+
+    Processes mapping the same file, such as the workers of a pre-fork server,
+    share the cache. Records are fixed-width and located by open addressing
+    on a hash of the key. Reads take no locks: every record carries a
+    sequence number that writers make odd while writing, so readers retry
+    records that changed while being read. Writers are serialized by a file
+    lock. When all probed slots are taken, the oldest record is replaced.
+
+    :ivar path: Path of the cache file.
+    :type path: str
+    :ivar capacity: Number of records held by the file.
+    :type capacity: int
+    :ivar ttl: Number of seconds records are valid for.
+    :type ttl: float
+    """
+
+    def __init__(self, path, capacity=65536, ttl=86400.0):
+        """Open or create a cache file.
+
+        :param path:
+            Path of the cache file, preferably on a memory-backed file system
+            such as ``/dev/shm``.
+        :param capacity:
+            Number of records of a newly created file. Existing files keep
+            their capacity.
+        :param ttl: Number of seconds records are valid for.
+        :raises ValueError: if the file is not a cache file.
+        """
+
+        if capacity < MAX_PROBES:
+            raise ValueError('capacity must be at least %d' % (MAX_PROBES))
+
+        self.path = path
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+
+        self._fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o600)
+        try:
+            self._lock_file()
+            try:
+                if os.fstat(self._fd).st_size == 0:
+                    os.ftruncate(self._fd,
+                                 HEADER_SIZE + capacity * RECORD.size)
+                    os.pwrite(self._fd,
+                              HEADER.pack(MAGIC, capacity, RECORD.size),
+                              0)
+                header = os.pread(self._fd, HEADER.size, 0)
+            finally:
+                self._unlock_file()
+
+            magic, capacity, record_size = HEADER.unpack(header)
+            if magic != MAGIC or record_size != RECORD.size:
+                raise ValueError('%s is not a pyvat cache file' % (path))
+
+            self.capacity = capacity
+            self._map = mmap.mmap(self._fd,
+                                  HEADER_SIZE + capacity * RECORD.size)
+        except Exception:
+            os.close(self._fd)
+            raise
+
+    def _lock_file(self):
+        if fcntl is not None:
+            fcntl.flock(self._fd, fcntl.LOCK_EX)
+
+    def _unlock_file(self):
+        if fcntl is not None:
+            fcntl.flock(self._fd, fcntl.LOCK_UN)
+
+    def _encode(self, vat_number, country_code):
+        country_code = country_code.encode('ascii')
+        vat_number = vat_number.encode('ascii')
+        if len(country_code) != 2 or len(vat_number) > MAX_NUMBER_LENGTH:
+            return None
+        return country_code, vat_number
+
+    def _offsets(self, key_hash):
+        slot = key_hash % self.capacity
+        for probe in range(MAX_PROBES):
+            yield HEADER_SIZE + ((slot + probe) % self.capacity) * RECORD.size
+
+    def _read(self, offset):
+        """Read a consistent record, or ``None`` if it kept changing.
+        """
+
+        for _ in range(READ_RETRIES):
+            record = RECORD.unpack_from(self._map, offset)
+            if not record[0] & 1 and \
+                    record[0] == struct.unpack_from('<I', self._map,
+                                                    offset)[0]:
+                return record
+        return None
+
+    def _lookup(self, vat_number, country_code):
+        try:
+            key = self._encode(vat_number, country_code)
+        except UnicodeEncodeError:
+            key = None
+        if key is None:
+            return None
+
+        country_code, vat_number = key
+        key_hash = _hash_key(country_code, vat_number)
+        for offset in self._offsets(key_hash):
+            record = self._read(offset)
+            if record is None:
+                continue
+            _, record_hash, record_country_code, length, state, \
+                record_vat_number, checked_at = record
+            if state == EMPTY:
+                break
+            if record_hash == key_hash and \
+                    record_country_code == country_code and \
+                    record_vat_number[:length] == vat_number:
+                if checked_at + self.ttl < time.time():
+                    break
+                return (state == VALID, checked_at)
+        return None
+
+    def get(self, vat_number, country_code):
+        """Get the cached validity of a VAT number.
+
+        :param vat_number: Normalized VAT number without country code prefix.
+        :param country_code: ISO 3166-1 alpha-2 country code.
+        :returns:
+            a :class:`tuple` containing whether the VAT number is valid and
+            the UNIX time it was checked at, or ``None`` if not cached or
+            expired.
+        """
+
+        result = self._lookup(vat_number, country_code)
+        with self._lock:
+            if result is None:
+                self._misses += 1
+            else:
+                self._hits += 1
+        return result
+
+    def set(self, vat_number, country_code, is_valid, checked_at=None):
+        """Cache the validity of a VAT number.
+
+        VAT numbers longer than :data:`MAX_NUMBER_LENGTH` are not cached.
+
+        :param vat_number: Normalized VAT number without country code prefix.
+        :param country_code: ISO 3166-1 alpha-2 country code.
+        :param is_valid: Whether the VAT number is valid.
+        :type is_valid: bool
+        :param checked_at:
+            UNIX time the VAT number was checked at. Default ``None`` for now.
+        """
+
+        try:
+            key = self._encode(vat_number, country_code)
+        except UnicodeEncodeError:
+            key = None
+        if key is None:
+            return
+
+        country_code, vat_number = key
+        key_hash = _hash_key(country_code, vat_number)
+        if checked_at is None:
+            checked_at = time.time()
+
+        with self._lock:
+            self._lock_file()
+            try:
+                target = None
+                oldest = None
+                for offset in self._offsets(key_hash):
+                    _, record_hash, record_country_code, length, state, \
+                        record_vat_number, record_checked_at = \
+                        RECORD.unpack_from(self._map, offset)
+                    if state == EMPTY or (
+                            record_hash == key_hash and
+                            record_country_code == country_code and
+                            record_vat_number[:length] == vat_number):
+                        target = offset
+                        break
+                    if oldest is None or record_checked_at < oldest[0]:
+                        oldest = (record_checked_at, offset)
+                if target is None:
+                    target = oldest[1]
+
+                sequence = struct.unpack_from('<I', self._map, target)[0]
+                struct.pack_into('<I', self._map, target,
+                                 (sequence + 1) & 0xffffffff)
+                RECORD.pack_into(self._map,
+                                 target,
+                                 (sequence + 1) & 0xffffffff,
+                                 key_hash,
+                                 country_code,
+                                 len(vat_number),
+                                 VALID if is_valid else INVALID,
+                                 vat_number,
+                                 checked_at)
+                struct.pack_into('<I', self._map, target,
+                                 (sequence + 2) & 0xffffffff)
+            finally:
+                self._unlock_file()
+
+    def info(self):
+        """Get the cache statistics of this process.
+
+        :rtype: pyvat.memo.MemoInfo
+        """
+
+        size = 0
+        for index in range(self.capacity):
+            if RECORD.unpack_from(self._map,
+                                  HEADER_SIZE + index * RECORD.size)[4]:
+                size += 1
+        with self._lock:
+            return MemoInfo(self._hits, self._misses, self.capacity, size)
+
+    def close(self):
+        """Unmap and close the cache file.
+        """
+
+        self._map.close()
+        os.close(self._fd)
+
+
+class CachingRegistry(Registry):
+    """Registry answering from a :class:`SharedCheckCache` before checking
+    against another registry.
+
+    Only successful checks with a determined validity are cached, and checks
+    against test registries bypass the cache.
+
+    :ivar registry: Registry checked on cache misses.
+    :type registry: Registry
+    :ivar cache: Cache of VAT number validities.
+    :type cache: SharedCheckCache
+    """
+
+    def __init__(self, registry, cache):
+        self.registry = registry
+        self.cache = cache
+
+    def check_vat_number(self, vat_number, country_code, test):
+        if test:
+            return self.registry.check_vat_number(vat_number,
+                                                  country_code,
+                                                  test)
+
+        cached = self.cache.get(vat_number, country_code)
+        if cached is not None:
+            is_valid, checked_at = cached
+            return VatNumberCheckResult(is_valid, [
+                u'> Cached result checked at %s' % (
+                    time.strftime('%Y-%m-%dT%H:%M:%SZ',
+                                  time.gmtime(checked_at))
+                ),
+            ])
+
+        result = self.registry.check_vat_number(vat_number, country_code, test)
+        if result.error is None and result.is_valid is not None:
+            self.cache.set(vat_number, country_code, result.is_valid)
+        return result
+
+
+__all__ = (
+    'CachingRegistry',
+    'SharedCheckCache',
+)
@@ -0,0 +1,108 @@
+import collections
+import itertools
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from . import check_vat_number
+from .result import VatNumberCheckResult
+
+
+DEFAULT_MAX_IN_FLIGHT = 16
+"""Default maximum number of VAT number checks in flight.
+"""
+
+
+def _check(item, country_code, test):
+    if isinstance(item, tuple):
+        vat_number, country_code = item
+    else:
+        vat_number = item
+
+    if not vat_number:
+        return VatNumberCheckResult(False, [u'> No VAT number given'])
+
+    try:
+        return check_vat_number(vat_number, country_code, test)
+    except Exception as exception:
+        # Do not completely fail the stream on problematic checks.
+        return VatNumberCheckResult(
+            log_lines=[u'< Check failed with exception: %r' % (exception)],
+            error=u'check failed: %r' % (exception)
+        )
+
+
+def check_vat_numbers(vat_numbers,
+                      country_code=None,
+                      max_in_flight=DEFAULT_MAX_IN_FLIGHT,
+                      ordered=False,
+                      test=False,
+                      key=None):
+    """Check a stream of VAT numbers concurrently.
+
+    The VAT numbers are consumed lazily, keeping at most ``max_in_flight``
+    checks in flight. The source is only advanced as results are consumed,
+    so memory use does not depend on the number of VAT numbers.
+
+    Checks raising an exception yield a result with an undetermined validity
+    and the exception logged.
+
+    :param vat_numbers:
+        Iterable of VAT numbers, or of ``(vat number, country code)``
+        tuples.
+    :param country_code:
+        Optional country code of VAT numbers not given as tuples. Default
+        ``None`` prompting detection.
+    :param max_in_flight:
+        Maximum number of concurrent checks. Default
+        :data:`DEFAULT_MAX_IN_FLIGHT`.
+    :type max_in_flight: int
+    :param ordered:
+        Whether to yield results in input order rather than as checks
+        complete. Default ``False``.
+    :type ordered: bool
+    :param test: Whether to check against test registries. Default ``False``.
+    :param key:
+        Optional function extracting the VAT number, or a ``(vat number,
+        country code)`` tuple, from each input. Default ``None`` using the
+        inputs as given.
+    :returns:
+        a generator of ``(input, result)`` tuples, where ``result`` is a
+        :class:`VatNumberCheckResult` instance.
+    """
+
+    if max_in_flight < 1:
+        raise ValueError('max_in_flight must be at least 1')
+
+    source = iter(vat_numbers)
+    executor = ThreadPoolExecutor(max_in_flight)
+    in_flight = collections.OrderedDict()
+
+    def submit(count):
+        for item in itertools.islice(source, count):
+            in_flight[executor.submit(_check,
+                                      item if key is None else key(item),
+                                      country_code,
+                                      test)] = item
+
+    try:
+        submit(max_in_flight)
+        while in_flight:
+            if ordered:
+                future = next(iter(in_flight))
+                done = (future,)
+            else:
+                done = wait(in_flight, return_when=FIRST_COMPLETED)[0]
+
+            for future in done:
+                item = in_flight.pop(future)
+                yield item, future.result()
+
+            submit(max_in_flight - len(in_flight))
+    finally:
+        for future in in_flight:
+            future.cancel()
+        executor.shutdown(wait=False)
+
+
+__all__ = (
+    'check_vat_numbers',
+)
@@ -0,0 +1,268 @@
+import json
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+
+try:
+    from urllib.parse import urlencode
+except ImportError:
+    from urllib import urlencode
+
+try:
+    import urllib3
+except ImportError:
+    urllib3 = None
+
+from .exceptions import TransportTimeout
+
+
+DEFAULT_POOL_SIZE = 32
+"""Maximum number of kept-alive connections per registry host.
+"""
+
+
+class TransportResponse(object):
+    """Response to an HTTP request made through a transport.
+
+    :ivar status_code: HTTP status code.
+    :type status_code: int
+    :ivar headers: Case-insensitive response headers.
+    :ivar text: Decoded response body.
+    :type text: str
+    """
+
+    def __init__(self, status_code, headers=None, text=u''):
+        self.status_code = status_code
+        self.headers = CaseInsensitiveDict(headers or {})
+        self.text = text
+
+    @property
+    def ok(self):
+        """Whether the status code indicates success.
+
+        :rtype: bool
+        """
+
+        return self.status_code < 400
+
+    def json(self):
+        """Parse the response body as JSON.
+        """
+
+        return json.loads(self.text)
+
+    def __repr__(self):
+        return '<pyvat.TransportResponse: status code = %d>' % (
+            self.status_code
+        )
+
+
+class Transport(object):
+    """Abstract base HTTP transport used by registries.
+
+    Transports raise :class:`pyvat.exceptions.TransportTimeout` when requests
+    time out.
+    """
+
+    def request(self, method, url, data=None, headers=None, timeout=None):
+        """Make an HTTP request.
+
+        :param method: HTTP method.
+        :param url: URL.
+        :param data:
+            Optional request body as bytes, or a :class:`dict` of form fields.
+        :param headers: Optional request headers.
+        :param timeout:
+            Optional timeout in seconds, or a ``(connect, read)`` tuple.
+        :rtype: TransportResponse
+        :raises pyvat.exceptions.TransportTimeout: if the request timed out.
+        """
+
+        raise NotImplementedError()
+
+    def get(self, url, **kwargs):
+        """Make an HTTP GET request.
+
+        :rtype: TransportResponse
+        """
+
+        return self.request('GET', url, **kwargs)
+
+    def post(self, url, **kwargs):
+        """Make an HTTP POST request.
+
+        :rtype: TransportResponse
+        """
+
+        return self.request('POST', url, **kwargs)
+
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def get_session():
+    """Get the HTTP session shared by the :class:`RequestsTransport`
+    instances without a session of their own.
+
+    Reusing one session keeps connections to the registries alive across
+    checks and threads.
+
+    :rtype: requests.Session
+    """
+
+    global _session
+
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=4,
+                                      pool_maxsize=DEFAULT_POOL_SIZE)
+                session.mount('http://', adapter)
+                session.mount('https://', adapter)
+                _session = session
+    return _session
+
+
+class RequestsTransport(Transport):
+    """Transport using :mod:`requests`.
+
+    :ivar session:
+        Session used for requests, or ``None`` to use the shared session
+        returned by :func:`get_session`.
+    :type session: requests.Session
+    """
+
+    def __init__(self, session=None):
+        self.session = session
+
+    def request(self, method, url, data=None, headers=None, timeout=None):
+        session = self.session or get_session()
+        try:
+            response = session.request(method,
+                                       url,
+                                       data=data,
+                                       headers=headers,
+                                       timeout=timeout)
+        except requests.Timeout as exception:
+            raise TransportTimeout(exception)
+        return TransportResponse(response.status_code,
+                                 response.headers,
+                                 response.text)
+
+
+class Urllib3Transport(Transport):
+    """Transport using a :mod:`urllib3` connection pool directly, avoiding
+    the overhead of :mod:`requests`.
+
+    :ivar pool_manager: Pool manager used for requests.
+    :type pool_manager: urllib3.PoolManager
+    """
+
+    def __init__(self, pool_manager=None):
+        if urllib3 is None:
+            raise RuntimeError('urllib3 is required for Urllib3Transport')
+
+        self.pool_manager = pool_manager or \
+            urllib3.PoolManager(num_pools=4, maxsize=DEFAULT_POOL_SIZE)
+
+    def request(self, method, url, data=None, headers=None, timeout=None):
+        headers = dict(headers or {})
+        if isinstance(data, dict):
+            data = urlencode(data).encode('ascii')
+            headers.setdefault('Content-Type',
+                               'application/x-www-form-urlencoded')
+
+        if isinstance(timeout, tuple):
+            timeout = urllib3.Timeout(connect=timeout[0], read=timeout[1])
+        elif timeout is not None:
+            timeout = urllib3.Timeout(connect=timeout, read=timeout)
+
+        try:
+            response = self.pool_manager.request(method,
+                                                 url,
+                                                 body=data,
+                                                 headers=headers,
+                                                 timeout=timeout,
+                                                 retries=False)
+        except urllib3.exceptions.TimeoutError as exception:
+            raise TransportTimeout(exception)
+
+        content_type = response.headers.get('Content-Type', '')
+        encoding = 'utf-8'
+        for parameter in content_type.split(';')[1:]:
+            name, _, value = parameter.strip().partition('=')
+            if name.lower() == 'charset' and value:
+                encoding = value.strip('"')
+        return TransportResponse(response.status,
+                                 response.headers,
+                                 response.data.decode(encoding, 'replace'))
+
+
+class MemoryTransport(Transport):
+    """In-memory transport answering requests with a handler, for tests and
+    benchmarks.
+
+    :ivar handler:
+        Callable taking the method, URL, body and headers of a request and
+        returning a :class:`TransportResponse`.
+    :ivar requests:
+        ``(method, url, data, headers, timeout)`` tuples of the requests made.
+    :type requests: list
+    """
+
+    def __init__(self, handler):
+        self.handler = handler
+        self.requests = []
+
+    def request(self, method, url, data=None, headers=None, timeout=None):
+        self.requests.append((method, url, data, headers, timeout))
+        return self.handler(method, url, data, headers)
+
+
+_default_transport = RequestsTransport()
+
+
+def get_default_transport():
+    """Get the transport used by registries without a transport of their
+    own.
+
+    :rtype: Transport
+    """
+
+    return _default_transport
+
+
+def set_default_transport(transport):
+    """Set the transport used by registries without a transport of their
+    own.
+
+    :param transport: Transport.
+    :type transport: Transport
+    :returns: the previous default transport.
+    :rtype: Transport
+    """
+
+    global _default_transport
+
+    if not isinstance(transport, Transport):
+        raise TypeError('transport must be a Transport instance')
+
+    previous = _default_transport
+    _default_transport = transport
+    return previous
+
+
+__all__ = (
+    'MemoryTransport',
+    'RequestsTransport',
+    'Transport',
+    'TransportResponse',
+    'Urllib3Transport',
+    'get_default_transport',
+    'get_session',
+    'set_default_transport',
+)
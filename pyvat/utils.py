@@ -3,3 +3,45 @@ from decimal import Decimal
 
 def ensure_decimal(value):
     return value if isinstance(value, Decimal) else Decimal(value)
+
+
+def rate_to_basis_points(rate):
+    """Convert a VAT rate in percent to integer basis points.
+
+    :param rate: VAT rate in percent, e.g. ``Decimal('5.5')``.
+    :returns: the VAT rate in basis points, e.g. ``550``.
+    :rtype: int
+    :raises ValueError:
+        if the VAT rate cannot be represented in whole basis points.
+    """
+
+    basis_points = ensure_decimal(rate).scaleb(2)
+    if basis_points != basis_points.to_integral_value():
+        raise ValueError('VAT rate %s cannot be represented in basis points'
+                         % (rate))
+    return int(basis_points)
+
+
+def basis_points_to_rate(basis_points):
+    """Convert integer basis points to a VAT rate in percent.
+
+    :param basis_points: VAT rate in basis points, e.g. ``550``.
+    :type basis_points: int
+    :returns: the VAT rate in percent, e.g. ``Decimal('5.5')``.
+    :rtype: decimal.Decimal
+    """
+
+    return Decimal(basis_points) / 100
+
+
+def format_rate(rate):
+    """Format a VAT rate in percent canonically.
+
+    Equal rates are formatted equally regardless of their representation.
+
+    :param rate: VAT rate in percent, e.g. ``Decimal('20.0')``.
+    :returns: the VAT rate without trailing zeros, e.g. ``'20'``.
+    :rtype: str
+    """
+
+    return '{0:f}'.format(ensure_decimal(rate).normalize())
@@ -1,5 +1,5 @@
 from enum import Enum
-from .utils import ensure_decimal
+from .utils import ensure_decimal, rate_to_basis_points
 
 
 class VatChargeAction(Enum):
@@ -22,6 +22,9 @@ class VatChargeAction(Enum):
 class VatCharge(object):
     """VAT charge.
 
+    VAT charges are immutable and hashable. Common VAT charges are shared
+    through an interning pool, see :meth:`intern`.
+
     :ivar action: VAT charge action.
     :type action: VatChargeAction
     :ivar country_code:
@@ -33,10 +36,84 @@ class VatCharge(object):
     :type rate: Decimal
     """
 
+    __slots__ = ('action', 'country_code', 'rate')
+
+    INTERN_POOL_SIZE = 4096
+    """Maximum number of interned VAT charges.
+    """
+
+    _interned = {}
+
     def __init__(self, action, country_code, rate):
-        self.action = action
-        self.country_code = country_code
-        self.rate = ensure_decimal(rate)
+        object.__setattr__(self, 'action', action)
+        object.__setattr__(self, 'country_code', country_code)
+        object.__setattr__(self, 'rate', ensure_decimal(rate))
+
+    @classmethod
+    def intern(cls, action, country_code, rate):
+        """Get a shared VAT charge.
+
+        Returns the interned VAT charge equal to the given values, interning
+        a new VAT charge if none exists and the pool is not full. Rates keep
+        their representation, so ``Decimal('20.0')`` and ``Decimal('20')``
+        are interned separately.
+
+        :param action: VAT charge action.
+        :type action: VatChargeAction
+        :param country_code: Country in which the action applies.
+        :type country_code: str
+        :param rate: VAT rate in percent.
+        :rtype: VatCharge
+        """
+
+        rate = ensure_decimal(rate)
+        key = (action, country_code, rate, rate.as_tuple().exponent)
+        try:
+            return cls._interned[key]
+        except KeyError:
+            pass
+
+        charge = cls(action, country_code, rate)
+        if len(cls._interned) < cls.INTERN_POOL_SIZE:
+            charge = cls._interned.setdefault(key, charge)
+        return charge
+
+    @property
+    def rate_basis_points(self):
+        """VAT rate in integer basis points.
+
+        I.e. a value of 2500 indicates a VAT charge of 25 %. For use with
+        the integer arithmetic of :mod:`pyvat.amounts`.
+
+        :rtype: int
+        """
+
+        return rate_to_basis_points(self.rate)
+
+    def __setattr__(self, name, value):
+        raise AttributeError('%s instances are immutable' %
+                             (self.__class__.__name__))
+
+    def __delattr__(self, name):
+        raise AttributeError('%s instances are immutable' %
+                             (self.__class__.__name__))
+
+    def __reduce__(self):
+        return (self.__class__, (self.action, self.country_code, self.rate))
+
+    def __eq__(self, other):
+        if not isinstance(other, VatCharge):
+            return NotImplemented
+        return self.action == other.action and \
+            self.country_code == other.country_code and \
+            self.rate == other.rate
+
+    def __ne__(self, other):
+        result = self.__eq__(other)
+        return result if result is NotImplemented else not result
+
+    def __hash__(self):
+        return hash((self.action, self.country_code, self.rate))
 
     def __repr__(self):
         return '<%s.%s: action = %r, country code = %r, rate = %s>' % (
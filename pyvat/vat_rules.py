@@ -1,30 +1,107 @@
 import datetime
+import inspect
 from decimal import Decimal
 from .countries import EU_COUNTRY_CODES, DOM_COUNTRY_CODES, FRANCE_SAME_VAT_TERRITORY
 from .item_type import ItemType
+from .regions import (
+    AT_REGIONS,
+    DE_REGIONS,
+    EL_REGIONS,
+    ES_REGIONS,
+    IT_REGIONS,
+    PT_REGIONS,
+)
 from .vat_charge import VatCharge, VatChargeAction
+from .rate_tables import (
+    effective_dated,
+    export_rate_data,
+    get_rate_snapshot,
+    install_rate_snapshot,
+    parse_rate_data,
+)
 from .utils import ensure_decimal
 
 JANUARY_1_2015 = datetime.date(2015, 1, 1)
 
 
+class _NotApplicable(object):
+    def __repr__(self):
+        return 'NOT_APPLICABLE'
+
+
+NOT_APPLICABLE = _NotApplicable()
+"""Result of VAT rules that do not apply to a sale.
+
+Returned by :meth:`VatRules.get_sale_to_country_vat_charge` and
+:meth:`VatRules.get_sale_from_country_vat_charge` instead of a VAT charge.
+"""
+
+
 class VatRules(object):
     """Base VAT rules for a country.
     """
 
-    def get_vat_rate(self, item_type, postal_code=None):
+    postal_code_dependent = False
+    """Whether the VAT rate depends on the buyer's postal code.
+    """
+
+    regions = None
+    """Regions with special VAT rates.
+
+    :class:`pyvat.regions.RegionIndex` resolving the buyer's postal code to a
+    region whose VAT rates take precedence, or ``None``.
+    """
+
+    country_code = None
+    """Country the VAT rules are bound to in :data:`VAT_RULES`.
+
+    VAT rates of bound rules are looked up in the active
+    :class:`pyvat.rate_tables.RateSnapshot`.
+    """
+
+    @effective_dated
+    def get_vat_rate(self, item_type, postal_code=None, date=None):
         """Get the VAT rate for an item type.
 
         :param item_type: Item type.
         :type item_type: ItemType
         :param postal_code: Postal code of the buyer's location, used for region-specific VAT rates.
         :type postal_code: str
+        :param date:
+            Optional sale date. Default ``None`` returning the current VAT
+            rate.
+        :type date: datetime.date
         :returns: the VAT rate in percent.
         :rtype: decimal.Decimal
         """
 
         raise NotImplementedError()
 
+    def is_outside_vat_area(self, postal_code):
+        """Whether a postal code is in a region of the country outside the EU
+        VAT area.
+
+        Regions are looked up in the active
+        :class:`pyvat.rate_tables.RateSnapshot` for bound VAT rules.
+
+        :param postal_code: Postal code of the buyer's location.
+        :type postal_code: str
+        :rtype: bool
+        """
+
+        if not postal_code:
+            return False
+
+        regions = self.regions
+        snapshot = get_rate_snapshot()
+        if snapshot is not None and self.country_code in snapshot.tables:
+            regions = snapshot.tables[self.country_code].regions
+        if regions is None:
+            return False
+
+        region = regions.resolve(postal_code)
+        return region is not None and region.outside_vat_area
+
     def get_sale_to_country_vat_charge(self,
                                        date,
                                        item_type,
@@ -43,15 +120,16 @@ class VatRules(object):
         :type seller: Party
         :param postal_code: Postal code of the buyer's location, used for region-specific VAT rates.
         :type postal_code: str
+        :returns:
+            the VAT charge or :data:`NOT_APPLICABLE` if no explicit rules for
+            selling to the given country from the given country exist. VAT
+            charge determining falls back to testing rules for the country in
+            which the seller resides if this is returned. Raising
+            :class:`NotImplementedError` is supported as an alternative.
         :rtype: VatCharge
-        :raises NotImplementedError:
-            if no explicit rules for selling to the given country from the
-            given country exist. VAT charge determining falls back to testing
-            rules for the country in which the seller resides if this is
-            raised.
         """
 
-        raise NotImplementedError()
+        return NOT_APPLICABLE
 
     def get_sale_from_country_vat_charge(self,
                                          date,
@@ -71,16 +149,67 @@ class VatRules(object):
         :type seller: Party
         :param postal_code: Postal code of the buyer's location, used for region-specific VAT rates.
         :type postal_code: str
+        :returns:
+            the VAT charge or :data:`NOT_APPLICABLE` if no rules for selling
+            from the given country to the given country exist. Raising
+            :class:`NotImplementedError` is supported as an alternative.
         :rtype: VatCharge
-        :raises NotImplementedError:
-            if no rules for selling from the given country to the given country
-            exist.
         """
 
-        raise NotImplementedError()
+        return NOT_APPLICABLE
+
+
+_accepts_date_cache = {}
 
 
-class EuVatRulesMixin(object):
+def _accepts_date(get_vat_rate):
+    """Whether a ``get_vat_rate`` implementation accepts a ``date`` argument.
+    """
+
+    function = getattr(get_vat_rate, '__func__', get_vat_rate)
+    try:
+        return _accepts_date_cache[function]
+    except KeyError:
+        pass
+
+    try:
+        parameters = inspect.signature(get_vat_rate).parameters.values()
+    except (TypeError, ValueError):
+        accepts_date = False
+    else:
+        accepts_date = any(
+            parameter.name == 'date' or
+            parameter.kind == inspect.Parameter.VAR_KEYWORD
+            for parameter in parameters
+        )
+    _accepts_date_cache[function] = accepts_date
+    return accepts_date
+
+
+def get_dated_vat_rate(vat_rules, item_type, postal_code=None, date=None):
+    """Get the VAT rate of VAT rules on a date.
+
+    VAT rules overriding ``get_vat_rate`` without a ``date`` argument are
+    asked for their current rate.
+
+    :param vat_rules: VAT rules.
+    :type vat_rules: VatRules
+    :param item_type: Item type.
+    :type item_type: ItemType
+    :param postal_code: Postal code of the buyer's location.
+    :type postal_code: str
+    :param date: Optional sale date.
+    :type date: datetime.date
+    :returns: the VAT rate in percent.
+    :rtype: decimal.Decimal
+    """
+
+    if _accepts_date(vat_rules.get_vat_rate):
+        return vat_rules.get_vat_rate(item_type, postal_code, date=date)
+    return vat_rules.get_vat_rate(item_type, postal_code)
+
+
+class EuVatRulesMixin(VatRules):
     """Mixin for VAT rules in EU countries.
     """
 
@@ -92,9 +221,13 @@ class EuVatRulesMixin(object):
                                        postal_code=None):
         # We only support business sellers at this time.
         if not seller.is_business:
-            raise NotImplementedError(
-                'non-business sellers are currently not supported'
-            )
+            return NOT_APPLICABLE
+
+        # Buyers in regions outside the EU VAT area are not charged VAT.
+        if self.is_outside_vat_area(postal_code):
+            return VatCharge.intern(VatChargeAction.no_charge,
+                                    buyer.country_code,
+                                    0)
 
         # If the seller resides in the same country as the buyer, we charge
         # VAT regardless of whether the buyer is a business or not. Similarly,
@@ -102,21 +235,24 @@ class EuVatRulesMixin(object):
         # of residence.
         if seller.country_code == buyer.country_code or \
                 (not buyer.is_business and date >= JANUARY_1_2015):
-            return VatCharge(VatChargeAction.charge,
-                             buyer.country_code,
-                             self.get_vat_rate(item_type, postal_code))
+            return VatCharge.intern(VatChargeAction.charge,
+                                    buyer.country_code,
+                                    get_dated_vat_rate(self,
+                                                       item_type,
+                                                       postal_code,
+                                                       date))
 
         # EU consumers are charged VAT in the seller's country prior to January
         # 1st, 2015.
         if not buyer.is_business:
             # Fall back to the seller's VAT rules for this one.
-            raise NotImplementedError()
+            return NOT_APPLICABLE
 
         # EU businesses will never be charged VAT but must account for the VAT
         # by the reverse-charge mechanism.
-        return VatCharge(VatChargeAction.reverse_charge,
-                         buyer.country_code,
-                         0)
+        return VatCharge.intern(VatChargeAction.reverse_charge,
+                                buyer.country_code,
+                                0)
 
     def get_sale_from_country_vat_charge(self,
                                          date,
@@ -126,42 +262,54 @@ class EuVatRulesMixin(object):
                                          postal_code=None):
         # We only support business sellers at this time.
         if not seller.is_business:
-            raise NotImplementedError(
-                'non-business sellers are currently not supported'
-            )
+            return NOT_APPLICABLE
 
-        # If the buyer resides outside the EU, we do not have to charge VAT.
-        if buyer.country_code not in EU_COUNTRY_CODES:
-            return VatCharge(VatChargeAction.no_charge, buyer.country_code, 0)
+        # If the buyer resides outside the EU or in a region outside the EU
+        # VAT area, we do not have to charge VAT.
+        if buyer.country_code not in EU_COUNTRY_CODES or \
+                VAT_RULES[buyer.country_code].is_outside_vat_area(postal_code):
+            return VatCharge.intern(VatChargeAction.no_charge,
+                                    buyer.country_code,
+                                    0)
 
         # Both businesses and consumers are charged VAT in the seller's
         # country if both seller and buyer reside in the same country.
         if buyer.country_code == seller.country_code:
-            return VatCharge(VatChargeAction.charge,
-                             seller.country_code,
-                             self.get_vat_rate(item_type, postal_code))
+            return VatCharge.intern(VatChargeAction.charge,
+                                    seller.country_code,
+                                    get_dated_vat_rate(self,
+                                                       item_type,
+                                                       postal_code,
+                                                       date))
 
         # Businesses in other EU countries are not charged VAT but are
         # responsible for accounting for the tax through the reverse-charge
         # mechanism.
         if buyer.is_business:
-            return VatCharge(VatChargeAction.reverse_charge,
-                             buyer.country_code,
-                             0)
+            return VatCharge.intern(VatChargeAction.reverse_charge,
+                                    buyer.country_code,
+                                    0)
 
         # Consumers in other EU countries are charged VAT in their country of
         # residence after January 1st, 2015. Before this date, you charge VAT
-        # in the country where the company is located.
+        # in the country where the company is located. The buyer's postal code
+        # does not determine the seller's regional VAT rates.
         if date >= datetime.date(2015, 1, 1):
             buyer_rules = VAT_RULES[buyer.country_code]
 
-            return VatCharge(VatChargeAction.charge,
-                             buyer.country_code,
-                             buyer_rules.get_vat_rate(item_type, postal_code))
+            return VatCharge.intern(VatChargeAction.charge,
+                                    buyer.country_code,
+                                    get_dated_vat_rate(buyer_rules,
+                                                       item_type,
+                                                       postal_code,
+                                                       date))
         else:
-            return VatCharge(VatChargeAction.charge,
-                             seller.country_code,
-                             self.get_vat_rate(item_type, postal_code))
+            return VatCharge.intern(VatChargeAction.charge,
+                                    seller.country_code,
+                                    get_dated_vat_rate(self,
+                                                       item_type,
+                                                       None,
+                                                       date))
 
 
 class ConstantEuVatRateRules(EuVatRulesMixin):
@@ -171,15 +319,21 @@ class ConstantEuVatRateRules(EuVatRulesMixin):
     def __init__(self, vat_rate):
         self.vat_rate = ensure_decimal(vat_rate)
 
-    def get_vat_rate(self, item_type, postal_code=None):
+    @effective_dated
+    def get_vat_rate(self, item_type, postal_code=None, date=None):
         return self.vat_rate
 
 
 class AtVatRules(EuVatRulesMixin):
     """VAT rules for Austria.
+
+    German VAT rates apply in Jungholz and Mittelberg.
     """
 
-    def get_vat_rate(self, item_type, postal_code=None):
+    regions = AT_REGIONS
+
+    @effective_dated
+    def get_vat_rate(self, item_type, postal_code=None, date=None):
         if item_type == ItemType.prepaid_broadcasting_service:
             return Decimal(10)
         elif item_type == ItemType.ebook:
@@ -191,7 +345,8 @@ class CzVatRules(ConstantEuVatRateRules):
     """VAT rules for Czech Republic.
     """
 
-    def get_vat_rate(self, item_type, postal_code=None):
+    @effective_dated
+    def get_vat_rate(self, item_type, postal_code=None, date=None):
         if item_type == ItemType.ebook:
             return Decimal(10)
         return super(CzVatRules, self).get_vat_rate(item_type, postal_code)
@@ -201,7 +356,8 @@ class BeVatRules(ConstantEuVatRateRules):
     """VAT rules for Belgium.
     """
 
-    def get_vat_rate(self, item_type, postal_code=None):
+    @effective_dated
+    def get_vat_rate(self, item_type, postal_code=None, date=None):
         if item_type == ItemType.ebook:
             return Decimal(6)
         return super(BeVatRules, self).get_vat_rate(item_type, postal_code)
@@ -211,7 +367,8 @@ class IeVatRules(ConstantEuVatRateRules):
     """VAT rules for Ireland.
     """
 
-    def get_vat_rate(self, item_type, postal_code=None):
+    @effective_dated
+    def get_vat_rate(self, item_type, postal_code=None, date=None):
         if item_type == ItemType.ebook:
             return Decimal(9)
         return super(IeVatRules, self).get_vat_rate(item_type, postal_code)
@@ -221,7 +378,8 @@ class FiVatRules(ConstantEuVatRateRules):
     """VAT rules for  Finland.
     """
 
-    def get_vat_rate(self, item_type, postal_code=None):
+    @effective_dated
+    def get_vat_rate(self, item_type, postal_code=None, date=None):
         if item_type == ItemType.ebook:
             return Decimal(10)
         return super(FiVatRules, self).get_vat_rate(item_type, postal_code)
@@ -231,7 +389,8 @@ class NlVatRules(ConstantEuVatRateRules):
     """VAT rules for Netherlands.
     """
 
-    def get_vat_rate(self, item_type, postal_code=None):
+    @effective_dated
+    def get_vat_rate(self, item_type, postal_code=None, date=None):
         if item_type == ItemType.ebook:
             return Decimal(9)
         return super(NlVatRules, self).get_vat_rate(item_type, postal_code)
@@ -241,13 +400,14 @@ class MtVatRules(ConstantEuVatRateRules):
     """VAT rules for Malta.
     """
 
-    def get_vat_rate(self, item_type, postal_code=None):
+    @effective_dated
+    def get_vat_rate(self, item_type, postal_code=None, date=None):
         if item_type == ItemType.ebook:
             return Decimal(5)
         return super(MtVatRules, self).get_vat_rate(item_type, postal_code)
 
 
-class GreatBritainVatRules(object):
+class GreatBritainVatRules(VatRules):
     """VAT rules for Great Britain (post-Brexit).
 
     Business requirements:
@@ -274,20 +434,21 @@ class GreatBritainVatRules(object):
         """
         # We only support business sellers
         if not seller.is_business:
-            raise NotImplementedError(
-                'non-business sellers are currently not supported'
-            )
+            return NOT_APPLICABLE
 
         # B2C: Charge 20% UK VAT
         if not buyer.is_business:
-            return VatCharge(VatChargeAction.charge,
-                             buyer.country_code,
-                             self.get_vat_rate(item_type, postal_code))
+            return VatCharge.intern(VatChargeAction.charge,
+                                    buyer.country_code,
+                                    get_dated_vat_rate(self,
+                                                       item_type,
+                                                       postal_code,
+                                                       date))
 
         # B2B: Reverse charge
-        return VatCharge(VatChargeAction.reverse_charge,
-                         buyer.country_code,
-                         0)
+        return VatCharge.intern(VatChargeAction.reverse_charge,
+                                buyer.country_code,
+                                0)
 
     def get_sale_from_country_vat_charge(self,
                                         date,
@@ -297,11 +458,12 @@ class GreatBritainVatRules(object):
                                         postal_code=None):
         """Get VAT charge when selling FROM Great Britain.
 
-        Not implemented - we only handle selling TO GB from other countries.
+        Not applicable - we only handle selling TO GB from other countries.
         """
-        raise NotImplementedError()
+        return NOT_APPLICABLE
 
-    def get_vat_rate(self, item_type, postal_code=None):
+    @effective_dated
+    def get_vat_rate(self, item_type, postal_code=None, date=None):
         """Get UK VAT rate.
 
         Returns 20% (UK standard rate - same pre-Brexit and post-Brexit).
@@ -313,7 +475,8 @@ class SeVatRules(ConstantEuVatRateRules):
     """VAT rules for Sweden.
     """
 
-    def get_vat_rate(self, item_type, postal_code=None):
+    @effective_dated
+    def get_vat_rate(self, item_type, postal_code=None, date=None):
         if item_type == ItemType.ebook:
             return Decimal(6)
         return super(SeVatRules, self).get_vat_rate(item_type, postal_code)
@@ -323,7 +486,8 @@ class HrVatRules(ConstantEuVatRateRules):
     """VAT rules for Croatia.
     """
 
-    def get_vat_rate(self, item_type, postal_code=None):
+    @effective_dated
+    def get_vat_rate(self, item_type, postal_code=None, date=None):
         if item_type == ItemType.ebook:
             return Decimal(5)
         return super(HrVatRules, self).get_vat_rate(item_type, postal_code)
@@ -331,9 +495,14 @@ class HrVatRules(ConstantEuVatRateRules):
 
 class PtVatRules(ConstantEuVatRateRules):
     """VAT rules for Portugal.
+
+    Reduced VAT rates apply in the Azores and Madeira.
     """
 
-    def get_vat_rate(self, item_type, postal_code=None):
+    regions = PT_REGIONS
+
+    @effective_dated
+    def get_vat_rate(self, item_type, postal_code=None, date=None):
         if item_type == ItemType.ebook:
             return Decimal(6)
         return super(PtVatRules, self).get_vat_rate(item_type, postal_code)
@@ -356,22 +525,29 @@ class FranceMonacoVatRules(EuVatRulesMixin):
                                        postal_code=None):
         # DOM sellers (RE, GP, MQ) always charge VAT at buyer's location rate
         if seller.country_code in DOM_COUNTRY_CODES:
-            return VatCharge(VatChargeAction.charge,
-                             buyer.country_code,
-                             self.get_vat_rate(item_type, postal_code))
+            return VatCharge.intern(VatChargeAction.charge,
+                                    buyer.country_code,
+                                    get_dated_vat_rate(self,
+                                                       item_type,
+                                                       postal_code,
+                                                       date))
 
         # FR ↔ MC treated as same VAT territory
         # Both charge 20% VAT on invoice (no reverse charge for B2B)
         if seller.country_code in FRANCE_SAME_VAT_TERRITORY:
-            return VatCharge(VatChargeAction.charge,
-                             buyer.country_code,
-                             self.get_vat_rate(item_type, postal_code))
+            return VatCharge.intern(VatChargeAction.charge,
+                                    buyer.country_code,
+                                    get_dated_vat_rate(self,
+                                                       item_type,
+                                                       postal_code,
+                                                       date))
 
         # Otherwise use standard EU rules
         return super(FranceMonacoVatRules, self).get_sale_to_country_vat_charge(
             date, item_type, buyer, seller, postal_code)
 
-    def get_vat_rate(self, item_type, postal_code=None):
+    @effective_dated
+    def get_vat_rate(self, item_type, postal_code=None, date=None):
         if item_type.is_broadcasting_service:
             return Decimal(10)
         if item_type == ItemType.ebook:
@@ -383,9 +559,15 @@ class FranceMonacoVatRules(EuVatRulesMixin):
 
 class ElVatRules(EuVatRulesMixin):
     """VAT rules for Greece.
+
+    Reduced VAT rates apply on the islands of Leros, Lesbos, Kos, Samos and
+    Chios.
     """
 
-    def get_vat_rate(self, item_type, postal_code=None):
+    regions = EL_REGIONS
+
+    @effective_dated
+    def get_vat_rate(self, item_type, postal_code=None, date=None):
         return Decimal(24)
 
 
@@ -393,7 +575,8 @@ class LuVatRules(EuVatRulesMixin):
     """VAT rules for Luxembourg.
     """
 
-    def get_vat_rate(self, item_type, postal_code=None):
+    @effective_dated
+    def get_vat_rate(self, item_type, postal_code=None, date=None):
         if item_type.is_broadcasting_service:
             return Decimal(3)
         elif item_type == ItemType.ebook:
@@ -405,7 +588,8 @@ class PlVatRules(EuVatRulesMixin):
     """VAT rules for Poland.
     """
 
-    def get_vat_rate(self, item_type, postal_code=None):
+    @effective_dated
+    def get_vat_rate(self, item_type, postal_code=None, date=None):
         if item_type.is_broadcasting_service:
             return Decimal(8)
         if item_type == ItemType.ebook:
@@ -423,16 +607,12 @@ class EsVatRules(EuVatRulesMixin):
     - Tenerife (postal codes starting with 38): 0% VAT
     """
 
-    def get_vat_rate(self, item_type, postal_code=None):
-        # Check if the postal code is for a region with 0% VAT
-        if postal_code:
-            # Convert to string in case it's passed as a number
-            postal_code = str(postal_code)
-            
-            # Ceuta (51XXX), Melilla (52XXX), Las Palmas (35XXX), Tenerife (38XXX)
-            if postal_code.startswith(('51', '52', '35', '38')):
-                return Decimal(0)
-        
+    postal_code_dependent = True
+
+    regions = ES_REGIONS
+
+    @effective_dated
+    def get_vat_rate(self, item_type, postal_code=None, date=None):
         # Standard VAT rates for Spain
         if item_type == ItemType.ebook:
             return Decimal(4)
@@ -441,16 +621,30 @@ class EsVatRules(EuVatRulesMixin):
 
 class DeVatRules(EuVatRulesMixin):
     """VAT rules for Germany.
+
+    Büsingen am Hochrhein and Heligoland are outside the EU VAT territory, so
+    no German VAT is charged there.
     """
 
-    def get_vat_rate(self, item_type, postal_code=None):
+    regions = DE_REGIONS
+
+    @effective_dated
+    def get_vat_rate(self, item_type, postal_code=None, date=None):
         if item_type == ItemType.ebook:
             return Decimal(7)
         return Decimal(19)
 
 
+class ItVatRules(ConstantEuVatRateRules):
+    """VAT rules for Italy.
+
+    Livigno and Campione d'Italia are outside the EU VAT territory.
+    """
 
-class NonEuVatRules(object):
+    regions = IT_REGIONS
+
+
+class NonEuVatRules(VatRules):
     """Base class for non-EU countries VAT rules.
 
     Provides default implementation for countries that charge VAT
@@ -475,9 +669,12 @@ class NonEuVatRules(object):
                                        seller,
                                        postal_code=None):
         """Get VAT charge when selling TO this country."""
-        return VatCharge(VatChargeAction.charge,
-                         buyer.country_code,
-                         self.get_vat_rate(item_type, postal_code))
+        return VatCharge.intern(VatChargeAction.charge,
+                                buyer.country_code,
+                                get_dated_vat_rate(self,
+                                                   item_type,
+                                                   postal_code,
+                                                   date))
 
     def get_sale_from_country_vat_charge(self,
                                         date,
@@ -486,11 +683,15 @@ class NonEuVatRules(object):
                                         seller,
                                         postal_code=None):
         """Get VAT charge when selling FROM this country."""
-        return VatCharge(VatChargeAction.charge,
-                         buyer.country_code,
-                         self.get_vat_rate(item_type, postal_code))
-
-    def get_vat_rate(self, item_type, postal_code=None):
+        return VatCharge.intern(VatChargeAction.charge,
+                                buyer.country_code,
+                                get_dated_vat_rate(self,
+                                                   item_type,
+                                                   postal_code,
+                                                   date))
+
+    @effective_dated
+    def get_vat_rate(self, item_type, postal_code=None, date=None):
         """Get the VAT rate for an item type.
 
         :param item_type: Item type.
@@ -503,7 +704,7 @@ class NonEuVatRules(object):
         return self.vat_rate
 
 
-class FranceDomVatRules(object):
+class FranceDomVatRules(VatRules):
     """VAT rules for French overseas departments (DOM: RE, GP, MQ).
 
     Business requirements:
@@ -533,9 +734,12 @@ class FranceDomVatRules(object):
         Applies to: FR → DOM, MC → DOM, EU → DOM, DOM → DOM
         """
         # Customer in DOM = charge DOM VAT (8.5%)
-        return VatCharge(VatChargeAction.charge,
-                         buyer.country_code,
-                         self.get_vat_rate(item_type, postal_code))
+        return VatCharge.intern(VatChargeAction.charge,
+                                buyer.country_code,
+                                get_dated_vat_rate(self,
+                                                   item_type,
+                                                   postal_code,
+                                                   date))
 
     def get_sale_from_country_vat_charge(self,
                                         date,
@@ -553,16 +757,20 @@ class FranceDomVatRules(object):
         # Get buyer's VAT rate from VAT_RULES
         buyer_rules = VAT_RULES[buyer.country_code]
 
-        return VatCharge(VatChargeAction.charge,
-                         buyer.country_code,
-                         buyer_rules.get_vat_rate(item_type, postal_code))
+        return VatCharge.intern(VatChargeAction.charge,
+                                buyer.country_code,
+                                get_dated_vat_rate(buyer_rules,
+                                                   item_type,
+                                                   postal_code,
+                                                   date))
 
-    def get_vat_rate(self, item_type, postal_code=None):
+    @effective_dated
+    def get_vat_rate(self, item_type, postal_code=None, date=None):
         """Get the VAT rate for this territory (8.5%)."""
         return self.vat_rate
 
 
-class EgVatRules(object):
+class EgVatRules(VatRules):
     """VAT rules for Egypt.
 
     Egypt requires 14% VAT to be charged on B2C sales.
@@ -585,12 +793,17 @@ class EgVatRules(object):
         """
         if buyer.is_business:
             # B2B: Exempt from VAT
-            return VatCharge(VatChargeAction.no_charge, buyer.country_code, 0)
+            return VatCharge.intern(VatChargeAction.no_charge,
+                                    buyer.country_code,
+                                    0)
         else:
             # B2C: Charge 14% VAT
-            return VatCharge(VatChargeAction.charge,
-                             buyer.country_code,
-                             self.get_vat_rate(item_type, postal_code))
+            return VatCharge.intern(VatChargeAction.charge,
+                                    buyer.country_code,
+                                    get_dated_vat_rate(self,
+                                                       item_type,
+                                                       postal_code,
+                                                       date))
 
     def get_sale_from_country_vat_charge(self,
                                         date,
@@ -605,14 +818,20 @@ class EgVatRules(object):
         """
         if buyer.is_business:
             # B2B: Exempt from VAT
-            return VatCharge(VatChargeAction.no_charge, buyer.country_code, 0)
+            return VatCharge.intern(VatChargeAction.no_charge,
+                                    buyer.country_code,
+                                    0)
         else:
             # B2C: Charge 14% VAT
-            return VatCharge(VatChargeAction.charge,
-                             buyer.country_code,
-                             self.get_vat_rate(item_type, postal_code))
-
-    def get_vat_rate(self, item_type, postal_code=None):
+            return VatCharge.intern(VatChargeAction.charge,
+                                    buyer.country_code,
+                                    get_dated_vat_rate(self,
+                                                       item_type,
+                                                       postal_code,
+                                                       date))
+
+    @effective_dated
+    def get_vat_rate(self, item_type, postal_code=None, date=None):
         """Get the VAT rate for Egypt (14%)."""
         return self.vat_rate
 
@@ -658,7 +877,7 @@ VAT_RULES = {
     'HR': HrVatRules(25),
     'HU': ConstantEuVatRateRules(27),
     'IE': IeVatRules(23),
-    'IT': ConstantEuVatRateRules(22),
+    'IT': ItVatRules(22),
     'LT': ConstantEuVatRateRules(21),
     'LU': LuVatRules(),
     'LV': ConstantEuVatRateRules(21),
@@ -685,3 +904,9 @@ VAT_RULES = {
 Maps an ISO 3316 alpha-2 country code to the VAT rules applicable in the given
 country.
 """
+
+for _country_code, _rules in VAT_RULES.items():
+    _rules.country_code = _country_code
+del _country_code, _rules
+
+install_rate_snapshot(parse_rate_data(export_rate_data(VAT_RULES)))
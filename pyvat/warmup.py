@@ -0,0 +1,201 @@
+import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+from . import VAT_REGISTRIES
+from .registries import HMRCRegistry, ViesRegistry
+
+
+DEFAULT_WARM_UP_TIMEOUT = 5.0
+"""Default timeout in seconds of each warm-up request.
+"""
+
+WarmUpStep = namedtuple('WarmUpStep', ('name', 'seconds', 'error'))
+"""Step of a warm-up.
+
+:ivar name: Description of the step, e.g. ``connect https://...``.
+:ivar seconds: Time the step took in seconds.
+:ivar error: Reason the step failed, or ``None``.
+"""
+
+
+class WarmUpReport(object):
+    """Report of a warm-up.
+
+    :ivar steps: Steps taken in order.
+    :type steps: list
+    """
+
+    def __init__(self):
+        self.steps = []
+
+    @property
+    def seconds(self):
+        """Total time the steps took in seconds.
+
+        :rtype: float
+        """
+
+        return sum(step.seconds for step in self.steps)
+
+    @property
+    def errors(self):
+        """Failed steps.
+
+        :rtype: list
+        """
+
+        return [step for step in self.steps if step.error is not None]
+
+    @property
+    def ok(self):
+        """Whether all steps succeeded.
+
+        :rtype: bool
+        """
+
+        return not self.errors
+
+    def _run(self, name, function, *args):
+        started = time.monotonic()
+        error = None
+        try:
+            function(*args)
+        except Exception as exception:
+            error = u'%r' % (exception)
+        self.steps.append(WarmUpStep(name, time.monotonic() - started, error))
+
+    def format(self):
+        """Format the report for logging.
+
+        :returns: one line per step followed by the total.
+        :rtype: str
+        """
+
+        lines = [
+            u'%-60s %8.1f ms%s' % (step.name,
+                                   step.seconds * 1000,
+                                   u'  failed: %s' % (step.error)
+                                   if step.error is not None else u'')
+            for step in self.steps
+        ]
+        lines.append(u'%-60s %8.1f ms' % (u'total', self.seconds * 1000))
+        return u'\n'.join(lines)
+
+    def __repr__(self):
+        return '<pyvat.WarmUpReport: %d steps, %d failed, %.3f seconds>' % (
+            len(self.steps), len(self.errors), self.seconds
+        )
+
+
+def _get_registries(registries):
+    """Get the distinct registries, unwrapping wrapping registries such as
+    :class:`pyvat.fallback.FallbackRegistry`.
+    """
+
+    distinct = []
+    for registry in registries:
+        while getattr(registry, 'registry', None) is not None:
+            registry = registry.registry
+        if not any(registry is other for other in distinct):
+            distinct.append(registry)
+    return distinct
+
+
+def _connect(transport, url, connections, timeout):
+    """Open connections to a URL concurrently so they are pooled.
+    """
+
+    def request(_):
+        transport.request('HEAD', url, timeout=(timeout, timeout))
+
+    with ThreadPoolExecutor(max_workers=connections) as executor:
+        list(executor.map(request, range(connections)))
+
+
+def _preload(cache, records):
+    for vat_number, country_code, is_valid, checked_at in records:
+        cache.set(vat_number, country_code, is_valid, checked_at)
+
+
+def warm_up(registries=None,
+            test=False,
+            connections=1,
+            authenticate=True,
+            cache=None,
+            records=None,
+            timeout=DEFAULT_WARM_UP_TIMEOUT):
+    """Warm up the registries, e.g. at application startup or after forking
+    a worker, so the first checks do not pay for DNS lookups, connection
+    set-up and authentication.
+
+    Pooled connections are opened to the VIES and HMRC endpoints, an HMRC
+    access token is fetched, and a cache is optionally preloaded with known
+    results. Failed steps are reported rather than raised.
+
+    :param registries:
+        Registries to warm up. Default ``None`` for the registries of
+        :data:`pyvat.VAT_REGISTRIES`.
+    :param test: Whether to warm up the test endpoints.
+    :type test: bool
+    :param connections: Number of connections to open to each endpoint.
+    :type connections: int
+    :param authenticate: Whether to fetch an HMRC access token.
+    :type authenticate: bool
+    :param cache:
+        Optional cache to preload, e.g. a
+        :class:`pyvat.shared_cache.SharedCheckCache`.
+    :param records:
+        ``(vat_number, country_code, is_valid, checked_at)`` tuples to
+        preload the cache with, e.g. read from the application's database.
+    :param timeout: Timeout in seconds of each warm-up request.
+    :type timeout: float
+    :rtype: WarmUpReport
+    """
+
+    if connections < 1:
+        raise ValueError('connections must be at least 1')
+
+    if registries is None:
+        registries = VAT_REGISTRIES.values()
+
+    report = WarmUpReport()
+    endpoints = []
+    hmrc_registries = []
+    for registry in _get_registries(registries):
+        if isinstance(registry, ViesRegistry):
+            url = registry.CHECK_VAT_SERVICE_URL
+        elif isinstance(registry, HMRCRegistry):
+            url = registry.CHECK_VAT_SERVICE_TEST_URL if test else \
+                registry.CHECK_VAT_SERVICE_URL
+            hmrc_registries.append(registry)
+        else:
+            continue
+
+        transport = registry._get_transport()
+        if not any(url == other_url and transport is other_transport
+                   for other_url, other_transport in endpoints):
+            endpoints.append((url, transport))
+
+    for url, transport in endpoints:
+        report._run(u'connect %s' % (url),
+                    _connect, transport, url, connections, timeout)
+
+    if authenticate:
+        for registry in hmrc_registries:
+            report._run(u'authenticate %s' % (type(registry).__name__),
+                        registry._authenticate, test, None)
+
+    if cache is not None and records is not None:
+        records = list(records)
+        report._run(u'preload %d cached results' % (len(records)),
+                    _preload, cache, records)
+
+    return report
+
+
+__all__ = (
+    'WarmUpReport',
+    'WarmUpStep',
+    'warm_up',
+)
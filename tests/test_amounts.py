@@ -0,0 +1,104 @@
+import random
+from decimal import Decimal, ROUND_HALF_EVEN, ROUND_HALF_UP
+
+from pyvat import VatCharge, VatChargeAction
+from pyvat.amounts import (
+    PER_INVOICE,
+    PER_LINE,
+    decimal_invoice_vat_amount,
+    decimal_vat_amount,
+    gross_amounts,
+    invoice_vat_amount,
+    vat_amount,
+)
+from pyvat.utils import rate_to_basis_points
+try:
+    from unittest2 import TestCase
+except ImportError:
+    from unittest import TestCase
+
+
+RATES = [Decimal(rate) for rate in ('0', '2.1', '5.5', '7', '8.1', '17',
+                                    '19', '21', '25', '25.5', '27')]
+
+
+class VatAmountTestCase(TestCase):
+    """Test case for integer VAT amounts.
+    """
+
+    def test_vat_amount(self):
+        """vat_amount(..) matches decimal_vat_amount(..)
+        """
+
+        rng = random.Random(1)
+        net_amounts = [rng.randint(-10 ** 6, 10 ** 6) for _ in range(500)]
+        # Net amounts producing ties at a rate of 25 %.
+        net_amounts += [2, 6, 10, -2, -6]
+
+        for rate in RATES:
+            basis_points = rate_to_basis_points(rate)
+            for rounding in (ROUND_HALF_UP, ROUND_HALF_EVEN):
+                for net_amount in net_amounts:
+                    self.assertEqual(
+                        vat_amount(net_amount, basis_points, rounding),
+                        decimal_vat_amount(net_amount, rate, rounding)
+                    )
+
+    def test_rounding(self):
+        """vat_amount(..) rounds ties
+        """
+
+        self.assertEqual(vat_amount(2, 2500, ROUND_HALF_UP), 1)
+        self.assertEqual(vat_amount(2, 2500, ROUND_HALF_EVEN), 0)
+        self.assertEqual(vat_amount(6, 2500, ROUND_HALF_EVEN), 2)
+        self.assertEqual(vat_amount(-2, 2500, ROUND_HALF_UP), -1)
+
+        with self.assertRaises(ValueError):
+            vat_amount(2, 2500, 'ROUND_DOWN')
+
+    def test_invoice_vat_amount(self):
+        """invoice_vat_amount(..) per line and per invoice
+        """
+
+        net_amounts = [2, 2, 2]
+        self.assertEqual(invoice_vat_amount(net_amounts, 2500), 3)
+        self.assertEqual(
+            invoice_vat_amount(net_amounts, 2500, aggregation=PER_INVOICE), 2
+        )
+
+        rng = random.Random(2)
+        net_amounts = [rng.randint(1, 10 ** 5) for _ in range(50)]
+        for rate in RATES:
+            for aggregation in (PER_LINE, PER_INVOICE):
+                self.assertEqual(
+                    invoice_vat_amount(net_amounts,
+                                       rate_to_basis_points(rate),
+                                       ROUND_HALF_EVEN,
+                                       aggregation),
+                    decimal_invoice_vat_amount(net_amounts,
+                                               rate,
+                                               ROUND_HALF_EVEN,
+                                               aggregation)
+                )
+
+        with self.assertRaises(ValueError):
+            invoice_vat_amount(net_amounts, 2500, aggregation='per_order')
+
+    def test_gross_amounts(self):
+        """gross_amounts(..)
+        """
+
+        self.assertEqual(gross_amounts([2, 6, -2], 2500), [3, 8, -3])
+        self.assertEqual(gross_amounts([2, 6], 2500, ROUND_HALF_EVEN), [2, 8])
+        with self.assertRaises(ValueError):
+            gross_amounts([2], 2500, 'ROUND_DOWN')
+
+    def test_rate_basis_points(self):
+        """VatCharge.rate_basis_points
+        """
+
+        charge = VatCharge(VatChargeAction.charge, 'FR', Decimal('5.5'))
+        self.assertEqual(charge.rate_basis_points, 550)
+
+
+__all__ = ('VatAmountTestCase',)
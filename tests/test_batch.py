@@ -0,0 +1,115 @@
+import datetime
+import random
+
+from pyvat import get_sale_vat_charge, ItemType, Party
+from pyvat.batch import (
+    UNSUPPORTED_ACTION,
+    UNSUPPORTED_BASIS_POINTS,
+    get_sale_vat_charges,
+    to_columns,
+)
+from pyvat.vat_rules import VAT_RULES
+try:
+    from unittest2 import TestCase
+except ImportError:
+    from unittest import TestCase
+
+
+def make_rows(count, seed=1):
+    rng = random.Random(seed)
+    country_codes = sorted(VAT_RULES)
+    item_types = [item_type for item_type in ItemType
+                  if item_type != ItemType.generic_physical_good]
+    rows = []
+
+    for _ in range(count):
+        buyer_country_code = rng.choice(country_codes)
+        rows.append((
+            datetime.date(2014, 1, 1) +
+            datetime.timedelta(days=rng.randint(0, 4000)),
+            rng.choice(item_types),
+            buyer_country_code,
+            rng.random() < 0.5,
+            rng.choice(('DE', 'FR', 'ES', 'MC', 'EG', buyer_country_code)),
+            True,
+            rng.choice((None, '35001', '28001')),
+        ))
+
+    return rows
+
+
+class GetSaleVatChargesTestCase(TestCase):
+    """Test case for :func:`get_sale_vat_charges`.
+    """
+
+    def test_matches_scalar_path(self):
+        """get_sale_vat_charges(..) matches get_sale_vat_charge(..)
+        """
+
+        rows = make_rows(2000)
+        result = get_sale_vat_charges(*zip(*rows))
+
+        self.assertEqual(len(result), len(rows))
+        self.assertLess(result.group_count, len(rows))
+
+        for index, row in enumerate(rows):
+            expected = get_sale_vat_charge(row[0],
+                                           row[1],
+                                           Party(row[2], row[3]),
+                                           Party(row[4], row[5]),
+                                           row[6])
+            self.assertEqual(result.action_codes[index],
+                             expected.action.value)
+            self.assertEqual(result.country_codes[index],
+                             expected.country_code)
+            self.assertEqual(str(result.rates[index]), str(expected.rate))
+            self.assertEqual(result.rate_basis_points[index],
+                             int(expected.rate * 100))
+
+    def test_unsupported(self):
+        """get_sale_vat_charges(.., errors='mark')
+        """
+
+        columns = ([datetime.date(2020, 1, 1)] * 2,
+                   [ItemType.ebook.value, ItemType.generic_physical_good],
+                   ['DE', 'DE'],
+                   [False, False],
+                   ['FR', 'FR'],
+                   [True, True])
+
+        with self.assertRaises(NotImplementedError):
+            get_sale_vat_charges(*columns)
+
+        result = get_sale_vat_charges(*columns, errors='mark')
+        self.assertEqual(list(result.action_codes), [1, UNSUPPORTED_ACTION])
+        self.assertEqual(list(result.rate_basis_points),
+                         [700, UNSUPPORTED_BASIS_POINTS])
+        self.assertEqual(result.country_codes, ['DE', None])
+
+    def test_unequal_columns(self):
+        """get_sale_vat_charges(..) with columns of unequal length
+        """
+
+        with self.assertRaises(ValueError):
+            get_sale_vat_charges([datetime.date(2020, 1, 1)],
+                                 [ItemType.ebook],
+                                 ['DE'],
+                                 [False],
+                                 ['FR'],
+                                 [])
+
+
+class ToColumnsTestCase(TestCase):
+    def test_to_columns(self):
+        """to_columns(..)
+        """
+
+        self.assertEqual(to_columns(('DE', 'FR'), (True, False), None),
+                         [['DE', 'FR'], [True, False], [None, None]])
+        self.assertEqual(to_columns(('IT',), ['00100']),
+                         [['IT'], ['00100']])
+        with self.assertRaises(ValueError):
+            to_columns(('DE', 'FR'), (True,), None)
+
+
+__all__ = ('GetSaleVatChargesTestCase', 'ToColumnsTestCase')
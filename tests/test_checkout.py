@@ -0,0 +1,186 @@
+import datetime
+import threading
+from decimal import Decimal
+
+try:
+    from unittest import mock
+except ImportError:
+    import mock
+
+import pyvat
+from pyvat import ItemType, Party, VatChargeAction
+from pyvat.checkout import CheckoutTaxResolver, get_checkout_vat_charge
+from pyvat.registries import Registry
+from pyvat.result import VatNumberCheckResult
+try:
+    from unittest2 import TestCase
+except ImportError:
+    from unittest import TestCase
+
+
+SALE_DATE = datetime.date(2025, 8, 1)
+
+
+class StubRegistry(Registry):
+    """Registry answering with a fixed validity and counting checks.
+    """
+
+    def __init__(self, is_valid):
+        self.is_valid = is_valid
+        self.checks = []
+
+    def check_vat_number(self, vat_number, country_code, test):
+        self.checks.append((vat_number, country_code))
+        return VatNumberCheckResult(self.is_valid)
+
+
+class SlowRegistry(StubRegistry):
+    """Registry answering only once released.
+    """
+
+    def __init__(self, is_valid):
+        super(SlowRegistry, self).__init__(is_valid)
+        self.released = threading.Event()
+
+    def check_vat_number(self, vat_number, country_code, test):
+        self.released.wait(5)
+        return super(SlowRegistry, self).check_vat_number(vat_number,
+                                                          country_code,
+                                                          test)
+
+
+class GetCheckoutVatChargeTestCase(TestCase):
+    """Test case for :func:`get_checkout_vat_charge`.
+    """
+
+    def checkout(self, registry, buyer_country_code, seller_country_code,
+                 vat_number):
+        with mock.patch.dict(pyvat.VAT_REGISTRIES,
+                             {buyer_country_code: registry}):
+            return get_checkout_vat_charge(SALE_DATE,
+                                           ItemType.generic_electronic_service,
+                                           buyer_country_code,
+                                           Party(seller_country_code, True),
+                                           vat_number)
+
+    def test_domestic(self):
+        """Domestic sales do not check the VAT number
+        """
+
+        registry = StubRegistry(True)
+        result = self.checkout(registry, 'DE', 'DE', 'DE123456789')
+
+        self.assertEqual(registry.checks, [])
+        self.assertFalse(result.vat_number_checked)
+        self.assertIsNone(result.is_business)
+        self.assertEqual(result.charge.rate, Decimal(19))
+
+    def test_non_eu(self):
+        """Sales to countries charging businesses do not check the VAT number
+        """
+
+        registry = StubRegistry(False)
+        result = self.checkout(registry, 'NO', 'DE', 'NO123456789')
+
+        self.assertEqual(registry.checks, [])
+        self.assertEqual(result.charge.action, VatChargeAction.charge)
+
+    def test_cross_border(self):
+        """Cross-border business sales check the VAT number
+        """
+
+        registry = StubRegistry(True)
+        result = self.checkout(registry, 'DE', 'FR', 'DE123456789')
+
+        self.assertEqual(registry.checks, [('123456789', 'DE')])
+        self.assertTrue(result.is_business)
+        self.assertEqual(result.charge.action, VatChargeAction.reverse_charge)
+
+        for is_valid in (False, None):
+            result = self.checkout(StubRegistry(is_valid),
+                                   'DE', 'FR', 'DE123456789')
+            self.assertFalse(result.is_business)
+            self.assertTrue(result.vat_number_checked)
+            self.assertEqual(result.charge.rate, Decimal(19))
+
+    def test_invalid_format(self):
+        """VAT numbers with an invalid format are not checked
+        """
+
+        registry = StubRegistry(True)
+        result = self.checkout(registry, 'DE', 'FR', 'DE12')
+
+        self.assertEqual(registry.checks, [])
+        self.assertFalse(result.is_business)
+        self.assertEqual(result.charge.action, VatChargeAction.charge)
+
+    def test_consumer(self):
+        """Buyers without a VAT number are consumers
+        """
+
+        registry = StubRegistry(True)
+        result = self.checkout(registry, 'DE', 'FR', None)
+
+        self.assertEqual(registry.checks, [])
+        self.assertFalse(result.is_business)
+
+
+class CheckoutTaxResolverTestCase(TestCase):
+    """Test case for :class:`CheckoutTaxResolver`.
+    """
+
+    def resolve(self, registry, latency_budget):
+        with mock.patch.dict(pyvat.VAT_REGISTRIES, {'DE': registry}):
+            with CheckoutTaxResolver(latency_budget) as resolver:
+                result = resolver.resolve(SALE_DATE,
+                                          ItemType.generic_electronic_service,
+                                          'DE',
+                                          Party('FR', True),
+                                          'DE123456789')
+                if result.check_future is not None:
+                    registry.released.set()
+                    result.check_future.result()
+                return result
+
+    def test_within_budget(self):
+        """CheckoutTaxResolver.resolve(..) with a timely check
+        """
+
+        registry = SlowRegistry(True)
+        registry.released.set()
+        result = self.resolve(registry, 5)
+
+        self.assertTrue(result.is_business)
+        self.assertFalse(result.pending_revalidation)
+        self.assertEqual(result.charge.action, VatChargeAction.reverse_charge)
+
+    def test_budget_exceeded(self):
+        """CheckoutTaxResolver.resolve(..) with a check exceeding the budget
+        """
+
+        registry = SlowRegistry(True)
+        result = self.resolve(registry, 0.05)
+
+        self.assertFalse(result.is_business)
+        self.assertTrue(result.pending_revalidation)
+        self.assertEqual(result.charge.rate, Decimal(19))
+        self.assertTrue(result.check_future.result().is_valid)
+
+    def test_no_check_needed(self):
+        """CheckoutTaxResolver.resolve(..) for a domestic sale
+        """
+
+        registry = SlowRegistry(True)
+        with mock.patch.dict(pyvat.VAT_REGISTRIES, {'DE': registry}):
+            with CheckoutTaxResolver(0.05) as resolver:
+                result = resolver.resolve(SALE_DATE,
+                                          ItemType.generic_electronic_service,
+                                          'DE',
+                                          Party('DE', True),
+                                          'DE123456789')
+
+        self.assertEqual(registry.checks, [])
+        self.assertFalse(result.pending_revalidation)
+
+
+__all__ = ('GetCheckoutVatChargeTestCase', 'CheckoutTaxResolverTestCase',)
@@ -0,0 +1,319 @@
+import csv
+import io
+import json
+import os
+import shutil
+import tempfile
+
+try:
+    from unittest import mock
+except ImportError:
+    import mock
+
+import pyvat
+from pyvat import cli
+from pyvat.registries import Registry
+from pyvat.result import VatNumberCheckResult
+from pyvat.transports import DEFAULT_POOL_SIZE
+try:
+    from unittest2 import TestCase
+except ImportError:
+    from unittest import TestCase
+
+
+class StubRegistry(Registry):
+    """Registry deeming VAT numbers ending in an odd digit valid.
+    """
+
+    def __init__(self):
+        self.checked = []
+
+    def check_vat_number(self, vat_number, country_code, test):
+        self.checked.append(vat_number)
+        return VatNumberCheckResult(int(vat_number[-1]) % 2 == 1,
+                                    business_name=u'Business %s' % (
+                                        vat_number
+                                    ))
+
+
+class CommandLineTestCase(TestCase):
+    """Test case for :func:`pyvat.cli.main`.
+    """
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.registry = StubRegistry()
+        patcher = mock.patch.dict(pyvat.VAT_REGISTRIES,
+                                  {'DK': self.registry})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(shutil.rmtree, self.directory)
+
+    def write(self, name, content):
+        path = os.path.join(self.directory, name)
+        with io.open(path, 'w', encoding='utf-8') as fp:
+            fp.write(content)
+        return path
+
+    def read_csv(self, path):
+        with io.open(path, 'r', newline='', encoding='utf-8') as fp:
+            return list(csv.DictReader(fp))
+
+    def test_check_csv(self):
+        """python -m pyvat check validates VAT numbers in CSV files.
+        """
+
+        input_path = self.write('input.csv',
+                                u'id,vat_number\n'
+                                u'1,DK 12345671\n'
+                                u'2,DK12345672\n'
+                                u'3,DK123\n'
+                                u'4,\n')
+        output_path = os.path.join(self.directory, 'output.csv')
+
+        self.assertEqual(cli.main(['check', input_path,
+                                   '-o', output_path, '-q']), 0)
+
+        rows = self.read_csv(output_path)
+        self.assertEqual([row['id'] for row in rows], ['1', '2', '3', '4'])
+        self.assertEqual([row['normalized_vat_number'] for row in rows],
+                         ['12345671', '12345672', '123', ''])
+        self.assertEqual([row['normalized_country_code'] for row in rows],
+                         ['DK', 'DK', 'DK', ''])
+        self.assertEqual([row['format_valid'] for row in rows],
+                         ['True', 'True', 'False', 'False'])
+        self.assertEqual([row['is_valid'] for row in rows],
+                         ['True', 'False', 'False', 'False'])
+        self.assertEqual(rows[0]['business_name'], 'Business 12345671')
+        self.assertEqual(sorted(self.registry.checked),
+                         ['12345671', '12345672'])
+
+    def test_check_jsonl_country_column(self):
+        """python -m pyvat check reads JSON lines with a country column.
+        """
+
+        input_path = self.write('input.jsonl',
+                                u'{"vat": "12345673", "country": "DK"}\n'
+                                u'\n'
+                                u'{"vat": "12345674", "country": "DK"}\n')
+        output_path = os.path.join(self.directory, 'output.jsonl')
+
+        self.assertEqual(cli.main(['check', input_path,
+                                   '-o', output_path,
+                                   '--column', 'vat',
+                                   '--country-column', 'country',
+                                   '-j', '1',
+                                   '-q']), 0)
+
+        with io.open(output_path, 'r', encoding='utf-8') as fp:
+            records = [json.loads(line) for line in fp]
+        self.assertEqual([record['is_valid'] for record in records],
+                         [True, False])
+        self.assertEqual([record['country'] for record in records],
+                         ['DK', 'DK'])
+
+    def test_check_format_only(self):
+        """python -m pyvat check --format-only does not query registries.
+        """
+
+        input_path = self.write('input.csv',
+                                u'vat_number\nDK12345671\nDK123\n')
+        output_path = os.path.join(self.directory, 'output.csv')
+
+        self.assertEqual(cli.main(['check', input_path,
+                                   '-o', output_path,
+                                   '--format-only', '-q']), 0)
+
+        rows = self.read_csv(output_path)
+        self.assertEqual([row['format_valid'] for row in rows],
+                         ['True', 'False'])
+        self.assertEqual([row['is_valid'] for row in rows], ['', ''])
+        self.assertEqual(self.registry.checked, [])
+
+    def test_check_resume(self):
+        """python -m pyvat check resumes from a checkpoint.
+        """
+
+        input_path = self.write('input.csv',
+                                u'vat_number\n' +
+                                u''.join(u'DK1234567%d\n' % (digit)
+                                         for digit in range(1, 6)))
+        output_path = self.write('output.csv',
+                                 u'vat_number,normalized_vat_number,'
+                                 u'normalized_country_code,format_valid,'
+                                 u'is_valid,business_name,business_address\r\n'
+                                 u'DK12345671,12345671,DK,True,True,,\r\n'
+                                 u'DK12345672,12345672,DK,True,False,,\r\n')
+        checkpoint_path = self.write('checkpoint.json',
+                                     u'{"position": 2}')
+
+        self.assertEqual(cli.main(['check', input_path,
+                                   '-o', output_path,
+                                   '--checkpoint', checkpoint_path,
+                                   '-q']), 0)
+
+        rows = self.read_csv(output_path)
+        self.assertEqual([row['vat_number'] for row in rows],
+                         ['DK1234567%d' % (digit) for digit in range(1, 6)])
+        self.assertEqual(sorted(self.registry.checked),
+                         ['12345673', '12345674', '12345675'])
+        self.assertFalse(os.path.exists(checkpoint_path))
+
+    def test_check_resume_truncates(self):
+        """python -m pyvat check drops rows written after the checkpoint.
+        """
+
+        input_path = self.write('input.csv',
+                                u'vat_number\n' +
+                                u''.join(u'DK1234567%d\n' % (digit)
+                                         for digit in range(1, 4)))
+        checkpointed = (u'vat_number,normalized_vat_number,'
+                        u'normalized_country_code,format_valid,'
+                        u'is_valid,business_name,business_address\r\n'
+                        u'DK12345671,12345671,DK,True,True,,\r\n')
+        output_path = self.write('output.csv',
+                                 checkpointed +
+                                 u'DK12345672,12345672,DK,True,False,,\r\n')
+        checkpoint_path = self.write(
+            'checkpoint.json',
+            u'{"position": 1, "offset": %d}' % (len(checkpointed))
+        )
+
+        self.assertEqual(cli.main(['check', input_path,
+                                   '-o', output_path,
+                                   '--checkpoint', checkpoint_path,
+                                   '-q']), 0)
+
+        rows = self.read_csv(output_path)
+        self.assertEqual([row['vat_number'] for row in rows],
+                         ['DK1234567%d' % (digit) for digit in range(1, 4)])
+
+    def test_check_resume_requires_output(self):
+        """python -m pyvat check cannot resume to the standard output.
+        """
+
+        input_path = self.write('input.csv', u'vat_number\nDK12345671\n')
+        checkpoint_path = self.write('checkpoint.json',
+                                     u'{"position": 1}')
+
+        with mock.patch('sys.stderr', new=io.StringIO()) as stderr:
+            self.assertEqual(cli.main(['check', input_path,
+                                       '--checkpoint', checkpoint_path,
+                                       '-q']), 1)
+        self.assertIn('requires --output', stderr.getvalue())
+
+    def test_charge(self):
+        """python -m pyvat charge computes VAT charges of ledgers.
+        """
+
+        input_path = self.write(
+            'ledger.csv',
+            u'date,item_type,buyer_country_code,buyer_is_business,'
+            u'seller_country_code,seller_is_business\n'
+            u'2024-01-01,ebook,DE,false,DK,true\n'
+            u'2024-01-01,generic_electronic_service,DE,true,DK,true\n'
+            u'2024-01-01,ebook,XX,false,DK,true\n'
+        )
+        output_path = os.path.join(self.directory, 'output.csv')
+
+        self.assertEqual(cli.main(['charge', input_path,
+                                   '-o', output_path, '-q']), 0)
+
+        rows = self.read_csv(output_path)
+        self.assertEqual([row['charge_action'] for row in rows],
+                         ['charge', 'reverse_charge', 'no_charge'])
+        self.assertEqual([row['charge_country_code'] for row in rows],
+                         ['DE', 'DE', 'XX'])
+        self.assertEqual(rows[0]['charge_rate'], '7')
+
+    def test_charge_invalid_record(self):
+        """python -m pyvat charge reports invalid ledger records.
+        """
+
+        input_path = self.write(
+            'ledger.jsonl',
+            u'{"date": "2024-01-01", "item_type": "ebook"}\n'
+        )
+
+        with mock.patch('sys.stdout', new=io.StringIO()), \
+                mock.patch('sys.stderr', new=io.StringIO()) as stderr:
+            self.assertEqual(cli.main(['charge', input_path, '-q']), 1)
+        self.assertIn('invalid ledger record 1', stderr.getvalue())
+
+    def test_charge_resume_after_error(self):
+        """python -m pyvat charge saves its checkpoint when stopped by an
+        error, so that resuming does not repeat rows.
+        """
+
+        header = (u'date,item_type,buyer_country_code,buyer_is_business,'
+                  u'seller_country_code,seller_is_business\n')
+        record = u'2024-01-01,ebook,DE,false,DK,true\n'
+        input_path = self.write('ledger.csv',
+                                header + record * 3 +
+                                record.replace(u'ebook', u'book') + record)
+        output_path = os.path.join(self.directory, 'output.csv')
+        checkpoint_path = os.path.join(self.directory, 'checkpoint.json')
+        arguments = ['charge', input_path,
+                     '-o', output_path,
+                     '--checkpoint', checkpoint_path,
+                     '--checkpoint-interval', '2',
+                     '-q']
+
+        with mock.patch('pyvat.cli.CHARGE_CHUNK_SIZE', 1), \
+                mock.patch('sys.stderr', new=io.StringIO()):
+            self.assertEqual(cli.main(arguments), 1)
+        self.assertEqual(len(self.read_csv(output_path)), 3)
+
+        self.write('ledger.csv', header + record * 5)
+        self.assertEqual(cli.main(arguments), 0)
+        self.assertEqual(len(self.read_csv(output_path)), 5)
+        self.assertFalse(os.path.exists(checkpoint_path))
+
+    def test_charge_broken_output(self):
+        """python -m pyvat charge keeps its last checkpoint and reports the
+        original error when its output breaks.
+        """
+
+        input_path = self.write(
+            'ledger.csv',
+            u'date,item_type,buyer_country_code,buyer_is_business,'
+            u'seller_country_code,seller_is_business\n' +
+            u'2024-01-01,ebook,DE,false,DK,true\n' * 5
+        )
+        output_path = os.path.join(self.directory, 'output.csv')
+        checkpoint_path = os.path.join(self.directory, 'checkpoint.json')
+        write = cli.RecordWriter.write
+        written = []
+
+        def broken_write(writer, record):
+            if len(written) == 3:
+                writer.stream.close()
+                raise IOError('disk full')
+            write(writer, record)
+            written.append(record)
+
+        with mock.patch.object(cli.RecordWriter, 'write', broken_write), \
+                mock.patch('pyvat.cli.CHARGE_CHUNK_SIZE', 1):
+            with self.assertRaises(IOError) as context:
+                cli.main(['charge', input_path,
+                          '-o', output_path,
+                          '--checkpoint', checkpoint_path,
+                          '--checkpoint-interval', '2',
+                          '-q'])
+
+        self.assertEqual(str(context.exception), 'disk full')
+        with open(checkpoint_path) as fp:
+            self.assertEqual(json.load(fp)['position'], 2)
+
+    def test_serve_concurrency(self):
+        """python -m pyvat serve defaults to as many concurrent checks as
+        connections are pooled.
+        """
+
+        with mock.patch('pyvat.cli.serve') as serve:
+            self.assertEqual(cli.main(['serve']), 0)
+        self.assertEqual(serve.call_args[1]['max_workers'],
+                         DEFAULT_POOL_SIZE)
+
+
+__all__ = ('CommandLineTestCase', )
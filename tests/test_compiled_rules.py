@@ -0,0 +1,95 @@
+import datetime
+
+from pyvat import get_sale_vat_charge, ItemType, Party
+from pyvat.compiled_rules import (
+    get_compiled_vat_rules,
+    get_era,
+    get_era_dates,
+)
+from pyvat.vat_rules import VAT_RULES, JANUARY_1_2015
+try:
+    from unittest2 import TestCase
+except ImportError:
+    from unittest import TestCase
+
+SALE_DATES = (
+    datetime.date(2014, 12, 31),
+    datetime.date(2015, 1, 1),
+    datetime.date(2020, 8, 1),
+    datetime.date(2024, 12, 31),
+    datetime.date(2025, 7, 1),
+)
+
+
+def call(function, *args):
+    try:
+        charge = function(*args)
+    except Exception as e:
+        return type(e)
+    return (charge.action, charge.country_code, charge.rate)
+
+
+class CompiledVatRulesTestCase(TestCase):
+    """Test case for :class:`CompiledVatRules`.
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        cls.compiled = get_compiled_vat_rules()
+
+    def test_eras(self):
+        """get_era(..) and get_era_dates(..)
+        """
+
+        boundaries = (JANUARY_1_2015, datetime.date(2016, 1, 1))
+
+        self.assertEqual(get_era(datetime.date(2014, 12, 31), boundaries), 0)
+        self.assertEqual(get_era(datetime.date(2015, 1, 1), boundaries), 1)
+        self.assertEqual(get_era(datetime.date(2016, 1, 1), boundaries), 2)
+        self.assertEqual(get_era_dates(1, boundaries),
+                         (JANUARY_1_2015, datetime.date(2015, 12, 31)))
+        self.assertEqual(get_era_dates(0, boundaries)[1],
+                         datetime.date(2014, 12, 31))
+
+    def test_matches_rules(self):
+        """CompiledVatRules.get_sale_vat_charge(..) matches the VAT rules
+        """
+
+        country_codes = sorted(VAT_RULES) + ['US']
+        for date in SALE_DATES:
+            for buyer_country_code in country_codes:
+                for seller_country_code in ('DE', 'FR', 'GB', 'RE', 'CH'):
+                    for is_business in (False, True):
+                        for item_type in (ItemType.ebook,
+                                          ItemType.generic_physical_good):
+                            args = (date,
+                                    item_type,
+                                    Party(buyer_country_code, is_business),
+                                    Party(seller_country_code, True))
+                            self.assertEqual(
+                                call(get_sale_vat_charge, *args),
+                                call(self.compiled.get_sale_vat_charge, *args),
+                                repr(args)
+                            )
+
+    def test_postal_code_fallback(self):
+        """CompiledVatRules.get_sale_vat_charge(.., postal_code='..')
+        """
+
+        charge = self.compiled.get_sale_vat_charge(
+            datetime.date(2025, 1, 1),
+            ItemType.generic_electronic_service,
+            Party('ES', False),
+            Party('DE', True),
+            '35001',
+        )
+        self.assertEqual(charge.rate, 0)
+
+    def test_verify(self):
+        """CompiledVatRules.verify()
+        """
+
+        self.assertEqual(self.compiled.verify(), [])
+
+
+__all__ = ('CompiledVatRulesTestCase',)
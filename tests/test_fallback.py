@@ -0,0 +1,175 @@
+try:
+    from unittest import mock
+except ImportError:
+    import mock
+
+from requests import Timeout
+
+import pyvat
+from pyvat.fallback import (
+    FallbackCheckResult,
+    FallbackRegistry,
+    MemoryResultStore,
+)
+from pyvat.registries import HMRCRegistry, Registry, ViesRegistry
+from pyvat.result import VatNumberCheckResult
+try:
+    from unittest2 import TestCase
+except ImportError:
+    from unittest import TestCase
+
+
+class FlakyRegistry(Registry):
+    """Registry answering with a configurable result or exception.
+    """
+
+    def __init__(self):
+        self.answer = VatNumberCheckResult(True)
+
+    def check_vat_number(self, vat_number, country_code, test):
+        if isinstance(self.answer, Exception):
+            raise self.answer
+        return self.answer
+
+
+class Clock(object):
+    def __init__(self):
+        self.now = 1000000.0
+
+    def __call__(self):
+        return self.now
+
+
+class FallbackRegistryTestCase(TestCase):
+    """Test case for :class:`FallbackRegistry`.
+    """
+
+    def setUp(self):
+        self.live = FlakyRegistry()
+        self.clock = Clock()
+        self.registry = FallbackRegistry(self.live,
+                                         MemoryResultStore(),
+                                         max_staleness=3600.0,
+                                         max_staleness_by_country={'SE': 0},
+                                         clock=self.clock)
+        patcher = mock.patch.dict(pyvat.VAT_REGISTRIES, {
+            'DK': self.registry,
+            'SE': self.registry,
+        })
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_falls_back_on_failures(self):
+        """The last definitive result is returned when live checks fail.
+        """
+
+        self.assertIs(pyvat.check_vat_number('DK12345678').is_valid, True)
+        self.clock.now += 60
+
+        for answer, live_error in (
+                (VatNumberCheckResult(error=u'timeout'), u'timeout'),
+                (VatNumberCheckResult(False, error=u'unexpected response '
+                                                   u'with status 503'),
+                 u'unexpected response with status 503'),
+                (VatNumberCheckResult(), u'undetermined validity'),
+                (ValueError('fault'), u"check failed: ValueError('fault')"),
+        ):
+            self.live.answer = answer
+            result = pyvat.check_vat_number('DK12345678')
+            self.assertIsInstance(result, FallbackCheckResult)
+            self.assertIs(result.is_valid, True)
+            self.assertEqual(result.age, 60)
+            self.assertEqual(result.checked_at, 1000000.0)
+            self.assertEqual(result.live_error, live_error)
+
+    def test_definitive_results_replace_stored(self):
+        """Definitive live results are returned and stored.
+        """
+
+        pyvat.check_vat_number('DK12345678')
+        self.live.answer = VatNumberCheckResult(False)
+        self.assertIs(pyvat.check_vat_number('DK12345678').is_valid, False)
+
+        self.live.answer = VatNumberCheckResult(error=u'timeout')
+        self.assertIs(pyvat.check_vat_number('DK12345678').is_valid, False)
+
+    def test_max_staleness(self):
+        """Stale results are not used as fallback.
+        """
+
+        pyvat.check_vat_number('DK12345678')
+        pyvat.check_vat_number('SE123456789701')
+        self.live.answer = VatNumberCheckResult(error=u'timeout')
+
+        result = pyvat.check_vat_number('SE123456789701')
+        self.assertNotIsInstance(result, FallbackCheckResult)
+        self.assertIsNone(result.is_valid)
+
+        self.clock.now += 3601
+        result = pyvat.check_vat_number('DK12345678')
+        self.assertNotIsInstance(result, FallbackCheckResult)
+        self.assertEqual(result.error, u'timeout')
+        self.assertIn(u'too stale', result.log_lines[-1])
+
+    def test_no_stored_result(self):
+        """Failed live results are returned without a stored result.
+        """
+
+        self.live.answer = VatNumberCheckResult(error=u'timeout')
+        result = pyvat.check_vat_number('DK12345678')
+        self.assertNotIsInstance(result, FallbackCheckResult)
+        self.assertEqual(result.error, u'timeout')
+
+
+class RegistryErrorTestCase(TestCase):
+    """Test case for the errors of failed registry checks.
+    """
+
+    def get_session(self, status_code=None, content_type=None, text=u'',
+                    exception=None):
+        session = mock.Mock()
+        if exception is not None:
+            session.request.side_effect = exception
+        else:
+            response = mock.Mock(status_code=status_code,
+                                 headers={'Content-Type': content_type},
+                                 text=text)
+            session.request.return_value = response
+        return session
+
+    def test_vies_errors(self):
+        """VIES checks report timeouts and unexpected responses.
+        """
+
+        for session, error in (
+                (self.get_session(exception=Timeout()), u'timeout'),
+                (self.get_session(500, 'text/html'),
+                 u'unexpected response with status 500'),
+        ):
+            with mock.patch('pyvat.transports.get_session',
+                            return_value=session):
+                result = ViesRegistry().check_vat_number('12345678', 'DK',
+                                                         False)
+            self.assertIsNone(result.is_valid)
+            self.assertEqual(result.error, error)
+
+    def test_hmrc_errors(self):
+        """HMRC checks report errors other than unknown VAT numbers.
+        """
+
+        registry = HMRCRegistry()
+        registry.access_token = 'token'
+        for session, error in (
+                (self.get_session(exception=Timeout()), u'timeout'),
+                (self.get_session(503, 'text/html'),
+                 u'unexpected response with status 503'),
+                (self.get_session(404, 'application/json'), None),
+        ):
+            with mock.patch('pyvat.transports.get_session',
+                            return_value=session):
+                result = registry.check_vat_number('123456789', 'GB', False)
+            self.assertIs(result.is_valid, False)
+            self.assertEqual(result.error, error)
+
+
+__all__ = ('FallbackRegistryTestCase', 'RegistryErrorTestCase', )
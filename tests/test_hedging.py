@@ -0,0 +1,127 @@
+import threading
+import time
+
+from pyvat.hedging import HedgedRegistry
+from pyvat.latency import LatencyTracker
+from pyvat.registries import Registry
+from pyvat.result import VatNumberCheckResult
+try:
+    from unittest2 import TestCase
+except ImportError:
+    from unittest import TestCase
+
+
+class ScriptedRegistry(Registry):
+    """Registry answering calls after scripted delays.
+    """
+
+    def __init__(self, answers):
+        self.lock = threading.Lock()
+        self.answers = list(answers)
+        self.calls = 0
+        self.threads = []
+
+    def check_vat_number(self, vat_number, country_code, test):
+        with self.lock:
+            delay, result = self.answers[self.calls]
+            self.calls += 1
+            self.threads.append(threading.current_thread())
+        time.sleep(delay)
+        return result
+
+
+class FixedLatencyTracker(LatencyTracker):
+    """Latency tracker ignoring latencies recorded after its creation.
+    """
+
+    def __init__(self, latency, count):
+        super(FixedLatencyTracker, self).__init__()
+        for _ in range(count):
+            super(FixedLatencyTracker, self).record(latency)
+
+    def record(self, seconds):
+        pass
+
+
+class HedgedRegistryTestCase(TestCase):
+    """Test case for :class:`HedgedRegistry`.
+    """
+
+    def get_registry(self, answers, **kwargs):
+        registry = HedgedRegistry(ScriptedRegistry(answers),
+                                  latencies=FixedLatencyTracker(0.01, 20),
+                                  **kwargs)
+        return registry
+
+    def test_hedges_slow_checks(self):
+        """Slow checks are answered by a hedged check.
+        """
+
+        registry = self.get_registry([
+            (1.0, VatNumberCheckResult(True, [u'primary'])),
+            (0.0, VatNumberCheckResult(True, [u'hedge'])),
+        ], max_hedge_ratio=1.0)
+
+        started = time.monotonic()
+        result = registry.check_vat_number('12345678', 'DK', False)
+        self.assertLess(time.monotonic() - started, 0.5)
+        self.assertEqual(result.log_lines, [u'hedge'])
+        self.assertEqual(registry.registry.calls, 2)
+        self.assertEqual(registry.hedge_ratio, 1.0)
+
+    def test_fast_checks_not_hedged(self):
+        """Checks answering within the percentile are not hedged.
+        """
+
+        registry = self.get_registry([
+            (0.0, VatNumberCheckResult(True, [u'primary'])),
+        ], max_hedge_ratio=1.0)
+
+        result = registry.check_vat_number('12345678', 'DK', False)
+        self.assertEqual(result.log_lines, [u'primary'])
+        self.assertEqual(registry.registry.calls, 1)
+
+    def test_failed_hedge_waits_for_primary(self):
+        """Checks answered with an error wait for the other check.
+        """
+
+        registry = self.get_registry([
+            (0.2, VatNumberCheckResult(True, [u'primary'])),
+            (0.0, VatNumberCheckResult(error=u'timeout')),
+        ], max_hedge_ratio=1.0)
+
+        result = registry.check_vat_number('12345678', 'DK', False)
+        self.assertEqual(result.log_lines, [u'primary'])
+
+    def test_hedge_ratio_capped(self):
+        """The fraction of hedged checks is capped.
+        """
+
+        registry = self.get_registry(
+            [(0.05, VatNumberCheckResult(True))] * 20,
+            max_hedge_ratio=0.25,
+        )
+        for _ in range(8):
+            registry.check_vat_number('12345678', 'DK', False)
+
+        # One hedge is allowed initially and one per four checks after.
+        self.assertEqual(registry.registry.calls, 8 + 3)
+        self.assertIn(threading.current_thread(), registry.registry.threads)
+
+    def test_no_hedging_without_samples(self):
+        """Checks are not hedged before enough latencies are observed.
+        """
+
+        registry = HedgedRegistry(ScriptedRegistry([
+            (0.05, VatNumberCheckResult(True)),
+        ]), max_hedge_ratio=1.0)
+
+        registry.check_vat_number('12345678', 'DK', False)
+        self.assertEqual(registry.registry.calls, 1)
+        self.assertEqual(len(registry.latencies), 1)
+        # Checks that cannot be hedged run on the calling thread.
+        self.assertEqual(registry.registry.threads,
+                         [threading.current_thread()])
+
+
+__all__ = ('HedgedRegistryTestCase', )
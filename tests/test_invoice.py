@@ -0,0 +1,100 @@
+import datetime
+from decimal import Decimal, ROUND_HALF_EVEN
+
+from pyvat import get_sale_vat_charge, ItemType, Party, VatChargeAction
+from pyvat.amounts import PER_INVOICE, decimal_vat_amount
+from pyvat.invoice import InvoiceLine, get_invoice_vat
+try:
+    from unittest2 import TestCase
+except ImportError:
+    from unittest import TestCase
+
+
+SALE_DATE = datetime.date(2025, 8, 1)
+
+LINES = [
+    InvoiceLine(ItemType.generic_electronic_service, 1999),
+    InvoiceLine(ItemType.ebook, 1250),
+    InvoiceLine(ItemType.generic_electronic_service, 2),
+    (ItemType.ebook, 2),
+]
+
+
+class GetInvoiceVatTestCase(TestCase):
+    """Test case for :func:`get_invoice_vat`.
+    """
+
+    def test_per_line(self):
+        """get_invoice_vat(..) matches per line VAT charges
+        """
+
+        buyer = Party('DE', False)
+        seller = Party('FR', True)
+        invoice = get_invoice_vat(SALE_DATE, buyer, seller, LINES)
+
+        self.assertEqual(len(invoice.lines), len(LINES))
+        for line, (item_type, net_amount) in zip(invoice.lines, LINES):
+            charge = get_sale_vat_charge(SALE_DATE, item_type, buyer, seller)
+            self.assertEqual(line.charge, charge)
+            self.assertEqual(line.vat_amount,
+                             decimal_vat_amount(net_amount, charge.rate))
+
+        self.assertEqual([subtotal.charge.rate
+                          for subtotal in invoice.subtotals],
+                         [Decimal(19), Decimal(7)])
+        self.assertEqual([subtotal.net_amount
+                          for subtotal in invoice.subtotals], [2001, 1252])
+        self.assertEqual([subtotal.vat_amount
+                          for subtotal in invoice.subtotals], [380, 88])
+        self.assertEqual(invoice.net_amount, 3253)
+        self.assertEqual(invoice.vat_amount, 468)
+        self.assertEqual(invoice.gross_amount, 3721)
+
+    def test_per_invoice(self):
+        """get_invoice_vat(.., aggregation=PER_INVOICE)
+        """
+
+        invoice = get_invoice_vat(SALE_DATE,
+                                  Party('DE', False),
+                                  Party('FR', True),
+                                  [(ItemType.ebook, 7)] * 3,
+                                  rounding=ROUND_HALF_EVEN,
+                                  aggregation=PER_INVOICE)
+
+        self.assertEqual([line.vat_amount for line in invoice.lines],
+                         [0, 0, 0])
+        self.assertEqual(invoice.vat_amount, 1)
+
+    def test_reverse_charge(self):
+        """get_invoice_vat(..) between businesses
+        """
+
+        invoice = get_invoice_vat(SALE_DATE,
+                                  Party('DE', True),
+                                  Party('FR', True),
+                                  LINES)
+
+        self.assertEqual(len(invoice.subtotals), 1)
+        self.assertEqual(invoice.subtotals[0].charge.action,
+                         VatChargeAction.reverse_charge)
+        self.assertEqual(invoice.vat_amount, 0)
+
+    def test_unsupported(self):
+        """get_invoice_vat(..) with unsupported lines or options
+        """
+
+        with self.assertRaises(NotImplementedError):
+            get_invoice_vat(SALE_DATE,
+                            Party('DE', False),
+                            Party('FR', True),
+                            [(ItemType.generic_physical_good, 100)])
+
+        with self.assertRaises(ValueError):
+            get_invoice_vat(SALE_DATE,
+                            Party('DE', False),
+                            Party('FR', True),
+                            LINES,
+                            aggregation='per_order')
+
+
+__all__ = ('GetInvoiceVatTestCase',)
@@ -0,0 +1,136 @@
+try:
+    from unittest import mock
+except ImportError:
+    import mock
+
+from requests import Timeout
+
+from pyvat.latency import AdaptiveTimeouts, LatencyTracker, TimeoutStats
+from pyvat.registries import HMRCRegistry, ViesRegistry
+try:
+    from unittest2 import TestCase
+except ImportError:
+    from unittest import TestCase
+
+
+class LatencyTrackerTestCase(TestCase):
+    """Test case for :class:`LatencyTracker`.
+    """
+
+    def test_percentile(self):
+        """Nearest-rank percentiles of the recent latencies are returned.
+        """
+
+        latencies = LatencyTracker(size=100)
+        self.assertIsNone(latencies.percentile(50))
+        for latency in range(200, 0, -1):
+            latencies.record(latency / 1000.0)
+
+        self.assertEqual(len(latencies), 100)
+        self.assertEqual(latencies.percentile(0), 0.001)
+        self.assertEqual(latencies.percentile(50), 0.05)
+        self.assertEqual(latencies.percentile(90), 0.09)
+        self.assertEqual(latencies.percentile(100), 0.1)
+        with self.assertRaises(ValueError):
+            latencies.percentile(101)
+
+
+class AdaptiveTimeoutsTestCase(TestCase):
+    """Test case for :class:`AdaptiveTimeouts`.
+    """
+
+    def test_get_timeout(self):
+        """Timeouts are derived from latency percentiles by key.
+        """
+
+        timeouts = AdaptiveTimeouts(percentile=90,
+                                    factor=2.0,
+                                    min_timeout=0.5,
+                                    connect_timeout=1.0,
+                                    min_samples=10)
+        self.assertEqual(timeouts.get_timeout('DE', 8), (1.0, 8))
+
+        for latency in range(1, 11):
+            timeouts.record('DE', latency / 10.0)
+            timeouts.record('FR', latency / 1000.0)
+            timeouts.record('IT', float(latency))
+
+        self.assertEqual(timeouts.get_timeout('DE', 8), (1.0, 1.8))
+        self.assertEqual(timeouts.get_timeout('FR', 8), (0.5, 0.5))
+        self.assertEqual(timeouts.get_timeout('IT', 8), (1.0, 8))
+
+        timeouts.max_timeout = 5.0
+        self.assertEqual(timeouts.get_timeout('IT', 8), (1.0, 5.0))
+
+        self.assertEqual(timeouts.get_stats(), {
+            'DE': TimeoutStats(1.0, 1.8, 0.9, 10),
+            'FR': TimeoutStats(0.5, 0.5, 0.009, 10),
+            'IT': TimeoutStats(1.0, 5.0, 9.0, 10),
+        })
+
+
+class RegistryTimeoutsTestCase(TestCase):
+    """Test case for adaptive timeouts of registries.
+    """
+
+    def get_session(self, exception=None):
+        session = mock.Mock()
+        response = mock.Mock(status_code=500,
+                             headers={'Content-Type': 'text/html'},
+                             text=u'')
+        session.request.return_value = response
+        if exception is not None:
+            session.request.side_effect = exception
+        return session
+
+    def test_default_timeout(self):
+        """Registries use their default timeout without adaptive timeouts.
+        """
+
+        session = self.get_session()
+        with mock.patch('pyvat.transports.get_session',
+                        return_value=session):
+            ViesRegistry().check_vat_number('12345678', 'DE', False)
+        self.assertEqual(session.request.call_args[1]['timeout'], 8)
+
+    def test_vies_timeouts(self):
+        """VIES requests use and feed the timeouts of their country.
+        """
+
+        registry = ViesRegistry()
+        registry.timeouts = AdaptiveTimeouts(min_samples=1)
+        session = self.get_session()
+
+        with mock.patch('pyvat.transports.get_session',
+                        return_value=session):
+            registry.check_vat_number('12345678', 'DE', False)
+            self.assertEqual(session.request.call_args[1]['timeout'],
+                             (3.05, 8))
+            registry.check_vat_number('12345678', 'DE', False)
+
+        self.assertEqual(session.request.call_args[1]['timeout'], (0.5, 0.5))
+        self.assertEqual(sorted(registry.timeouts.get_stats()), ['DE'])
+
+    def test_hmrc_timeouts(self):
+        """HMRC requests record timed out requests.
+        """
+
+        registry = HMRCRegistry()
+        registry.access_token = 'token'
+        registry.timeouts = AdaptiveTimeouts()
+        session = self.get_session(Timeout())
+
+        with mock.patch('pyvat.transports.get_session',
+                        return_value=session):
+            result = registry.check_vat_number('123456789', 'GB', False)
+
+        self.assertEqual(result.error, u'timeout')
+        self.assertEqual(session.request.call_args[1]['timeout'], (3.05, 12))
+        self.assertEqual(registry.timeouts.get_stats()['GB'].samples, 1)
+
+
+__all__ = (
+    'AdaptiveTimeoutsTestCase',
+    'LatencyTrackerTestCase',
+    'RegistryTimeoutsTestCase',
+)
@@ -0,0 +1,107 @@
+import re
+
+import pyvat
+from pyvat import (
+    decompose_vat_number,
+    is_vat_number_format_valid,
+    enable_memoization,
+    disable_memoization,
+    clear_memoization,
+    memoization_info,
+)
+from pyvat.memo import MemoCache
+try:
+    from unittest2 import TestCase
+except ImportError:
+    from unittest import TestCase
+
+
+class MemoCacheTestCase(TestCase):
+    """Test case for :class:`MemoCache`.
+    """
+
+    def test_eviction(self):
+        """MemoCache evicts the least recently used entry
+        """
+
+        cache = MemoCache(2)
+        cache.set('a', 1)
+        cache.set('b', 2)
+        self.assertEqual(cache.get('a'), 1)
+        cache.set('c', 3)
+
+        self.assertIsNone(cache.get('b'))
+        self.assertEqual(cache.get('a'), 1)
+        self.assertEqual(cache.get('c'), 3)
+        self.assertEqual(cache.info(), (3, 1, 2, 2))
+
+    def test_invalid_maxsize(self):
+        """MemoCache(0)
+        """
+
+        with self.assertRaises(ValueError):
+            MemoCache(0)
+
+
+class MemoizationTestCase(TestCase):
+    """Test case for opt-in memoization of decomposition and validation.
+    """
+
+    def setUp(self):
+        enable_memoization(16)
+
+    def tearDown(self):
+        disable_memoization()
+
+    def test_disabled(self):
+        """memoization_info() when disabled
+        """
+
+        disable_memoization()
+        self.assertIsNone(memoization_info())
+        self.assertEqual(decompose_vat_number('DK 12 34 56 78'),
+                         ('12345678', 'DK'))
+
+    def test_hits_and_misses(self):
+        """memoized decompose_vat_number and is_vat_number_format_valid
+        """
+
+        for _ in range(3):
+            self.assertEqual(decompose_vat_number('DK 12 34 56 78'),
+                             ('12345678', 'DK'))
+            self.assertTrue(is_vat_number_format_valid('12345678', 'DK'))
+
+        info = memoization_info()
+        self.assertEqual((info['decompose'].hits,
+                          info['decompose'].misses), (2, 2))
+        self.assertEqual((info['format'].hits,
+                          info['format'].misses), (2, 1))
+
+    def test_country_hint_is_part_of_key(self):
+        """decompose_vat_number('..', country_code='..') is keyed on the hint
+        """
+
+        self.assertEqual(decompose_vat_number('DE123456789'),
+                         ('123456789', 'DE'))
+        self.assertEqual(decompose_vat_number('DE123456789', 'AT'),
+                         ('DE123456789', 'AT'))
+
+    def test_clear_after_expression_change(self):
+        """clear_memoization() after changing VAT_NUMBER_EXPRESSIONS
+        """
+
+        original = pyvat.VAT_NUMBER_EXPRESSIONS['DK']
+        self.assertTrue(is_vat_number_format_valid('12345678', 'DK'))
+
+        try:
+            pyvat.VAT_NUMBER_EXPRESSIONS['DK'] = re.compile(r'^\d{9}$')
+            self.assertTrue(is_vat_number_format_valid('12345678', 'DK'))
+
+            clear_memoization()
+            self.assertFalse(is_vat_number_format_valid('12345678', 'DK'))
+        finally:
+            pyvat.VAT_NUMBER_EXPRESSIONS['DK'] = original
+            clear_memoization()
+
+
+__all__ = ('MemoCacheTestCase', 'MemoizationTestCase',)
@@ -0,0 +1,88 @@
+import datetime
+import json
+import multiprocessing
+
+from pyvat import ItemType
+from pyvat.batch import get_sale_vat_charges
+from pyvat.parallel import rate_ledger
+from pyvat.rate_tables import (
+    get_rate_snapshot,
+    install_rate_snapshot,
+    parse_rate_data,
+)
+from tests.test_batch import make_rows
+try:
+    from unittest2 import TestCase
+except ImportError:
+    from unittest import TestCase
+
+
+class RateLedgerTestCase(TestCase):
+    """Test case for :func:`rate_ledger`.
+    """
+
+    def test_matches_batch(self):
+        """rate_ledger(..) matches get_sale_vat_charges(..) in order
+        """
+
+        rows = make_rows(1000, seed=2)
+        rows.append((datetime.date(2020, 1, 1),
+                     ItemType.generic_physical_good,
+                     'DE', False, 'FR', True, None))
+        columns = list(zip(*rows))
+
+        expected = get_sale_vat_charges(*columns, errors='mark')
+        actual = rate_ledger(*columns, processes=2, chunk_size=128)
+
+        self.assertEqual(len(actual), len(rows))
+        self.assertEqual(actual.action_codes, expected.action_codes)
+        self.assertEqual(actual.country_codes, expected.country_codes)
+        self.assertEqual(actual.rate_basis_points, expected.rate_basis_points)
+        self.assertEqual(actual.rates, expected.rates)
+        self.assertGreater(actual.rows_per_second, 0)
+
+    def test_installed_snapshot(self):
+        """rate_ledger(..) rates against the installed snapshot in spawned
+        workers
+        """
+
+        data = json.loads(json.dumps(get_rate_snapshot().to_data()))
+        data['countries']['DK']['rate'] = '26'
+        previous = install_rate_snapshot(parse_rate_data(data))
+        self.addCleanup(install_rate_snapshot, previous)
+
+        result = rate_ledger([datetime.date(2024, 1, 1)],
+                             [ItemType.generic_electronic_service],
+                             ['DK'], [False], ['DE'], [True],
+                             processes=1,
+                             mp_context=multiprocessing.get_context('spawn'))
+        self.assertEqual(list(result.rate_basis_points), [2600])
+
+    def test_field_widths(self):
+        """rate_ledger(..) rejects fields too wide rather than truncating them
+        """
+
+        columns = ([datetime.date(2024, 1, 1)] * 2,
+                   [ItemType.ebook] * 2,
+                   ['ES', 'FR'], [False] * 2, ['FR'] * 2, [True] * 2)
+
+        result = rate_ledger(*columns, postal_codes=['35001', u'97133 \xe9'],
+                             processes=1)
+        self.assertEqual(result.country_codes, ['ES', 'FR'])
+        self.assertEqual(list(result.rate_basis_points), [0, 550])
+
+        with self.assertRaises(ValueError):
+            rate_ledger(*columns, postal_codes=['35001', '1' * 13],
+                        processes=1)
+        with self.assertRaises(ValueError):
+            rate_ledger(columns[0], columns[1], ['ESP', 'FR'], *columns[3:],
+                        processes=1)
+
+    def test_empty_ledger(self):
+        """rate_ledger() with an empty ledger
+        """
+
+        self.assertEqual(len(rate_ledger([], [], [], [], [], [])), 0)
+
+
+__all__ = ('RateLedgerTestCase',)
@@ -0,0 +1,131 @@
+import datetime
+from decimal import Decimal
+
+from pyvat import get_sale_vat_charge, ItemType, Party
+from pyvat.rate_history import RateTimeline, get_history_boundaries
+from pyvat.vat_rules import VAT_RULES, EuVatRulesMixin
+try:
+    from unittest2 import TestCase
+except ImportError:
+    from unittest import TestCase
+
+
+class RateTimelineTestCase(TestCase):
+    """Test case for :class:`RateTimeline`.
+    """
+
+    def test_get_vat_rate(self):
+        """RateTimeline.get_vat_rate(..)
+        """
+
+        timeline = RateTimeline(((datetime.date(2020, 1, 1), 10),
+                                 (datetime.date(2021, 1, 1), None),
+                                 (datetime.date(2022, 1, 1), '12.5')))
+
+        self.assertEqual(timeline.get_vat_rate(datetime.date(2019, 12, 31)),
+                         Decimal(10))
+        self.assertIsNone(timeline.get_vat_rate(datetime.date(2020, 1, 1)))
+        self.assertEqual(timeline.get_vat_rate(datetime.date(2021, 6, 1)),
+                         Decimal('12.5'))
+        self.assertIsNone(timeline.get_vat_rate(datetime.date(2022, 1, 1)))
+
+    def test_unordered(self):
+        """RateTimeline(..) with unordered changes
+        """
+
+        with self.assertRaises(ValueError):
+            RateTimeline(((datetime.date(2021, 1, 1), 10),
+                          (datetime.date(2020, 1, 1), 11)))
+
+
+class RateHistoryTestCase(TestCase):
+    """Test case for effective-dated VAT rates.
+    """
+
+    def assertRate(self, country_code, item_type, date, rate):
+        self.assertEqual(
+            VAT_RULES[country_code].get_vat_rate(item_type, date=date),
+            Decimal(rate)
+        )
+
+    def test_rate_changes(self):
+        """get_vat_rate(.., date=..) around rate changes
+        """
+
+        it = ItemType.generic_electronic_service
+        self.assertRate('FI', it, datetime.date(2024, 8, 31), 24)
+        self.assertRate('FI', it, datetime.date(2024, 9, 1), '25.5')
+        self.assertRate('RO', it, datetime.date(2025, 7, 31), 19)
+        self.assertRate('RO', it, datetime.date(2025, 8, 1), 21)
+        self.assertRate('DE', it, datetime.date(2020, 6, 30), 19)
+        self.assertRate('DE', it, datetime.date(2020, 7, 1), 16)
+        self.assertRate('DE', ItemType.ebook, datetime.date(2020, 7, 1), 5)
+        self.assertRate('DE', it, datetime.date(2021, 1, 1), 19)
+
+    def test_completed_history(self):
+        """get_vat_rate(.., date=..) before 2014
+        """
+
+        it = ItemType.generic_electronic_service
+        self.assertRate('ES', it, datetime.date(2012, 8, 31), 18)
+        self.assertRate('ES', it, datetime.date(2012, 9, 1), 21)
+        self.assertRate('IT', it, datetime.date(2011, 9, 16), 20)
+        self.assertRate('IT', it, datetime.date(2013, 9, 30), 21)
+        self.assertRate('IT', it, datetime.date(2013, 10, 1), 22)
+        self.assertRate('GB', it, datetime.date(2008, 11, 30), '17.5')
+        self.assertRate('GB', it, datetime.date(2009, 6, 1), 15)
+        self.assertRate('GB', it, datetime.date(2010, 6, 1), '17.5')
+        self.assertRate('GB', it, datetime.date(2011, 1, 4), 20)
+        self.assertIn(datetime.date(2012, 9, 1), get_history_boundaries())
+
+    def test_item_type_history(self):
+        """get_vat_rate(.., date=..) of item types charged a reduced rate
+        """
+
+        date = datetime.date(2013, 6, 1)
+        self.assertRate('FR', ItemType.generic_electronic_service, date,
+                        '19.6')
+        self.assertRate('FR', ItemType.ebook, date, '5.5')
+        self.assertRate('FI', ItemType.ebook, datetime.date(2019, 6, 30), 24)
+        self.assertRate('FI', ItemType.ebook, datetime.date(2019, 7, 1), 10)
+
+    def test_current_rate(self):
+        """get_vat_rate(..) without a date
+        """
+
+        self.assertEqual(
+            VAT_RULES['FI'].get_vat_rate(ItemType.generic_electronic_service),
+            Decimal('25.5')
+        )
+
+    def test_sale_vat_charge(self):
+        """get_sale_vat_charge(..) charges the rate in force on the sale date
+        """
+
+        charge = get_sale_vat_charge(datetime.date(2020, 8, 1),
+                                     ItemType.generic_electronic_service,
+                                     Party('DE', False),
+                                     Party('FR', True))
+        self.assertEqual(charge.rate, Decimal(16))
+
+    def test_undated_override(self):
+        """Custom VAT rules overriding get_vat_rate(..) without a date
+        """
+
+        class CustomRules(EuVatRulesMixin):
+            def get_vat_rate(self, item_type, postal_code=None):
+                return Decimal(42)
+
+        original_rules = VAT_RULES['DE']
+        VAT_RULES['DE'] = CustomRules()
+        try:
+            charge = get_sale_vat_charge(datetime.date(2020, 8, 1),
+                                         ItemType.generic_electronic_service,
+                                         Party('DE', False),
+                                         Party('FR', True))
+        finally:
+            VAT_RULES['DE'] = original_rules
+        self.assertEqual(charge.rate, Decimal(42))
+
+
+__all__ = ('RateTimelineTestCase', 'RateHistoryTestCase',)
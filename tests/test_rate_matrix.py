@@ -0,0 +1,114 @@
+import datetime
+import json
+from decimal import Decimal, ROUND_HALF_EVEN
+
+from pyvat import ItemType
+from pyvat.amounts import decimal_vat_amount
+from pyvat.rate_matrix import (
+    RateMatrix,
+    build_rate_matrix,
+    get_rate_matrix,
+)
+from pyvat.rate_tables import (
+    get_rate_snapshot,
+    install_rate_snapshot,
+    parse_rate_data,
+)
+from pyvat.vat_rules import VAT_RULES
+try:
+    from unittest2 import TestCase
+except ImportError:
+    from unittest import TestCase
+
+
+class RateMatrixTestCase(TestCase):
+    """Test case for :class:`RateMatrix`.
+    """
+
+    def test_build(self):
+        """build_rate_matrix(..) covers every country and item type
+        """
+
+        matrix = build_rate_matrix()
+
+        self.assertEqual(set(matrix.country_codes), set(VAT_RULES))
+        self.assertEqual(set(matrix.item_types), set(ItemType))
+        for country_code in VAT_RULES:
+            for item_type in ItemType:
+                self.assertEqual(
+                    matrix.get_vat_rate(country_code, item_type),
+                    VAT_RULES[country_code].get_vat_rate(item_type)
+                )
+
+        self.assertEqual(matrix.content_hash, build_rate_matrix().content_hash)
+        self.assertEqual(json.loads(json.dumps(matrix.to_data()))['rates']
+                         ['FR']['ebook'], '5.5')
+        with self.assertRaises(AttributeError):
+            matrix.content_hash = 'x'
+
+    def test_content_hash(self):
+        """Matrices with equal rates written differently have equal hashes
+        """
+
+        item_types = [ItemType.ebook, ItemType.generic_physical_good]
+        matrix = RateMatrix(['DK'], item_types,
+                            [[Decimal('20'), Decimal('5.5')]])
+
+        self.assertEqual(RateMatrix(['DK'], item_types,
+                                    [[Decimal('20.0'), Decimal('5.50')]])
+                         .content_hash, matrix.content_hash)
+        self.assertNotEqual(RateMatrix(['DK'], item_types,
+                                       [[Decimal('21'), Decimal('5.5')]])
+                            .content_hash, matrix.content_hash)
+
+    def test_date(self):
+        """build_rate_matrix(date) uses historical rates
+        """
+
+        matrix = build_rate_matrix(datetime.date(2020, 8, 1))
+
+        self.assertEqual(matrix.get_vat_rate('DE', ItemType.ebook),
+                         Decimal(5))
+        self.assertNotEqual(matrix.content_hash,
+                            build_rate_matrix().content_hash)
+
+    def test_gross_prices(self):
+        """RateMatrix.get_gross_prices(..)
+        """
+
+        matrix = build_rate_matrix()
+        net_prices = [0, 1, 2, 999, 1250, 100000]
+
+        gross_prices = matrix.get_gross_prices('FR',
+                                               ItemType.ebook,
+                                               net_prices,
+                                               ROUND_HALF_EVEN)
+        self.assertEqual(gross_prices, [
+            net_price + decimal_vat_amount(net_price,
+                                           Decimal('5.5'),
+                                           ROUND_HALF_EVEN)
+            for net_price in net_prices
+        ])
+
+    def test_rebuilt_on_rate_change(self):
+        """get_rate_matrix(..) is rebuilt when rates change
+        """
+
+        original = get_rate_snapshot()
+        matrix = get_rate_matrix()
+        self.assertIs(get_rate_matrix(), matrix)
+
+        data = original.to_data()
+        data['countries']['DK']['rate'] = '26'
+        try:
+            install_rate_snapshot(parse_rate_data(data))
+            rebuilt = get_rate_matrix()
+        finally:
+            install_rate_snapshot(original)
+
+        self.assertNotEqual(rebuilt.content_hash, matrix.content_hash)
+        self.assertEqual(rebuilt.get_vat_rate('DK', ItemType.ebook),
+                         Decimal(26))
+
+
+__all__ = ('RateMatrixTestCase',)
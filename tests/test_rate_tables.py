@@ -0,0 +1,194 @@
+import datetime
+import io
+import json
+import threading
+from decimal import Decimal
+
+from pyvat import get_sale_vat_charge, ItemType, Party
+from pyvat.compiled_rules import (
+    get_compiled_vat_rules,
+    get_sale_vat_charge as get_compiled_sale_vat_charge,
+)
+from pyvat.rate_tables import (
+    RateSnapshot,
+    export_rate_data,
+    get_rate_snapshot,
+    install_rate_snapshot,
+    load_rate_snapshot,
+    parse_rate_data,
+)
+from pyvat.vat_rules import VAT_RULES
+try:
+    from unittest2 import TestCase
+except ImportError:
+    from unittest import TestCase
+
+
+def with_rate(data, country_code, rate):
+    data = json.loads(json.dumps(data))
+    data['countries'][country_code]['rate'] = rate
+    data['version'] = 'test'
+    return data
+
+
+class RateSnapshotTestCase(TestCase):
+    """Test case for :class:`RateSnapshot`.
+    """
+
+    def test_round_trip(self):
+        """parse_rate_data(export_rate_data(..)) matches the VAT rules
+        """
+
+        snapshot = parse_rate_data(export_rate_data(VAT_RULES))
+        self.assertEqual(snapshot.etag, get_rate_snapshot().etag)
+        self.assertEqual(parse_rate_data(snapshot.to_data()).etag,
+                         snapshot.etag)
+
+        for country_code in VAT_RULES:
+            for item_type in ItemType:
+                self.assertEqual(
+                    snapshot.get_vat_rate(country_code, item_type),
+                    VAT_RULES[country_code].get_vat_rate(item_type)
+                )
+
+        self.assertEqual(snapshot.get_vat_rate('ES', ItemType.ebook),
+                         Decimal(4))
+        self.assertEqual(snapshot.get_vat_rate('ES', ItemType.ebook, '35001'),
+                         Decimal(0))
+        self.assertEqual(
+            snapshot.get_vat_rate('DE',
+                                  ItemType.ebook,
+                                  date=datetime.date(2020, 8, 1)),
+            Decimal(5)
+        )
+        self.assertIn('ES', snapshot.postal_code_countries)
+        self.assertIsNone(snapshot.get_vat_rate('US', ItemType.ebook))
+
+    def test_etag(self):
+        """Snapshots with equal rates have equal ETags
+        """
+
+        data = {'version': '1',
+                'countries': {'DK': {'rate': '25',
+                                     'item_types': {'ebook': '12'}}}}
+        etag = parse_rate_data(data).etag
+
+        self.assertEqual(parse_rate_data({
+            'version': '2',
+            'countries': {'DK': {'rate': '25.0',
+                                 'item_types': {'ebook': '12.00'}}},
+        }).etag, etag)
+        self.assertEqual(parse_rate_data(with_rate(data, 'DK', '25')).etag,
+                         etag)
+        self.assertNotEqual(parse_rate_data(with_rate(data, 'DK', '26')).etag,
+                            etag)
+
+    def test_immutable(self):
+        """RateSnapshot attributes cannot be modified
+        """
+
+        with self.assertRaises(AttributeError):
+            get_rate_snapshot().etag = 'x'
+
+    def test_load(self):
+        """load_rate_snapshot(..)
+        """
+
+        data = {'version': '2030-01-01',
+                'countries': {'DK': {'rate': '26',
+                                     'item_types': {'ebook': '12'}}}}
+        snapshot = load_rate_snapshot(io.StringIO(json.dumps(data)))
+
+        self.assertIsInstance(snapshot, RateSnapshot)
+        self.assertEqual(snapshot.version, '2030-01-01')
+        self.assertEqual(snapshot.get_vat_rate('DK', ItemType.ebook),
+                         Decimal(12))
+        self.assertEqual(
+            snapshot.get_vat_rate('DK', ItemType.generic_physical_good),
+            Decimal(26)
+        )
+
+    def test_invalid(self):
+        """parse_rate_data(..) with invalid rate data
+        """
+
+        for data in ({'format': 2},
+                     {'countries': {'DK': {}}},
+                     {'countries': {'DK': {'rate': 'x'}}},
+                     {'countries': {'DK': {'rate': '25',
+                                           'item_types': {'book': '5'}}}}):
+            with self.assertRaises(ValueError):
+                parse_rate_data(data)
+
+
+class InstallRateSnapshotTestCase(TestCase):
+    """Test case for :func:`install_rate_snapshot`.
+    """
+
+    def setUp(self):
+        self.original = get_rate_snapshot()
+
+    def tearDown(self):
+        install_rate_snapshot(self.original)
+
+    def test_hot_swap(self):
+        """install_rate_snapshot(..) takes effect for all lookups
+        """
+
+        sale = (datetime.date.today(),
+                ItemType.generic_electronic_service,
+                Party('DK', False),
+                Party('DE', True))
+        self.assertEqual(get_sale_vat_charge(*sale).rate, Decimal(25))
+        self.assertEqual(get_compiled_sale_vat_charge(*sale).rate,
+                         Decimal(25))
+        etag = get_compiled_vat_rules().etag
+
+        previous = install_rate_snapshot(parse_rate_data(
+            with_rate(self.original.to_data(), 'DK', '26')
+        ))
+
+        self.assertIs(previous, self.original)
+        self.assertNotEqual(get_rate_snapshot().etag, etag)
+        self.assertEqual(get_sale_vat_charge(*sale).rate, Decimal(26))
+        self.assertEqual(get_compiled_sale_vat_charge(*sale).rate,
+                         Decimal(26))
+        self.assertEqual(get_compiled_vat_rules().etag,
+                         get_rate_snapshot().etag)
+
+    def test_concurrent_readers(self):
+        """Readers see whole snapshots during swaps
+        """
+
+        snapshots = [self.original,
+                     parse_rate_data(with_rate(self.original.to_data(),
+                                               'DK', '26'))]
+        rates = set()
+        done = threading.Event()
+
+        def read():
+            while not done.is_set():
+                rates.add(VAT_RULES['DK'].get_vat_rate(ItemType.ebook))
+
+        readers = [threading.Thread(target=read) for _ in range(4)]
+        for reader in readers:
+            reader.start()
+        try:
+            for index in range(200):
+                install_rate_snapshot(snapshots[index % 2])
+        finally:
+            done.set()
+            for reader in readers:
+                reader.join()
+
+        self.assertLessEqual(rates, set([Decimal(25), Decimal(26)]))
+
+    def test_type(self):
+        """install_rate_snapshot(..) with a non-snapshot
+        """
+
+        with self.assertRaises(TypeError):
+            install_rate_snapshot({})
+
+
+__all__ = ('RateSnapshotTestCase', 'InstallRateSnapshotTestCase',)
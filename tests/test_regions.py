@@ -0,0 +1,167 @@
+import datetime
+from decimal import Decimal
+
+from pyvat import get_sale_vat_charge, ItemType, Party, VatChargeAction
+from pyvat.batch import get_sale_vat_charges
+from pyvat.compiled_rules import (
+    get_sale_vat_charge as get_compiled_sale_vat_charge,
+)
+from pyvat.regions import Region, RegionIndex
+try:
+    from unittest2 import TestCase
+except ImportError:
+    from unittest import TestCase
+
+
+EXPECTED_REGIONAL_VAT_RATES = {
+    ('ES', '35001'): (Decimal(0), Decimal(0)),
+    ('ES', '51001'): (Decimal(0), Decimal(0)),
+    ('ES', '28001'): (Decimal(21), Decimal(4)),
+    ('PT', '9500-123'): (Decimal(16), Decimal(4)),
+    ('PT', '9000-001'): (Decimal(22), Decimal(5)),
+    ('PT', '1000-001'): (Decimal(23), Decimal(6)),
+    ('DE', '10115'): (Decimal(19), Decimal(7)),
+    ('IT', '00118'): (Decimal(22), Decimal(22)),
+    ('AT', '6691'): (Decimal(19), Decimal(7)),
+    ('AT', '6992'): (Decimal(19), Decimal(7)),
+    ('AT', '1010'): (Decimal(20), Decimal(10)),
+    ('EL', '81100'): (Decimal(17), Decimal(17)),
+    ('GR', '85300'): (Decimal(17), Decimal(17)),
+    ('EL', '10431'): (Decimal(24), Decimal(24)),
+}
+"""Expected generic electronic service and e-book VAT rates by country and
+postal code.
+"""
+
+OUTSIDE_VAT_AREA_POSTAL_CODES = (
+    ('DE', '78266'),
+    ('DE', '27498'),
+    ('IT', '23041'),
+    ('IT', '22061'),
+)
+"""Postal codes of regions outside the EU VAT area by country.
+"""
+
+
+class RegionIndexTestCase(TestCase):
+    """Test case for :class:`RegionIndex`.
+    """
+
+    def test_resolve(self):
+        """RegionIndex.resolve(..)
+        """
+
+        island = Region('Island', ('12',), 5)
+        town = Region('Town', ('1234',), 10)
+        index = RegionIndex((island, town))
+
+        self.assertIs(index.resolve('12000'), island)
+        self.assertIs(index.resolve('12345'), town)
+        self.assertIs(index.resolve(' 12 34 '), town)
+        self.assertIs(index.resolve(12999), island)
+        self.assertIsNone(index.resolve('13000'))
+        self.assertIsNone(index.resolve('1'))
+        self.assertEqual([None, island, town, island],
+                         index.classify([None, '12', '1234', '12']))
+
+    def test_conflict(self):
+        """RegionIndex(..) with a prefix claimed twice
+        """
+
+        with self.assertRaises(ValueError):
+            RegionIndex((Region('A', ('12',), 5), Region('B', ('12',), 6)))
+
+
+class RegionalVatRateTestCase(TestCase):
+    """Test case for regional VAT rates.
+    """
+
+    def test_regional_vat_rates(self):
+        """get_sale_vat_charge(.., postal_code=..)
+        """
+
+        date = datetime.date(2025, 8, 1)
+        for (country_code, postal_code), rates in \
+                EXPECTED_REGIONAL_VAT_RATES.items():
+            for item_type, rate in zip((ItemType.generic_electronic_service,
+                                        ItemType.ebook), rates):
+                sale = (date,
+                        item_type,
+                        Party(country_code, False),
+                        Party('FR', True),
+                        postal_code)
+                self.assertEqual(get_sale_vat_charge(*sale).rate, rate,
+                                 '%s %s' % (country_code, postal_code))
+                self.assertEqual(get_compiled_sale_vat_charge(*sale).rate,
+                                 rate)
+
+    def test_outside_vat_area(self):
+        """Sales to regions outside the EU VAT area are not charged VAT
+        """
+
+        for country_code, postal_code in OUTSIDE_VAT_AREA_POSTAL_CODES:
+            for date, buyer_is_business, seller_country_code in (
+                    (datetime.date(2025, 8, 1), False, 'FR'),
+                    (datetime.date(2025, 8, 1), True, 'FR'),
+                    (datetime.date(2025, 8, 1), False, country_code),
+                    (datetime.date(2014, 6, 1), False, 'FR'),
+            ):
+                sale = (date,
+                        ItemType.generic_electronic_service,
+                        Party(country_code, buyer_is_business),
+                        Party(seller_country_code, True),
+                        postal_code)
+                for charge in (get_sale_vat_charge(*sale),
+                               get_compiled_sale_vat_charge(*sale)):
+                    self.assertEqual(charge.action,
+                                     VatChargeAction.no_charge,
+                                     '%s %s' % (country_code, postal_code))
+                    self.assertEqual(charge.country_code, country_code)
+                    self.assertEqual(charge.rate, Decimal(0))
+
+    def test_batch(self):
+        """get_sale_vat_charges(..) groups postal codes by region
+        """
+
+        postal_codes = ['10115', '10117', '80331', '78266', '27498', None]
+        result = get_sale_vat_charges(
+            [datetime.date(2025, 8, 1)] * len(postal_codes),
+            [ItemType.generic_electronic_service] * len(postal_codes),
+            ['DE'] * len(postal_codes),
+            [False] * len(postal_codes),
+            ['FR'] * len(postal_codes),
+            [True] * len(postal_codes),
+            postal_codes
+        )
+
+        self.assertEqual(result.group_count, 3)
+        self.assertEqual(list(result.rate_basis_points),
+                         [1900, 1900, 1900, 0, 0, 1900])
+        self.assertEqual(result.charges[3].action, VatChargeAction.no_charge)
+
+    def test_seller_country_regions_ignored(self):
+        """Seller country regions do not apply to the buyer's postal code
+        """
+
+        # The French postal code 78266 is Büsingen's in Germany.
+        sale = (datetime.date(2014, 6, 1),
+                ItemType.generic_electronic_service,
+                Party('FR', False),
+                Party('DE', True),
+                '78266')
+        for charge in (get_sale_vat_charge(*sale),
+                       get_compiled_sale_vat_charge(*sale)):
+            self.assertEqual(charge.country_code, 'DE')
+            self.assertEqual(charge.rate, Decimal(19))
+
+        result = get_sale_vat_charges([sale[0]],
+                                      [sale[1]],
+                                      ['FR'],
+                                      [False],
+                                      ['DE'],
+                                      [True],
+                                      [sale[4]])
+        self.assertEqual(list(result.rate_basis_points), [1900])
+
+
+__all__ = ('RegionIndexTestCase', 'RegionalVatRateTestCase',)
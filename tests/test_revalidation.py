@@ -0,0 +1,253 @@
+import heapq
+import threading
+
+try:
+    from unittest import mock
+except ImportError:
+    import mock
+
+import pyvat
+from pyvat.registries import Registry
+from pyvat.result import VatNumberCheckResult
+from pyvat.revalidation import RevalidationScheduler, VatNumberChange
+try:
+    from unittest2 import TestCase
+except ImportError:
+    from unittest import TestCase
+
+
+class StubRegistry(Registry):
+    """Registry answering with configurable validities.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.validities = {}
+        self.errors = {}
+        self.checked = []
+
+    def check_vat_number(self, vat_number, country_code, test):
+        with self.lock:
+            self.checked.append(vat_number)
+        return VatNumberCheckResult(self.validities.get(vat_number, True),
+                                    error=self.errors.get(vat_number))
+
+
+class Clock(object):
+    def __init__(self):
+        self.now = 1000000.0
+
+    def __call__(self):
+        return self.now
+
+
+class RevalidationSchedulerTestCase(TestCase):
+    """Test case for :class:`RevalidationScheduler`.
+    """
+
+    def setUp(self):
+        self.registry = StubRegistry()
+        self.other_registry = StubRegistry()
+        patcher = mock.patch.dict(pyvat.VAT_REGISTRIES, {
+            'DK': self.registry,
+            'SE': self.other_registry,
+        })
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.clock = Clock()
+        self.changes = []
+
+    def get_scheduler(self, window=100.0, **kwargs):
+        scheduler = RevalidationScheduler(window=window,
+                                          on_change=self.changes.append,
+                                          clock=self.clock,
+                                          **kwargs)
+        self.addCleanup(scheduler.stop)
+        return scheduler
+
+    def advance(self, scheduler, seconds):
+        self.clock.now += seconds
+        started = scheduler.run_pending()
+        scheduler.wait()
+        return started
+
+    def test_spreads_checks(self):
+        """Checks are spread evenly over the window, oldest first.
+        """
+
+        scheduler = self.get_scheduler()
+        for index in range(10):
+            scheduler.add('DK1000000%d' % (index),
+                          is_valid=True,
+                          checked_at=self.clock.now - 100.0 + index)
+
+        self.assertEqual(self.advance(scheduler, 0), 1)
+        self.assertEqual(self.registry.checked, ['10000000'])
+        self.assertEqual(self.advance(scheduler, 5), 0)
+        self.assertEqual(self.advance(scheduler, 5), 1)
+        self.assertEqual(self.advance(scheduler, 20), 2)
+        self.assertEqual(self.registry.checked,
+                         ['1000000%d' % (index) for index in range(4)])
+
+        # Each VAT number is checked once over a window.
+        for _ in range(10):
+            self.advance(scheduler, 10)
+        self.assertEqual(len(self.registry.checked), 14)
+        self.assertEqual(len(set(self.registry.checked)), 10)
+
+    def test_prioritizes_closest_to_expiry(self):
+        """VAT numbers never checked or closest to expiry are checked first.
+        """
+
+        scheduler = self.get_scheduler(max_concurrency=1)
+        scheduler.add('DK10000001', is_valid=True,
+                      checked_at=self.clock.now - 10.0)
+        scheduler.add('DK10000002', is_valid=True,
+                      checked_at=self.clock.now - 90.0)
+        scheduler.add('DK10000003')
+
+        for _ in range(3):
+            self.advance(scheduler, 100.0 / 3)
+        self.assertEqual(self.registry.checked,
+                         ['10000003', '10000002', '10000001'])
+
+    def test_change_events(self):
+        """Changes of determined validities are emitted.
+        """
+
+        scheduler = self.get_scheduler()
+        scheduler.add('DK10000001', is_valid=True, checked_at=0.0)
+        scheduler.add('DK10000002', is_valid=True, checked_at=0.0)
+        scheduler.add('DK10000003')
+        self.registry.validities['10000001'] = False
+        self.registry.validities['10000003'] = False
+
+        self.advance(scheduler, 0)
+        self.advance(scheduler, 100)
+
+        self.assertEqual([(change.vat_number,
+                           change.country_code,
+                           change.was_valid,
+                           change.is_valid) for change in self.changes],
+                         [('10000001', 'DK', True, False)])
+        self.assertIsInstance(self.changes[0], VatNumberChange)
+        entry = scheduler.get('DK10000001')
+        self.assertIs(entry.is_valid, False)
+        self.assertEqual(entry.checked_at, self.clock.now)
+        self.assertEqual(entry.due, self.clock.now + 100.0)
+
+    def test_retries_undetermined(self):
+        """Checks without a determined validity are retried after a delay.
+        """
+
+        scheduler = self.get_scheduler(retry_delay=50.0)
+        scheduler.add('DK10000001', is_valid=True, checked_at=0.0)
+        self.registry.validities['10000001'] = None
+
+        self.advance(scheduler, 0)
+        entry = scheduler.get('DK10000001')
+        self.assertIs(entry.is_valid, True)
+        self.assertEqual(entry.checked_at, 0.0)
+        self.assertEqual(entry.due, self.clock.now + 50.0)
+
+    def test_retries_failed(self):
+        """Failed checks carrying a validity are retried after a delay.
+        """
+
+        scheduler = self.get_scheduler(retry_delay=50.0)
+        scheduler.add('DK10000001', is_valid=True, checked_at=0.0)
+        self.registry.validities['10000001'] = False
+        self.registry.errors['10000001'] = u'timeout'
+
+        self.advance(scheduler, 0)
+        entry = scheduler.get('DK10000001')
+        self.assertEqual(self.changes, [])
+        self.assertIs(entry.is_valid, True)
+        self.assertEqual(entry.checked_at, 0.0)
+        self.assertEqual(entry.due, self.clock.now + 50.0)
+
+    def test_retry_delay(self):
+        """Failed checks are not retried before the retry delay.
+        """
+
+        scheduler = self.get_scheduler(window=1.0, retry_delay=50.0)
+        scheduler.add('DK10000001', is_valid=True, checked_at=0.0)
+        self.registry.errors['10000001'] = u'timeout'
+
+        self.assertEqual(self.advance(scheduler, 0), 1)
+        self.assertEqual(self.advance(scheduler, 10), 0)
+        self.assertEqual(self.advance(scheduler, 39), 0)
+        self.assertEqual(self.advance(scheduler, 1), 1)
+        self.assertEqual(len(self.registry.checked), 2)
+
+    def test_rate_limit(self):
+        """Registries are limited to a rate of checks.
+        """
+
+        scheduler = self.get_scheduler(window=1.0, max_rate=0.1)
+        for index in range(5):
+            scheduler.add('DK1000000%d' % (index))
+        scheduler.add('SE123456789701')
+
+        self.advance(scheduler, 0)
+        self.advance(scheduler, 5)
+        self.assertEqual(len(self.registry.checked), 1)
+        self.assertEqual(self.other_registry.checked, ['123456789701'])
+        self.advance(scheduler, 10)
+        self.assertEqual(len(self.registry.checked), 2)
+
+    def test_saturated_registry(self):
+        """Registries at their limit neither block others nor get scanned.
+        """
+
+        released = threading.Event()
+        check_vat_number = self.registry.check_vat_number
+        self.registry.check_vat_number = \
+            lambda *args: released.wait() and check_vat_number(*args)
+
+        scheduler = self.get_scheduler(window=1000.0, max_concurrency=1)
+        self.addCleanup(released.set)
+        for index in range(1000):
+            scheduler.add('DK1%07d' % (index), is_valid=True,
+                          checked_at=self.clock.now - 2000.0)
+        scheduler.add('SE123456789701')
+
+        self.assertEqual(scheduler.run_pending(), 1)
+        self.clock.now += 1
+        self.assertEqual(scheduler.run_pending(), 1)
+        scheduler.wait(1.0)
+        self.assertEqual(self.other_registry.checked, ['123456789701'])
+        scheduler.remove('SE123456789701')
+
+        with mock.patch('heapq.heappop',
+                        side_effect=heapq.heappop) as heappop:
+            self.clock.now += 1
+            self.assertEqual(scheduler.run_pending(), 0)
+        # Only the removed entry is popped.
+        self.assertEqual(heappop.call_count, 1)
+
+        released.set()
+        scheduler.wait()
+        self.assertEqual(self.registry.checked, ['10000000'])
+
+    def test_remove(self):
+        """Removed VAT numbers are not checked.
+        """
+
+        scheduler = self.get_scheduler()
+        scheduler.add('DK10000001')
+        scheduler.remove('DK10000001')
+        self.assertEqual(len(scheduler), 0)
+        self.assertEqual(self.advance(scheduler, 0), 0)
+        with self.assertRaises(KeyError):
+            scheduler.get('DK10000001')
+
+    def test_unsupported_country(self):
+        """VAT numbers without a registry cannot be tracked.
+        """
+
+        with self.assertRaises(ValueError):
+            self.get_scheduler().add('US123456789')
+
+
+__all__ = ('RevalidationSchedulerTestCase', )
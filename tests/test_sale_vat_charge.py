@@ -9,6 +9,7 @@ from pyvat import (
 )
 from pyvat.countries import (EU_COUNTRY_CODES, NON_EU_COUNTRY_CODES,
                              DOM_COUNTRY_CODES, FRANCE_SAME_VAT_TERRITORY)
+from pyvat.vat_rules import VAT_RULES, VatRules, NOT_APPLICABLE
 try:
     from unittest2 import TestCase
 except ImportError:
@@ -350,6 +351,40 @@ EXPECTED_VAT_RATES = {
         ItemType.enewspaper: Decimal('8.5'),
     },
 }
+HISTORICAL_VAT_RATES = {
+    datetime.date(2014, 12, 15): {
+        'CH': {Decimal('8.1'): Decimal(8)},
+        'DE': {Decimal(7): Decimal(19)},
+        'EE': {Decimal(24): Decimal(20)},
+        'EL': {Decimal(24): Decimal(23)},
+        'FI': {Decimal('25.5'): Decimal(24), Decimal(10): Decimal(24)},
+        'GR': {Decimal(24): Decimal(23)},
+        'LU': {Decimal(17): Decimal(15)},
+        'RO': {Decimal(21): Decimal(24)},
+        'SK': {Decimal(23): Decimal(20)},
+    },
+    datetime.date(2015, 1, 1): {
+        'CH': {Decimal('8.1'): Decimal(8)},
+        'DE': {Decimal(7): Decimal(19)},
+        'EE': {Decimal(24): Decimal(20)},
+        'EL': {Decimal(24): Decimal(23)},
+        'FI': {Decimal('25.5'): Decimal(24), Decimal(10): Decimal(24)},
+        'GR': {Decimal(24): Decimal(23)},
+        'RO': {Decimal(21): Decimal(24)},
+        'SK': {Decimal(23): Decimal(20)},
+    },
+}
+"""VAT rates in force on test dates, by country and current VAT rate.
+"""
+
+
+def expected_vat_rate(country_code, item_type, date):
+    rate = EXPECTED_VAT_RATES[country_code][item_type]
+    return HISTORICAL_VAT_RATES.get(date, {}) \
+        .get(country_code, {}) \
+        .get(rate, rate)
+
+
 SUPPORTED_ITEM_TYPES = [
     ItemType.generic_electronic_service,
     ItemType.generic_telecommunications_service,
@@ -423,7 +458,7 @@ class GetSaleVatChargeTestCase(TestCase):
                                          VatChargeAction.charge)
 
                         self.assertEqual(vat_charge.rate,
-                                         EXPECTED_VAT_RATES[seller_cc][it])
+                                         expected_vat_rate(seller_cc, it, d))
                         self.assertEqual(vat_charge.country_code,
                                          seller_cc)
 
@@ -489,9 +524,9 @@ class GetSaleVatChargeTestCase(TestCase):
                                          VatChargeAction.charge)
                         self.assertEqual(
                             vat_charge.rate,
-                            EXPECTED_VAT_RATES[buyer_cc][it]
+                            expected_vat_rate(buyer_cc, it, d)
                             if d >= datetime.date(2015, 1, 1) else
-                            EXPECTED_VAT_RATES[seller_cc][it]
+                            expected_vat_rate(seller_cc, it, d)
                         )
                         self.assertEqual(
                             vat_charge.country_code,
@@ -548,8 +583,9 @@ class GetSaleVatChargeTestCase(TestCase):
                                                      VatChargeAction.charge)
                                     # Verify correct VAT rate is charged
                                     if buyer_cc in EXPECTED_VAT_RATES:
-                                        self.assertEqual(vat_charge.rate,
-                                                         EXPECTED_VAT_RATES[buyer_cc][it])
+                                        self.assertEqual(
+                                            vat_charge.rate,
+                                            expected_vat_rate(buyer_cc, it, d))
                             # Great Britain (post-Brexit): B2C charges 20%, B2B uses reverse charge
                             elif buyer_cc == 'GB':
                                 if buyer_is_business:
@@ -766,5 +802,59 @@ class GetSaleVatChargeTestCase(TestCase):
                             f"B2B should be 0% on {test_date}")
 
 
+class RuleDispatchTestCase(TestCase):
+    """Test case for dispatching between buyer and seller VAT rules.
+    """
+
+    def setUp(self):
+        self.original_rules = VAT_RULES['DE']
 
+    def tearDown(self):
+        VAT_RULES['DE'] = self.original_rules
 
+    def test_not_applicable(self):
+        """VAT rules returning NOT_APPLICABLE fall back to the seller's rules
+        """
+
+        date = datetime.date(2014, 12, 31)
+        buyer = Party(country_code='DE', is_business=False)
+        seller = Party(country_code='FR', is_business=True)
+        self.assertIs(
+            VAT_RULES['DE'].get_sale_to_country_vat_charge(
+                date, ItemType.generic_electronic_service, buyer, seller
+            ),
+            NOT_APPLICABLE
+        )
+
+        vat_charge = get_sale_vat_charge(
+            date, ItemType.generic_electronic_service, buyer, seller
+        )
+        self.assertEqual(vat_charge.action, VatChargeAction.charge)
+        self.assertEqual(vat_charge.country_code, 'FR')
+        self.assertEqual(vat_charge.rate, Decimal(20))
+
+    def test_legacy_exception_contract(self):
+        """Rules raising NotImplementedError fall back to the seller's rules
+        """
+
+        class LegacyRules(VatRules):
+            def get_sale_to_country_vat_charge(self, *args, **kwargs):
+                raise NotImplementedError()
+
+        VAT_RULES['DE'] = LegacyRules()
+        vat_charge = get_sale_vat_charge(
+            datetime.date(2015, 1, 1),
+            ItemType.generic_electronic_service,
+            Party(country_code='DE', is_business=True),
+            Party(country_code='FR', is_business=True)
+        )
+        self.assertEqual(vat_charge.action, VatChargeAction.reverse_charge)
+        self.assertEqual(vat_charge.country_code, 'DE')
+
+        with self.assertRaises(NotImplementedError):
+            get_sale_vat_charge(
+                datetime.date(2015, 1, 1),
+                ItemType.generic_electronic_service,
+                Party(country_code='US', is_business=True),
+                Party(country_code='DE', is_business=True)
+            )
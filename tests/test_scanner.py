@@ -0,0 +1,128 @@
+import os
+import tempfile
+
+from pyvat import decompose_vat_number, is_vat_number_format_valid
+from pyvat.scanner import (
+    FORMAT_INVALID,
+    FORMAT_VALID,
+    UNDECOMPOSABLE,
+    VatNumberScanner,
+    scan_file,
+    split_file,
+)
+try:
+    from unittest2 import TestCase
+except ImportError:
+    from unittest import TestCase
+
+SCANNER_CASES = [
+    'DK 12 34 56 78',
+    'DK99999O99',
+    'el012345678',
+    'FRXX345678901',
+    'FRII345678901',
+    'GB123456789001',
+    'ATU68103312',
+    'US123456789',
+    '12345678',
+    'NL043133502B02',
+    'IE1114174HH',
+    'DE',
+]
+"""Raw VAT numbers scanned and compared to the string based validation.
+"""
+
+
+class VatNumberScannerTestCase(TestCase):
+    """Test case for :class:`VatNumberScanner`.
+    """
+
+    def assert_matches_string_path(self, vat_number, country_code, actual):
+        _, expected_country_code = decompose_vat_number(vat_number,
+                                                        country_code)
+        if expected_country_code is None:
+            expected_status = UNDECOMPOSABLE
+        elif is_vat_number_format_valid(vat_number, country_code):
+            expected_status = FORMAT_VALID
+        else:
+            expected_status = FORMAT_INVALID
+
+        self.assertEqual((expected_country_code, expected_status), actual,
+                         'unexpected scan result for %r' % (vat_number))
+
+    def test_no_country_code(self):
+        """VatNumberScanner().classify(..)
+        """
+
+        scanner = VatNumberScanner()
+        for vat_number in SCANNER_CASES:
+            self.assert_matches_string_path(
+                vat_number, None, scanner.classify(vat_number.encode('ascii'))
+            )
+
+    def test_country_code(self):
+        """VatNumberScanner('..').classify(..)
+        """
+
+        for country_code in ('DK', 'GR', 'FR'):
+            scanner = VatNumberScanner(country_code)
+            for vat_number in SCANNER_CASES:
+                self.assert_matches_string_path(
+                    vat_number,
+                    country_code,
+                    scanner.classify(vat_number.encode('ascii'))
+                )
+
+    def test_scan_memoryview(self):
+        """VatNumberScanner().scan(memoryview(..))
+        """
+
+        buffer = memoryview(b'DK12345678\r\n\n  \nXX1\nDK1234\n')
+        records = list(VatNumberScanner().scan(buffer))
+
+        self.assertEqual(records, [
+            (0, 'DK', FORMAT_VALID),
+            (16, None, UNDECOMPOSABLE),
+            (20, 'DK', FORMAT_INVALID),
+        ])
+
+
+class ScanFileTestCase(TestCase):
+    """Test case for :func:`scan_file`.
+    """
+
+    def setUp(self):
+        fd, self.path = tempfile.mkstemp()
+        with os.fdopen(fd, 'wb') as f:
+            for _ in range(50):
+                f.write('\n'.join(SCANNER_CASES).encode('ascii') + b'\n')
+
+    def tearDown(self):
+        os.remove(self.path)
+
+    def test_split_file(self):
+        """split_file(..) produces contiguous, line aligned ranges
+        """
+
+        ranges = split_file(self.path, 100)
+        self.assertEqual(ranges[0][0], 0)
+        self.assertEqual(ranges[-1][1], os.path.getsize(self.path))
+
+        with open(self.path, 'rb') as f:
+            data = f.read()
+        for (_, end), (start, _) in zip(ranges, ranges[1:]):
+            self.assertEqual(end, start)
+            self.assertEqual(data[end - 1:end], b'\n')
+
+    def test_process_pool(self):
+        """scan_file(.., processes=2) matches the sequential scan
+        """
+
+        sequential = list(scan_file(self.path))
+        parallel = list(scan_file(self.path, processes=2, chunk_size=256))
+
+        self.assertEqual(len(sequential), 50 * len(SCANNER_CASES))
+        self.assertEqual(sequential, parallel)
+
+
+__all__ = ('VatNumberScannerTestCase', 'ScanFileTestCase',)
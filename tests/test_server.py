@@ -0,0 +1,241 @@
+import json
+import socket
+import threading
+import time
+
+try:
+    from http.client import HTTPConnection
+except ImportError:
+    from httplib import HTTPConnection
+
+try:
+    from unittest import mock
+except ImportError:
+    import mock
+
+import pyvat
+from pyvat.registries import Registry
+from pyvat.result import VatNumberCheckResult
+from pyvat.server import CheckResultCache, ServerThread, VatServer
+try:
+    from unittest2 import TestCase
+except ImportError:
+    from unittest import TestCase
+
+
+class CountingRegistry(Registry):
+    """Slow registry counting its checks.
+
+    VAT numbers ending in an odd digit are valid and VAT numbers ending in
+    zero cannot be checked.
+    """
+
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.lock = threading.Lock()
+        self.checks = 0
+
+    def check_vat_number(self, vat_number, country_code, test):
+        with self.lock:
+            self.checks += 1
+        time.sleep(self.delay)
+        if vat_number.endswith('0'):
+            return VatNumberCheckResult()
+        return VatNumberCheckResult(int(vat_number[-1]) % 2 == 1,
+                                    business_name=u'Business')
+
+
+class VatServerTestCase(TestCase):
+    """Test case for :class:`VatServer`.
+    """
+
+    def setUp(self):
+        self.registry = CountingRegistry()
+        patcher = mock.patch.dict(pyvat.VAT_REGISTRIES,
+                                  {'DK': self.registry})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        self.thread = ServerThread(VatServer(port=0))
+        self.thread.start()
+        self.addCleanup(self.thread.stop)
+
+    def request(self, method, path, data=None, connection=None):
+        connection = connection or HTTPConnection('127.0.0.1',
+                                                  self.thread.server.port,
+                                                  timeout=5)
+        body = None if data is None else json.dumps(data)
+        connection.request(method, path, body)
+        response = connection.getresponse()
+        return response.status, json.loads(response.read().decode('utf-8'))
+
+    def test_format(self):
+        """POST /format checks VAT number formats.
+        """
+
+        self.assertEqual(self.request('POST', '/format',
+                                      {'vat_number': 'DK 12345678'}),
+                         (200, {'vat_number': '12345678',
+                                'country_code': 'DK',
+                                'format_valid': True}))
+        self.assertEqual(self.request('POST', '/format',
+                                      {'vat_number': '123',
+                                       'country_code': 'DK'})[1][
+                                           'format_valid'],
+                         False)
+
+    def test_check(self):
+        """POST /check checks VAT numbers through a shared cache.
+        """
+
+        status, data = self.request('POST', '/check',
+                                    {'vat_number': 'DK12345671'})
+        self.assertEqual(status, 200)
+        self.assertIs(data['is_valid'], True)
+        self.assertEqual(data['business_name'], 'Business')
+
+        # Differently formatted VAT numbers share a cache entry.
+        self.assertIs(self.request('POST', '/check',
+                                   {'vat_number': '12345671',
+                                    'country_code': 'DK'})[1]['is_valid'],
+                      True)
+        self.assertEqual(self.registry.checks, 1)
+
+        # Undetermined results are not cached.
+        for _ in range(2):
+            self.assertIsNone(self.request('POST', '/check',
+                                           {'vat_number': 'DK12345670'})[1][
+                                               'is_valid'])
+        self.assertEqual(self.registry.checks, 3)
+
+    def test_check_coalesced(self):
+        """Concurrent checks of a VAT number make one registry request.
+        """
+
+        self.registry.delay = 0.2
+        results = []
+
+        def check():
+            results.append(self.request('POST', '/check',
+                                        {'vat_number': 'DK12345673'}))
+
+        threads = [threading.Thread(target=check) for _ in range(5)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual([status for status, _ in results], [200] * 5)
+        self.assertEqual(self.registry.checks, 1)
+
+    def test_check_bulk(self):
+        """POST /check/bulk checks VAT numbers in order.
+        """
+
+        status, data = self.request('POST', '/check/bulk', {
+            'vat_numbers': ['DK12345671',
+                            {'vat_number': '12345672',
+                             'country_code': 'DK'},
+                            'DK123'],
+        })
+        self.assertEqual(status, 200)
+        self.assertEqual([result['is_valid'] for result in data['results']],
+                         [True, False, False])
+
+    def test_charge(self):
+        """POST /charge gets VAT charges.
+        """
+
+        self.assertEqual(self.request('POST', '/charge', {
+            'date': '2024-01-01',
+            'item_type': 'ebook',
+            'buyer': {'country_code': 'DE', 'is_business': False},
+            'seller': {'country_code': 'DK', 'is_business': True},
+        }), (200, {'action': 'charge', 'country_code': 'DE', 'rate': '7'}))
+
+        status, data = self.request('POST', '/charge', {
+            'date': '2024-01-01',
+            'item_type': 'unknown',
+            'buyer': {'country_code': 'DE'},
+            'seller': {'country_code': 'DK'},
+        })
+        self.assertEqual(status, 400)
+        self.assertIn('invalid sale', data['error'])
+
+    def test_errors(self):
+        """Invalid requests are answered with JSON errors.
+        """
+
+        self.assertEqual(self.request('GET', '/missing')[0], 404)
+        self.assertEqual(self.request('GET', '/check')[0], 405)
+        self.assertEqual(self.request('POST', '/check', [])[0], 400)
+        self.assertEqual(self.request('POST', '/check', {})[0], 400)
+
+    def request_raw(self, request):
+        connection = socket.create_connection(('127.0.0.1',
+                                               self.thread.server.port),
+                                              timeout=5)
+        try:
+            connection.sendall(request)
+            response = b''
+            while True:
+                data = connection.recv(65536)
+                if not data:
+                    return response
+                response += data
+        finally:
+            connection.close()
+
+    def test_malformed_requests(self):
+        """Malformed requests are answered with errors.
+        """
+
+        response = self.request_raw(b'POST /check HTTP/1.1\r\n'
+                                    b'Content-Length: -5\r\n\r\n')
+        self.assertTrue(response.startswith(b'HTTP/1.1 400 '))
+        self.assertIn(b'invalid Content-Length', response)
+
+        response = self.request_raw(b'GET /health HTTP/1.1\r\n'
+                                    b'X-Long: ' + b'x' * 70000 +
+                                    b'\r\n\r\n')
+        self.assertTrue(response.startswith(b'HTTP/1.1 431 '))
+
+    def test_keep_alive(self):
+        """Connections are kept alive across requests.
+        """
+
+        connection = HTTPConnection('127.0.0.1', self.thread.server.port,
+                                    timeout=5)
+        for _ in range(3):
+            self.assertEqual(self.request('GET', '/health',
+                                          connection=connection)[0], 200)
+        status, data = self.request('GET', '/health', connection=connection)
+        self.assertEqual(data['status'], 'ok')
+        connection.close()
+
+
+class CheckResultCacheTestCase(TestCase):
+    """Test case for :class:`CheckResultCache`.
+    """
+
+    def test_expiry(self):
+        """Cached results expire after their time to live.
+        """
+
+        cache = CheckResultCache(ttl=0.05)
+        result = VatNumberCheckResult(True)
+        cache.set('key', result)
+        self.assertIs(cache.get('key'), result)
+        time.sleep(0.1)
+        self.assertIsNone(cache.get('key'))
+
+    def test_failed_not_cached(self):
+        """Failed checks are not cached, even with a validity.
+        """
+
+        cache = CheckResultCache()
+        cache.set('key', VatNumberCheckResult(False, error=u'timeout'))
+        self.assertIsNone(cache.get('key'))
+
+
+__all__ = ('CheckResultCacheTestCase', 'VatServerTestCase', )
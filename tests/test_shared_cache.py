@@ -0,0 +1,223 @@
+import os
+import shutil
+import tempfile
+import threading
+import time
+
+try:
+    from unittest import mock
+except ImportError:
+    import mock
+
+import pyvat
+from pyvat.registries import Registry
+from pyvat.result import VatNumberCheckResult
+from pyvat.shared_cache import (
+    CachingRegistry,
+    MAX_PROBES,
+    SharedCheckCache,
+)
+try:
+    from unittest2 import TestCase, skipUnless
+except ImportError:
+    from unittest import TestCase, skipUnless
+
+
+class CountingRegistry(Registry):
+    """Registry counting its checks, which cannot check VAT numbers ending in
+    zero and fails checking VAT numbers ending in nine.
+    """
+
+    def __init__(self):
+        self.checks = 0
+
+    def check_vat_number(self, vat_number, country_code, test):
+        self.checks += 1
+        if vat_number.endswith('0'):
+            return VatNumberCheckResult()
+        if vat_number.endswith('9'):
+            return VatNumberCheckResult(False, error=u'timeout')
+        return VatNumberCheckResult(int(vat_number[-1]) % 2 == 1)
+
+
+class SharedCheckCacheTestCase(TestCase):
+    """Test case for :class:`SharedCheckCache`.
+    """
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, 'cache')
+        self.addCleanup(shutil.rmtree, self.directory)
+
+    def open(self, **kwargs):
+        cache = SharedCheckCache(self.path, **kwargs)
+        self.addCleanup(cache.close)
+        return cache
+
+    def test_get_set(self):
+        """Validities are cached by country code and VAT number.
+        """
+
+        cache = self.open(capacity=64)
+        self.assertIsNone(cache.get('12345678', 'DK'))
+
+        cache.set('12345678', 'DK', True, 1000.0)
+        cache.set('12345678', 'SE', False, 2000.0)
+        self.assertIsNone(cache.get('12345678', 'DK'))
+
+        cache.ttl = float('inf')
+        self.assertEqual(cache.get('12345678', 'DK'), (True, 1000.0))
+        self.assertEqual(cache.get('12345678', 'SE'), (False, 2000.0))
+        self.assertIsNone(cache.get('1234567', 'DK'))
+
+        cache.set('12345678', 'DK', False, 3000.0)
+        self.assertEqual(cache.get('12345678', 'DK'), (False, 3000.0))
+
+        info = cache.info()
+        self.assertEqual((info.hits, info.maxsize, info.currsize),
+                         (3, 64, 2))
+
+    def test_unsupported_keys(self):
+        """Keys that do not fit the record layout are not cached.
+        """
+
+        cache = self.open()
+        cache.set('1' * 25, 'DK', True)
+        cache.set(u'12345678\xe6', 'DK', True)
+        self.assertIsNone(cache.get('1' * 25, 'DK'))
+        self.assertIsNone(cache.get(u'12345678\xe6', 'DK'))
+        self.assertEqual(cache.info().currsize, 0)
+
+    def test_concurrent_statistics(self):
+        """Lookups from several threads are all counted.
+        """
+
+        cache = self.open(ttl=float('inf'))
+        cache.set('12345678', 'DK', True)
+
+        def lookup():
+            for _ in range(1000):
+                cache.get('12345678', 'DK')
+                cache.get('87654321', 'DK')
+
+        threads = [threading.Thread(target=lookup) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        info = cache.info()
+        self.assertEqual((info.hits, info.misses), (4000, 4000))
+
+    def test_replaces_oldest(self):
+        """The oldest record is replaced when all probed slots are taken.
+        """
+
+        cache = self.open(capacity=MAX_PROBES)
+        for index in range(MAX_PROBES):
+            cache.set(str(index), 'DK', True, 1000.0 + index)
+        cache.set('new', 'DK', True, 5000.0)
+
+        cache.ttl = float('inf')
+        self.assertIsNone(cache.get('0', 'DK'))
+        self.assertEqual(cache.get('new', 'DK'), (True, 5000.0))
+        for index in range(1, MAX_PROBES):
+            self.assertIsNotNone(cache.get(str(index), 'DK'))
+
+    def test_reopen(self):
+        """Reopened cache files keep their capacity and records.
+        """
+
+        cache = self.open(capacity=64)
+        cache.set('12345678', 'DK', True)
+
+        reopened = self.open(capacity=128)
+        self.assertEqual(reopened.capacity, 64)
+        self.assertEqual(reopened.get('12345678', 'DK')[0], True)
+
+    def test_invalid_file(self):
+        """Files other than cache files are rejected.
+        """
+
+        with open(self.path, 'wb') as fp:
+            fp.write(b'\x00' * 128)
+        with self.assertRaises(ValueError):
+            SharedCheckCache(self.path)
+
+    @skipUnless(hasattr(os, 'fork'), 'requires os.fork')
+    def test_shared_between_processes(self):
+        """Records written by a forked process are visible to its parent.
+        """
+
+        cache = self.open()
+        pid = os.fork()
+        if pid == 0:
+            try:
+                SharedCheckCache(self.path).set('12345678', 'DK', True)
+            finally:
+                os._exit(0)
+        os.waitpid(pid, 0)
+
+        self.assertEqual(cache.get('12345678', 'DK')[0], True)
+
+
+class CachingRegistryTestCase(TestCase):
+    """Test case for :class:`CachingRegistry`.
+    """
+
+    def setUp(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        self.cache = SharedCheckCache(os.path.join(directory, 'cache'))
+        self.addCleanup(self.cache.close)
+        self.registry = CountingRegistry()
+
+        patcher = mock.patch.dict(pyvat.VAT_REGISTRIES, {
+            'DK': CachingRegistry(self.registry, self.cache),
+        })
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_check_vat_number(self):
+        """Determined check results are answered from the cache.
+        """
+
+        for _ in range(2):
+            self.assertIs(pyvat.check_vat_number('DK12345671').is_valid,
+                          True)
+            self.assertIs(pyvat.check_vat_number('DK12345672').is_valid,
+                          False)
+            self.assertIsNone(pyvat.check_vat_number('DK12345670').is_valid)
+        self.assertEqual(self.registry.checks, 4)
+
+        self.assertTrue(pyvat.check_vat_number('DK12345671').log_lines[0]
+                        .startswith('> Cached result checked at '))
+
+    def test_failed_not_cached(self):
+        """Failed checks are not cached, even with a validity.
+        """
+
+        for _ in range(2):
+            pyvat.check_vat_number('DK12345679')
+        self.assertEqual(self.registry.checks, 2)
+        self.assertIsNone(self.cache.get('12345679', 'DK'))
+
+    def test_test_checks_bypass_cache(self):
+        """Checks against test registries bypass the cache.
+        """
+
+        for _ in range(2):
+            pyvat.check_vat_number('DK12345671', test=True)
+        self.assertEqual(self.registry.checks, 2)
+        self.assertIsNone(self.cache.get('12345671', 'DK'))
+
+    def test_expired(self):
+        """Expired results are checked again.
+        """
+
+        self.cache.set('12345671', 'DK', False, time.time() - 2 * 86400)
+        self.assertIs(pyvat.check_vat_number('DK12345671').is_valid, True)
+        self.assertEqual(self.registry.checks, 1)
+
+
+__all__ = ('CachingRegistryTestCase', 'SharedCheckCacheTestCase', )
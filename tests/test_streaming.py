@@ -0,0 +1,103 @@
+import random
+import threading
+import time
+
+try:
+    from unittest import mock
+except ImportError:
+    import mock
+
+import pyvat
+from pyvat.registries import Registry
+from pyvat.result import VatNumberCheckResult
+from pyvat.streaming import check_vat_numbers
+try:
+    from unittest2 import TestCase
+except ImportError:
+    from unittest import TestCase
+
+
+class ConcurrencyRecordingRegistry(Registry):
+    """Registry with random latency recording the concurrency of checks.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.rng = random.Random(1)
+
+    def check_vat_number(self, vat_number, country_code, test):
+        with self.lock:
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+            delay = self.rng.random() * 0.005
+        time.sleep(delay)
+        with self.lock:
+            self.in_flight -= 1
+        if vat_number.endswith('0'):
+            raise ValueError('registry failure')
+        return VatNumberCheckResult(int(vat_number) % 2 == 1)
+
+
+class CheckVatNumbersTestCase(TestCase):
+    """Test case for :func:`check_vat_numbers`.
+    """
+
+    def setUp(self):
+        self.registry = ConcurrencyRecordingRegistry()
+        patcher = mock.patch.dict(pyvat.VAT_REGISTRIES,
+                                  {'DE': self.registry})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def vat_numbers(self, count):
+        self.consumed = 0
+        for index in range(count):
+            self.consumed += 1
+            yield 'DE%09d' % (100000001 + index)
+
+    def test_ordered(self):
+        """check_vat_numbers(.., ordered=True)
+        """
+
+        results = list(check_vat_numbers(self.vat_numbers(200),
+                                         max_in_flight=8,
+                                         ordered=True))
+
+        self.assertEqual([item for item, _ in results],
+                         ['DE%09d' % (100000001 + index)
+                          for index in range(200)])
+        for item, result in results:
+            if item.endswith('0'):
+                self.assertIsNone(result.is_valid)
+                self.assertIn('registry failure', result.log_lines[0])
+            else:
+                self.assertEqual(result.is_valid, int(item[2:]) % 2 == 1)
+        self.assertLessEqual(self.registry.max_in_flight, 8)
+
+    def test_as_completed(self):
+        """check_vat_numbers(..) yields all results as they complete
+        """
+
+        results = list(check_vat_numbers(self.vat_numbers(200),
+                                         max_in_flight=4))
+
+        self.assertEqual(sorted(item for item, _ in results),
+                         ['DE%09d' % (100000001 + index)
+                          for index in range(200)])
+        self.assertLessEqual(self.registry.max_in_flight, 4)
+
+    def test_backpressure(self):
+        """check_vat_numbers(..) consumes the source lazily
+        """
+
+        stream = check_vat_numbers(self.vat_numbers(10 ** 9),
+                                   max_in_flight=4)
+        for _ in range(10):
+            next(stream)
+        self.assertLessEqual(self.consumed, 10 + 4)
+        stream.close()
+
+
+__all__ = ('CheckVatNumbersTestCase',)
@@ -0,0 +1,186 @@
+import threading
+import time
+try:
+    from http.server import BaseHTTPRequestHandler, HTTPServer
+except ImportError:
+    from BaseHTTPServer import BaseHTTPRequestHandler, HTTPServer
+try:
+    from unittest import mock
+except ImportError:
+    import mock
+
+from pyvat.exceptions import TransportTimeout
+from pyvat.registries import HMRCRegistry, ViesRegistry
+from pyvat.transports import (
+    MemoryTransport,
+    RequestsTransport,
+    Transport,
+    TransportResponse,
+    Urllib3Transport,
+    get_default_transport,
+    set_default_transport,
+    urllib3,
+)
+try:
+    from unittest2 import TestCase
+except ImportError:
+    from unittest import TestCase
+
+
+VIES_RESPONSE = (
+    u'<env:Envelope xmlns:env="http://schemas.xmlsoap.org/soap/envelope/">'
+    u'<env:Header/><env:Body><ns2:checkVatResponse xmlns:ns2="urn:ec.europa'
+    u'.eu:taxud:vies:services:checkVat:types"><ns2:countryCode>DE</ns2:cou'
+    u'ntryCode><ns2:vatNumber>812383453</ns2:vatNumber><ns2:valid>true</ns'
+    u'2:valid><ns2:name>Acme GmbH</ns2:name></ns2:checkVatResponse></env:B'
+    u'ody></env:Envelope>'
+)
+
+
+class EchoHandler(BaseHTTPRequestHandler):
+    """Handler echoing the method and body of requests, and sleeping for
+    requests to ``/slow``.
+    """
+
+    def respond(self):
+        if self.path == '/slow':
+            time.sleep(0.5)
+        length = int(self.headers.get('Content-Length') or 0)
+        body = (u'%s %s ' % (self.command, self.path)).encode('utf-8') + \
+            self.rfile.read(length)
+        self.send_response(201)
+        self.send_header('Content-Type', 'text/plain; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    do_GET = do_POST = respond
+
+    def log_message(self, *args):
+        pass
+
+
+class TransportTestCase(TestCase):
+    """Test case for the HTTP transports.
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        cls.server = HTTPServer(('127.0.0.1', 0), EchoHandler)
+        cls.url = 'http://127.0.0.1:%d' % (cls.server.server_address[1])
+        cls.thread = threading.Thread(target=cls.server.serve_forever)
+        cls.thread.daemon = True
+        cls.thread.start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def get_transports(self):
+        transports = [RequestsTransport()]
+        if urllib3 is not None:
+            transports.append(Urllib3Transport())
+        return transports
+
+    def test_requests(self):
+        """Transports make GET and POST requests.
+        """
+
+        for transport in self.get_transports():
+            response = transport.get(self.url + '/get')
+            self.assertEqual(response.status_code, 201)
+            self.assertTrue(response.ok)
+            self.assertEqual(response.headers['content-type'],
+                             'text/plain; charset=utf-8')
+            self.assertEqual(response.text, u'GET /get ')
+
+            response = transport.post(self.url + '/post',
+                                      data={'a': 'b c'},
+                                      timeout=(1, 1))
+            self.assertEqual(response.text, u'POST /post a=b+c')
+
+    def test_timeout(self):
+        """Transports raise :class:`TransportTimeout` on timeouts.
+        """
+
+        for transport in self.get_transports():
+            with self.assertRaises(TransportTimeout):
+                transport.get(self.url + '/slow', timeout=(1, 0.1))
+
+    def test_scalar_timeout(self):
+        """Scalar timeouts apply to connecting and to each read, as with
+        :mod:`requests`.
+        """
+
+        if urllib3 is None:
+            self.skipTest('urllib3 is not installed')
+
+        pool_manager = mock.Mock()
+        pool_manager.request.return_value.headers = {}
+        pool_manager.request.return_value.data = b''
+        Urllib3Transport(pool_manager).get(self.url + '/get', timeout=5)
+
+        timeout = pool_manager.request.call_args[1]['timeout']
+        self.assertEqual(timeout.connect_timeout, 5)
+        self.assertEqual(timeout.read_timeout, 5)
+        self.assertIsNone(timeout.total)
+
+
+class RegistryTransportTestCase(TestCase):
+    """Test case for registries using transports.
+    """
+
+    def test_registry_transport(self):
+        """Registries use their own transport over the default one.
+        """
+
+        transport = MemoryTransport(lambda method, url, data, headers:
+                                    TransportResponse(200,
+                                                      {'Content-Type':
+                                                       'text/xml'},
+                                                      VIES_RESPONSE))
+        registry = ViesRegistry()
+        registry.transport = transport
+        result = registry.check_vat_number('812383453', 'DE', False)
+
+        self.assertIs(result.is_valid, True)
+        self.assertEqual(result.business_name, u'Acme GmbH')
+        method, url, data, headers, timeout = transport.requests[0]
+        self.assertEqual(method, 'POST')
+        self.assertEqual(url, ViesRegistry.CHECK_VAT_SERVICE_URL)
+        self.assertIn(b'<ns0:vatNumber>812383453</ns0:vatNumber>', data)
+        self.assertEqual(timeout, 8)
+
+    def test_default_transport(self):
+        """Registries without a transport use the default transport.
+        """
+
+        def handler(method, url, data, headers):
+            raise TransportTimeout('timed out')
+
+        transport = MemoryTransport(handler)
+        previous = set_default_transport(transport)
+        try:
+            self.assertIs(get_default_transport(), transport)
+            registry = HMRCRegistry()
+            registry.access_token = 'token'
+            result = registry.check_vat_number('123456789', 'GB', False)
+        finally:
+            set_default_transport(previous)
+
+        self.assertEqual(result.error, u'timeout')
+        self.assertEqual(transport.requests[0][0], 'GET')
+        self.assertIsInstance(get_default_transport(), RequestsTransport)
+        with self.assertRaises(TypeError):
+            set_default_transport(object())
+
+    def test_abstract_transport(self):
+        """The base transport cannot make requests.
+        """
+
+        with self.assertRaises(NotImplementedError):
+            Transport().get('http://127.0.0.1/')
+
+
+__all__ = ('RegistryTransportTestCase', 'TransportTestCase', )
@@ -0,0 +1,110 @@
+import pickle
+from decimal import Decimal
+
+from pyvat import ItemType, Party, VatCharge, VatChargeAction
+try:
+    from unittest2 import TestCase
+except ImportError:
+    from unittest import TestCase
+
+
+class PartyTestCase(TestCase):
+    """Test case for :class:`Party`.
+    """
+
+    def test_immutable(self):
+        """Party attributes cannot be modified
+        """
+
+        party = Party('DK', True)
+        with self.assertRaises(AttributeError):
+            party.country_code = 'SE'
+        with self.assertRaises(AttributeError):
+            party.extra = 1
+
+    def test_hashable(self):
+        """Party(..) == Party(..)
+        """
+
+        self.assertEqual(Party('DK', True), Party('DK', True))
+        self.assertNotEqual(Party('DK', True), Party('DK', False))
+        self.assertEqual(len(set([Party('DK', True),
+                                  Party('DK', True),
+                                  Party('SE', True)])), 2)
+
+    def test_pickle(self):
+        """pickle.loads(pickle.dumps(Party(..)))
+        """
+
+        party = Party('DK', True)
+        self.assertEqual(pickle.loads(pickle.dumps(party)), party)
+
+
+class VatChargeTestCase(TestCase):
+    """Test case for :class:`VatCharge`.
+    """
+
+    def test_immutable(self):
+        """VatCharge attributes cannot be modified
+        """
+
+        charge = VatCharge(VatChargeAction.charge, 'DK', 25)
+        with self.assertRaises(AttributeError):
+            charge.rate = Decimal(20)
+
+    def test_hashable(self):
+        """VatCharge(..) == VatCharge(..)
+        """
+
+        a = VatCharge(VatChargeAction.charge, 'DK', 25)
+        b = VatCharge(VatChargeAction.charge, 'DK', Decimal(25))
+        self.assertEqual(a, b)
+        self.assertEqual(hash(a), hash(b))
+        self.assertNotEqual(
+            a, VatCharge(VatChargeAction.reverse_charge, 'DK', 25)
+        )
+
+    def test_intern(self):
+        """VatCharge.intern(..)
+        """
+
+        a = VatCharge.intern(VatChargeAction.charge, 'DK', Decimal(25))
+        b = VatCharge.intern(VatChargeAction.charge, 'DK', 25)
+        self.assertIs(a, b)
+        self.assertIsInstance(b.rate, Decimal)
+
+        c = VatCharge.intern(VatChargeAction.charge, 'DK', Decimal('25.0'))
+        self.assertIsNot(a, c)
+        self.assertEqual(str(c.rate), '25.0')
+        self.assertIs(
+            VatCharge.intern(VatChargeAction.charge, 'DK', Decimal('25.0')),
+            c
+        )
+
+    def test_pickle(self):
+        """pickle.loads(pickle.dumps(VatCharge(..)))
+        """
+
+        charge = VatCharge(VatChargeAction.charge, 'DK', 25)
+        self.assertEqual(pickle.loads(pickle.dumps(charge)), charge)
+
+
+class ItemTypeTestCase(TestCase):
+    """Test case for :class:`ItemType` service categories.
+    """
+
+    def test_service_categories(self):
+        """ItemType.is_*_service
+        """
+
+        self.assertTrue(ItemType.ebook.is_electronic_service)
+        self.assertFalse(ItemType.ebook.is_broadcasting_service)
+        self.assertTrue(
+            ItemType.prepaid_broadcasting_service.is_broadcasting_service
+        )
+        self.assertTrue(ItemType.generic_telecommunications_service
+                        .is_telecommunications_service)
+        self.assertFalse(ItemType.generic_physical_good.is_electronic_service)
+
+
+__all__ = ('PartyTestCase', 'VatChargeTestCase', 'ItemTypeTestCase',)
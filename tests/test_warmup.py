@@ -0,0 +1,143 @@
+try:
+    from unittest import mock
+except ImportError:
+    import mock
+
+from pyvat.fallback import FallbackRegistry, MemoryResultStore
+from pyvat.registries import EgyptRegistry, HMRCRegistry, ViesRegistry
+from pyvat.transports import MemoryTransport, TransportResponse
+from pyvat.warmup import WarmUpReport, WarmUpStep, warm_up
+try:
+    from unittest2 import TestCase
+except ImportError:
+    from unittest import TestCase
+
+
+class WarmUpTestCase(TestCase):
+    """Test case for :func:`warm_up`.
+    """
+
+    def get_transport(self, failing_url=None):
+        def handler(method, url, data, headers):
+            if url == failing_url:
+                raise IOError('connection refused')
+            if url.endswith('/oauth/token'):
+                return TransportResponse(200,
+                                         {'Content-Type': 'application/json'},
+                                         u'{"access_token": "token"}')
+            return TransportResponse(405)
+
+        return MemoryTransport(handler)
+
+    def get_registries(self, transport):
+        vies = ViesRegistry()
+        hmrc = HMRCRegistry()
+        vies.transport = hmrc.transport = transport
+        return vies, hmrc
+
+    def test_warm_up(self):
+        """Warming up connects to each endpoint and authenticates with HMRC.
+        """
+
+        transport = self.get_transport()
+        vies, hmrc = self.get_registries(transport)
+        report = warm_up([FallbackRegistry(vies, MemoryResultStore()),
+                          vies,
+                          hmrc,
+                          EgyptRegistry()],
+                         connections=3)
+
+        self.assertTrue(report.ok)
+        self.assertEqual([step.name for step in report.steps], [
+            u'connect %s' % (ViesRegistry.CHECK_VAT_SERVICE_URL),
+            u'connect %s' % (HMRCRegistry.CHECK_VAT_SERVICE_URL),
+            u'authenticate HMRCRegistry',
+        ])
+        self.assertEqual(hmrc.access_token, 'token')
+        heads = [request for request in transport.requests
+                 if request[0] == 'HEAD']
+        self.assertEqual(len(heads), 6)
+        self.assertEqual(heads[0][4], (5.0, 5.0))
+        self.assertAlmostEqual(report.seconds,
+                               sum(step.seconds for step in report.steps))
+
+    def test_test_endpoints(self):
+        """Warming up test endpoints connects to the HMRC test API.
+        """
+
+        transport = self.get_transport()
+        vies, hmrc = self.get_registries(transport)
+        report = warm_up([hmrc], test=True, authenticate=False)
+
+        self.assertEqual([step.name for step in report.steps], [
+            u'connect %s' % (HMRCRegistry.CHECK_VAT_SERVICE_TEST_URL),
+        ])
+        self.assertIsNone(hmrc.access_token)
+
+    def test_failures_reported(self):
+        """Failed steps are reported rather than raised.
+        """
+
+        transport = self.get_transport(ViesRegistry.CHECK_VAT_SERVICE_URL)
+        vies, hmrc = self.get_registries(transport)
+        report = warm_up([vies, hmrc])
+
+        self.assertFalse(report.ok)
+        self.assertEqual(len(report.errors), 1)
+        self.assertIn('connection refused', report.errors[0].error)
+        self.assertIn(u'failed: ', report.format())
+        self.assertEqual(hmrc.access_token, 'token')
+
+    def test_preload(self):
+        """Warming up preloads a cache with known results.
+        """
+
+        cache = MemoryResultStore()
+        report = warm_up([], cache=cache, records=[
+            ('12345678', 'DK', True, 1000.0),
+            ('123456789', 'GB', False, 2000.0),
+        ])
+
+        self.assertEqual(report.steps[0].name, u'preload 2 cached results')
+        self.assertEqual(cache.get('12345678', 'DK'), (True, 1000.0))
+        self.assertEqual(cache.get('123456789', 'GB'), (False, 2000.0))
+
+    def test_default_registries(self):
+        """Warming up defaults to the configured registries.
+        """
+
+        transport = self.get_transport()
+        vies, hmrc = self.get_registries(transport)
+        with mock.patch.dict('pyvat.VAT_REGISTRIES',
+                             {'DK': vies, 'GB': hmrc},
+                             clear=True):
+            report = warm_up(authenticate=False)
+
+        self.assertEqual(len(report.steps), 2)
+
+    def test_invalid_connections(self):
+        """At least one connection must be opened.
+        """
+
+        with self.assertRaises(ValueError):
+            warm_up([], connections=0)
+
+
+class WarmUpReportTestCase(TestCase):
+    """Test case for :class:`WarmUpReport`.
+    """
+
+    def test_format(self):
+        report = WarmUpReport()
+        report.steps += [WarmUpStep(u'connect a', 0.0125, None),
+                         WarmUpStep(u'connect b', 0.5, u'timeout')]
+
+        lines = report.format().splitlines()
+        self.assertEqual(len(lines), 3)
+        self.assertTrue(lines[0].startswith(u'connect a'))
+        self.assertTrue(lines[0].endswith(u'12.5 ms'))
+        self.assertTrue(lines[1].endswith(u'failed: timeout'))
+        self.assertTrue(lines[2].endswith(u'512.5 ms'))
+
+
+__all__ = ('WarmUpReportTestCase', 'WarmUpTestCase', )